@@ -0,0 +1,207 @@
+"""
+JSON API for the Work History React frontend
+
+Run locally with `python api.py`, or with several workers:
+    gunicorn -w 4 -b 0.0.0.0:8000 api:app
+Each worker keeps its own copy of the dataset and reloads it when the data version changes.
+"""
+import pandas as pd
+from flask import Flask, request
+from utils.api_response import conditional, json_response
+from utils.result_cache import result_cache
+from utils.date_index import DATE_RANGE_PRESETS, day_range
+from utils.data_utils import (
+    DASHBOARD_FIELDS,
+    METRIC_NAMES,
+    SKETCH_DIMENSIONS,
+    load_customer_profitability,
+    load_dashboard_bundle,
+    get_date_index,
+    load_date_range_data,
+    load_drilldown,
+    load_metric_data,
+    load_overrun_distribution,
+    load_overrun_histogram,
+    load_rolling_metric,
+    load_summary_metrics,
+    load_top_overruns,
+    load_workcenter_trends,
+    load_year_data,
+    load_yearly_summary,
+    search_work_history
+)
+
+app = Flask(__name__)
+
+
+@app.errorhandler(404)
+def not_found(e):
+    return json_response({"error": "Not found"}, status=404)
+
+
+@app.errorhandler(500)
+def internal_error(e):
+    return json_response({"error": "Internal server error"}, status=500)
+
+
+@app.route("/api/dashboard")
+@conditional()
+def dashboard():
+    """Return every main dashboard section from one shared data scan.
+
+    ?fields=yearly_summary,summary_metrics limits the response to a subset.
+    """
+    fields = None
+    if request.args.get("fields"):
+        fields = tuple(f.strip() for f in request.args["fields"].split(",") if f.strip())
+        unknown = [f for f in fields if f not in DASHBOARD_FIELDS]
+        if unknown:
+            return json_response({"error": f"Unknown fields: {', '.join(unknown)}"}, status=400)
+
+    return json_response(load_dashboard_bundle(fields))
+
+
+@app.route("/api/yearly_summary")
+@conditional()
+def yearly_summary():
+    return json_response(load_yearly_summary())
+
+
+@app.route("/api/summary_metrics")
+@conditional()
+def summary_metrics():
+    return json_response(load_summary_metrics())
+
+
+@app.route("/api/customer_profitability")
+@conditional()
+def customer_profitability():
+    return json_response(load_customer_profitability())
+
+
+@app.route("/api/workcenter_trends")
+@conditional()
+def workcenter_trends():
+    return json_response(load_workcenter_trends())
+
+
+@app.route("/api/top_overruns")
+@conditional()
+def top_overruns():
+    return json_response(load_top_overruns())
+
+
+@app.route("/api/year_data/<int:year>")
+@conditional()
+def year_data(year):
+    return json_response(load_year_data(year))
+
+
+@app.route("/api/date_range")
+@conditional()
+def date_range():
+    """Summary, top overruns and work centers for ?start=&end= (inclusive days) or ?preset=."""
+    preset = request.args.get("preset")
+    if preset:
+        if preset not in DATE_RANGE_PRESETS:
+            return json_response({"error": f"Unknown preset: {preset}"}, status=400)
+        last_day = get_date_index().last_date
+        if last_day is None:
+            return json_response(load_date_range_data(pd.Timestamp(0), pd.Timestamp(0)))
+        start, end = DATE_RANGE_PRESETS[preset](last_day)
+    else:
+        try:
+            start, end = day_range(request.args["start"], request.args["end"])
+        except (KeyError, ValueError):
+            return json_response({"error": "start and end dates (YYYY-MM-DD) or a preset are required"}, status=400)
+    return json_response(load_date_range_data(start, end))
+
+
+@app.route("/api/metric_data/<metric>")
+@conditional()
+def metric_data(metric):
+    if metric not in METRIC_NAMES:
+        return json_response({"error": f"Unsupported metric: {metric}"}, status=400)
+    return json_response(load_metric_data(metric))
+
+
+@app.route("/api/rolling_metric/<metric>")
+@conditional()
+def rolling_metric(metric):
+    """Trailing-window series: ?freq=D|W|M&window=12&stat=sum|mean&dimension=work_center."""
+    try:
+        return json_response(load_rolling_metric(
+            metric,
+            freq=request.args.get("freq", "M"),
+            window=request.args.get("window", 12, type=int),
+            stat=request.args.get("stat", "sum"),
+            dimension=request.args.get("dimension") or None
+        ))
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+
+
+@app.route("/api/overrun_distribution")
+@conditional()
+def overrun_distribution():
+    """p50/p90/p99 overrun ratios per ?dimension=work_center|part_name, optionally for one ?year=."""
+    try:
+        return json_response(load_overrun_distribution(
+            request.args.get("dimension", "work_center"),
+            request.args.get("year", type=int)
+        ))
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+
+
+@app.route("/api/overrun_histogram")
+@conditional()
+def overrun_histogram():
+    """Overrun ratio histogram for all operations, or ?dimension=&value=, optionally for one ?year=."""
+    dimension = request.args.get("dimension") or None
+    if dimension is not None and dimension not in SKETCH_DIMENSIONS:
+        return json_response({"error": f"Unsupported distribution dimension: {dimension}"}, status=400)
+    return json_response(load_overrun_histogram(
+        dimension,
+        request.args.get("value"),
+        request.args.get("year", type=int)
+    ))
+
+
+@app.route("/api/search")
+@conditional()
+def search():
+    """Ranked matches for ?q= across job numbers, customers, parts and task descriptions."""
+    return json_response(search_work_history(
+        request.args.get("q", ""),
+        limit=request.args.get("limit", 10, type=int)
+    ))
+
+
+@app.route("/api/drilldown")
+@conditional()
+def drilldown():
+    """Operations matching ?customer=&part=&work_center=&year= (each may repeat to OR values)."""
+    def values(name, type=str):
+        items = request.args.getlist(name, type=type)
+        if not items:
+            return None
+        return items[0] if len(items) == 1 else items
+
+    return json_response(load_drilldown(
+        customer=values("customer"),
+        part=values("part"),
+        work_center=values("work_center"),
+        year=values("year", type=int),
+        limit=request.args.get("limit", 1000, type=int)
+    ))
+
+
+@app.route("/api/cache_stats")
+def cache_stats():
+    """Result cache size and hit/miss/eviction counters for this worker."""
+    return json_response(result_cache.stats())
+
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=8000, threaded=True)
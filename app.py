@@ -5,13 +5,10 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 from utils.formatters import format_money, format_number, format_percent
-from utils.data_utils import (
-    load_yearly_summary, 
-    load_summary_metrics, 
-    load_customer_profitability, 
-    load_workcenter_trends, 
-    load_top_overruns
-)
+from utils.data_utils import get_date_index, load_dashboard_bundle, load_date_range_data, search_work_history
+from utils.date_range_picker import date_range_picker
+from utils.pagination import paginate_frame
+from utils.paginated_table import paginated_table
 from utils.visualization import create_yearly_trends_chart, create_customer_profit_chart, create_workcenter_chart
 
 # Page configuration
@@ -55,28 +52,50 @@ with st.sidebar:
 st.title("Work History Dashboard")
 st.caption("An executive analysis of shop performance")
 
+# Icon shown next to each kind of search result
+SEARCH_ICONS = {"job": "🔧", "customer": "🏢", "part": "⚙️", "task": "📝"}
+
+def open_search_result(result):
+    """Deep-link a search result: customers open the cost metric, everything else its latest year."""
+    if result["type"] == "customer":
+        st.session_state['selected_metric'] = "actual_cost"
+        st.switch_page("pages/2_Metrics_Detail.py")
+    else:
+        if result["year"] is not None:
+            st.session_state['selected_year'] = result["year"]
+        st.switch_page("pages/1_Yearly_Analysis.py")
+
 # Date and Search
 col1, col2 = st.columns([3, 1])
 with col2:
-    st.text_input("Search...", placeholder="Search...")
+    search_query = st.text_input("Search...", placeholder="Search jobs, customers, parts...")
     st.text(f"{datetime.now().strftime('%b %d, %Y')}")
 
-# Function to fetch and process data
-@st.cache_data(ttl=3600)
+if search_query:
+    results = search_work_history(search_query, limit=8)
+    with col1:
+        if results:
+            st.caption(f"Results for \"{search_query}\"")
+            for i, result in enumerate(results):
+                year_label = f" · {result['year']}" if result["year"] is not None else ""
+                label = f"{SEARCH_ICONS.get(result['type'], '🔍')} {result['value']} ({result['type']}{year_label}, {result['rows']} ops)"
+                if st.button(label, key=f"search_result_{i}"):
+                    open_search_result(result)
+        else:
+            st.caption(f"No matches for \"{search_query}\"")
+
+# Function to fetch and process data (results are cached in the data layer)
 def get_dashboard_data():
     try:
-        yearly_summary = load_yearly_summary()
-        summary_metrics = load_summary_metrics()
-        customer_data = load_customer_profitability()
-        workcenter_data = load_workcenter_trends()
-        top_overruns = load_top_overruns()
+        # All sections are computed from a single read of the Excel data
+        bundle = load_dashboard_bundle()
         
         return {
-            "yearly_summary": yearly_summary,
-            "summary_metrics": summary_metrics,
-            "customer_data": customer_data,
-            "workcenter_data": workcenter_data,
-            "top_overruns": top_overruns
+            "yearly_summary": bundle["yearly_summary"],
+            "summary_metrics": bundle["summary_metrics"],
+            "customer_data": bundle["customer_profitability"],
+            "workcenter_data": bundle["workcenter_trends"],
+            "top_overruns": bundle["top_overruns"]
         }
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
@@ -154,6 +173,36 @@ if data:
 
     st.divider()
     
+    # ---- DATE RANGE SECTION ----
+    st.subheader("Date Range")
+    date_index = get_date_index()
+    if len(date_index):
+        start, end, range_label = date_range_picker("dashboard_range", date_index.first_date, date_index.last_date)
+        range_summary = load_date_range_data(start, end)["summary"]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Planned Hours", format_number(range_summary["total_planned_hours"]))
+        with col2:
+            st.metric("Actual Hours", format_number(range_summary["total_actual_hours"]))
+        with col3:
+            st.metric(
+                "Overrun Hours",
+                format_number(range_summary["total_overrun_hours"]),
+                delta=format_percent(range_summary["overrun_percent"]/100),
+                delta_color="inverse"
+            )
+        with col4:
+            st.metric("Overrun Cost", format_money(range_summary["opportunity_cost_dollars"]))
+        st.caption(
+            f"{format_number(range_summary['total_operations'], 0)} operations across "
+            f"{format_number(range_summary['total_jobs'], 0)} jobs, {range_label}"
+        )
+    else:
+        st.write("No dated operations available.")
+
+    st.divider()
+    
     # ---- YEARLY BREAKDOWN SECTION ----
     st.subheader("Yearly Breakdown")
     with st.expander("View Yearly Data", expanded=True):
@@ -171,6 +220,10 @@ if data:
                     if col in display_df.columns:
                         display_df[col] = display_df[col].apply(lambda x: format_number(x) if x is not None else "0")
                 
+                for col in ['planned_cost', 'actual_cost']:
+                    if col in display_df.columns:
+                        display_df[col] = display_df[col].apply(lambda x: format_money(x) if x is not None else "$0")
+                
                 for col in ['job_count', 'operation_count', 'customer_count']:
                     if col in display_df.columns:
                         display_df[col] = display_df[col].apply(lambda x: format_number(x, 0) if x is not None else "0")
@@ -182,6 +235,8 @@ if data:
                     "actual_hours": "Actual",
                     "overrun_hours": "Overrun",
                     "ncr_hours": "NCR",
+                    "planned_cost": "Planned $",
+                    "actual_cost": "Actual $",
                     "job_count": "Jobs",
                     "operation_count": "Ops",
                     "customer_count": "Customers"
@@ -301,26 +356,26 @@ if data:
                 st.plotly_chart(wc_chart, use_container_width=True)
             
             with tab2:
-                # Format columns for display
-                display_wc_df = wc_df.copy()
-                if not display_wc_df.empty:
-                    for col in ['planned_hours', 'actual_hours', 'overrun_hours']:
-                        if col in display_wc_df.columns:
-                            display_wc_df[col] = display_wc_df[col].apply(lambda x: format_number(x) if x is not None else "0")
-                    
-                    # Rename columns for better display
-                    column_mapping = {
-                        "work_center": "Work Center",
-                        "planned_hours": "Planned",
-                        "actual_hours": "Actual",
-                        "overrun_hours": "Overrun"
-                    }
-                    
-                    # Only rename columns that exist
-                    rename_cols = {k: v for k, v in column_mapping.items() if k in display_wc_df.columns}
-                    display_wc_df = display_wc_df.rename(columns=rename_cols)
-                    
-                    st.dataframe(display_wc_df, use_container_width=True, hide_index=True)
+                if not wc_df.empty:
+                    # Paged table; only the visible rows are formatted
+                    paginated_table(
+                        "dashboard_workcenters",
+                        lambda page, page_size, sort_by, ascending, search: paginate_frame(
+                            wc_df, page, page_size, sort_by, ascending, search
+                        ),
+                        formats={
+                            col: (lambda x: format_number(x) if x is not None else "0")
+                            for col in ['planned_hours', 'actual_hours', 'overrun_hours']
+                        },
+                        rename={
+                            "work_center": "Work Center",
+                            "planned_hours": "Planned",
+                            "actual_hours": "Actual",
+                            "overrun_hours": "Overrun"
+                        },
+                        sort_columns=[c for c in ['actual_hours', 'planned_hours', 'overrun_hours', 'work_center'] if c in wc_df.columns],
+                        default_sort='actual_hours'
+                    )
                 else:
                     st.write("No workcenter data available")
                     
@@ -406,7 +461,7 @@ if data:
     # ---- CALCULATION NOTES ----
     with st.expander("Calculation Notes"):
         st.markdown("""
-        * All costs are calculated using a standard labor rate of $199/hour
+        * Costs are calculated at a standard burden rate of $199/hour, or $10/hour for engineering, admin and RC work (REP ENG work center, Engineering Time tasks)
         * Overrun hours = Actual Hours - Planned Hours
         * Jobs are considered profitable when Actual Hours <= Planned Hours
         * Efficiency is calculated as Planned Hours / Actual Hours
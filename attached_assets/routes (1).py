@@ -110,14 +110,10 @@ def get_active_job_summary_from_db():
         remaining_hours = sum(op.remaining_work for op in all_operations)
         projected_hours = total_actual_hours + remaining_hours
 
-        total_planned_labor_cost = sum(
-            calculate_cost(op.planned_hours, op.part_name, op.work_center, op.task_description)
-            for op in all_operations
-        )
-        total_actual_labor_cost = sum(
-            calculate_cost(op.actual_hours, op.part_name, op.work_center, op.task_description)
-            for op in all_operations
-        )
+        # Labor rates in effect at each finish date; reduced rates looked up once per distinct part, work center and task
+        _, planned_labor_costs, actual_labor_costs = operation_costs(all_operations)
+        total_planned_labor_cost = float(planned_labor_costs.sum())
+        total_actual_labor_cost = float(actual_labor_costs.sum())
 
         po_records = PurchaseOrder.query.filter_by(job_number=job_number).all()
         total_goods_cost = sum(po.net_price * po.order_quantity for po in po_records)
@@ -230,20 +226,9 @@ def get_order_values():
 def calculate_cost(hours, description=None, work_center=None, task_description=None):
     """
     Calculate labor cost with reduced burden rate for engineering/admin/RC-type tasks.
+    Whole lists of operations should be costed with operation_costs instead.
     """
-    default_burden_rate = 199
-    reduced_burden_rate = 10
-
-    if (
-        description in ['RC', 'Engineering', 'Admin', 'RC / Engineering / Admin.'] or 
-        work_center == 'REP ENG' or 
-        task_description == 'Engineering Time'
-    ):
-        burden_rate = reduced_burden_rate
-    else:
-        burden_rate = default_burden_rate
-
-    return hours * burden_rate
+    return hours * burden_rate(description, work_center, task_description)
 
 def format_number(value):
     """
@@ -286,8 +271,11 @@ def job_kpi(job_number):
     # ⏱ Hours and Labor Costs
     total_planned_hours = sum(op.planned_hours for op in all_operations)
     total_actual_hours = sum(op.actual_hours for op in all_operations)
-    total_planned_labor_cost = sum(calculate_cost(op.planned_hours, op.part_name, op.work_center, op.task_description) for op in all_operations)
-    total_actual_labor_cost = sum(calculate_cost(op.actual_hours, op.part_name, op.work_center, op.task_description) for op in all_operations)
+    rates, planned_labor_costs, actual_labor_costs = operation_costs(all_operations)
+    total_planned_labor_cost = float(planned_labor_costs.sum())
+    total_actual_labor_cost = float(actual_labor_costs.sum())
+    # Burden rate of each operation, for costing subsets and overruns below
+    op_rates = {id(op): rate for op, rate in zip(all_operations, rates.tolist())}
 
     # 📦 Purchase Orders
     purchase_orders = PurchaseOrder.query.filter_by(job_number=job_number).all()
@@ -328,7 +316,7 @@ def job_kpi(job_number):
     overrun_details = []
     for op in over_hours:
         extra_hours = op.actual_hours - op.planned_hours
-        extra_cost = calculate_cost(extra_hours, op.part_name, op.work_center, op.task_description)
+        extra_cost = extra_hours * op_rates[id(op)]
         overrun_details.append({
             "part": op.part_name,
             "work_center": op.work_center,
@@ -360,10 +348,10 @@ def job_kpi(job_number):
             "task": op.task_description,
             "part": op.part_name,
             "work_center": op.work_center,
-            "planned_cost": calculate_cost(op.planned_hours, op.part_name, op.work_center, op.task_description),
-            "actual_cost": calculate_cost(op.actual_hours, op.part_name, op.work_center, op.task_description),
+            "planned_cost": float(planned_cost),
+            "actual_cost": float(actual_cost),
         }
-        for op in all_operations
+        for op, planned_cost, actual_cost in zip(all_operations, planned_labor_costs, actual_labor_costs)
     ], key=lambda x: x["actual_cost"], reverse=True)
 
     # 🧠 Root Cause Flags
@@ -393,8 +381,8 @@ def job_kpi(job_number):
     for op in all_operations:
         if not op.part_name:
             continue
-        part_cost_totals[op.part_name]["planned"] += calculate_cost(op.planned_hours or 0, op.part_name, op.work_center, op.task_description)
-        part_cost_totals[op.part_name]["actual"] += calculate_cost(op.actual_hours or 0, op.part_name, op.work_center, op.task_description)
+        part_cost_totals[op.part_name]["planned"] += (op.planned_hours or 0) * op_rates[id(op)]
+        part_cost_totals[op.part_name]["actual"] += (op.actual_hours or 0) * op_rates[id(op)]
 
     for op in over_hours:
         if (
@@ -408,7 +396,7 @@ def job_kpi(job_number):
         planned = op.planned_hours or 0
         actual = op.actual_hours or 0
         extra_hours = actual - planned
-        extra_cost = calculate_cost(extra_hours, op.part_name, op.work_center, op.task_description)
+        extra_cost = extra_hours * op_rates[id(op)]
 
         driver_summary[key]["planned"] += planned
         driver_summary[key]["actual"] += actual
@@ -448,8 +436,8 @@ def job_kpi(job_number):
         planned = sum(op.planned_hours or 0 for op in ops)
         actual = sum(op.actual_hours or 0 for op in ops)
         efficiency = round((planned / actual) * 100, 1) if actual else 0
-        planned_cost = sum(calculate_cost(op.planned_hours or 0, op.part_name, op.work_center, op.task_description) for op in ops)
-        actual_cost = sum(calculate_cost(op.actual_hours or 0, op.part_name, op.work_center, op.task_description) for op in ops)
+        planned_cost = sum((op.planned_hours or 0) * op_rates[id(op)] for op in ops)
+        actual_cost = sum((op.actual_hours or 0) * op_rates[id(op)] for op in ops)
         cost_variance = actual_cost - planned_cost
 
         wc_efficiency_map[wc] = efficiency
@@ -525,6 +513,12 @@ def job_kpi(job_number):
 
 #Start Workhistory Python Code-----------------------------------------------------------------------------------------------------------------------
 
+from utils.api_response import conditional, json_response
+from utils.cost_engine import burden_rate, operation_costs, sql_burden_rate
+from utils.db_engine import configure_engine
+from utils.query_fanout import run_queries
+from utils.search_indexes import contains_ci, create_search_indexes, equals_ci, year_range
+
 
 #Work history clickable cards to take user to metrics page
 @workhistory_api.route("/workhistory/metric/<metric>")
@@ -537,7 +531,6 @@ def get_metric_detail(metric):
     import logging
 
     logger = logging.getLogger(__name__)
-    BURDEN_RATE = 199
 
     valid_metrics = {
         "ncr_hours", "planned_hours", "actual_hours", "overrun_hours",
@@ -547,7 +540,7 @@ def get_metric_detail(metric):
     }
 
     if metric not in valid_metrics:
-        return jsonify({"error": f"Unsupported metric: {metric}"}), 400
+        return json_response({"error": f"Unsupported metric: {metric}"}), 400
 
     try:
         filters = {
@@ -602,7 +595,7 @@ def get_metric_detail(metric):
             })
 
         logger.info(f"🔍 Metric '{metric}' returned {len(rows)} rows")
-        return jsonify({
+        return json_response({
             "metric": metric,
             "count": len(rows),
             "rows": rows
@@ -610,11 +603,10 @@ def get_metric_detail(metric):
 
     except Exception as e:
         logger.exception(f"❌ Error in metric detail API for '{metric}'")
-        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+        return json_response({"error": "Internal server error", "details": str(e)}), 500
 
 workhistory_api = Blueprint('workhistory_api', __name__)
 
-BURDEN_RATE = 199
 @main_bp.route("/workhistory")
 def workhistory_dashboard():
     return render_template("work_history.html")
@@ -629,7 +621,8 @@ def work_history_year(year):
 def get_yearly_summary_breakdown(year):
     from sqlalchemy import case, distinct
 
-    BURDEN_RATE = 199
+    # Each operation is costed at its own labor rate (reduced, work center or shop-wide)
+    rate = sql_burden_rate(JobHistory.__table__)
 
     overrun_case = case(
         (JobHistory.actual_hours > JobHistory.planned_hours,
@@ -640,22 +633,169 @@ def get_yearly_summary_breakdown(year):
         (JobHistory.actual_hours == 0, JobHistory.planned_hours),
         else_=0
     )
+    year_filter = year_range(JobHistory.operation_finish_date, year)
+
+    # Each query below is independent, so they run concurrently with a session each
 
     # 🔹 1. Summary Totals
-    summary_result = db.session.query(
-        func.sum(JobHistory.planned_hours),
-        func.sum(JobHistory.actual_hours),
-        func.sum(overrun_case),
-        func.sum(JobHistory.actual_hours * BURDEN_RATE),
-        func.sum(JobHistory.planned_hours * BURDEN_RATE),
-        func.count(JobHistory.id),
-        func.count(func.distinct(JobHistory.job_number)),
-        func.count(func.distinct(JobHistory.customer_name)),
-        func.sum(case((JobHistory.work_center.ilike("NCR"), JobHistory.actual_hours), else_=0)),
-        func.count(func.distinct(JobHistory.part_name)),
-        func.sum(ghost_case)
-    ).filter(func.extract('year', JobHistory.operation_finish_date) == year).first()
+    def summary_query(session):
+        return session.query(
+            func.sum(JobHistory.planned_hours),
+            func.sum(JobHistory.actual_hours),
+            func.sum(overrun_case),
+            func.sum(JobHistory.actual_hours * rate),
+            func.sum(JobHistory.planned_hours * rate),
+            func.count(JobHistory.id),
+            func.count(func.distinct(JobHistory.job_number)),
+            func.count(func.distinct(JobHistory.customer_name)),
+            func.sum(case((equals_ci(JobHistory.work_center, "NCR"), JobHistory.actual_hours), else_=0)),
+            func.count(func.distinct(JobHistory.part_name)),
+            func.sum(ghost_case),
+            func.sum((overrun_case + ghost_case) * rate)
+        ).filter(year_filter).first()
+
+    # 🔹 2. Top Overruns
+    def top_overruns_query(session):
+        return session.query(
+            JobHistory.job_number,
+            JobHistory.part_name,
+            JobHistory.work_center,
+            JobHistory.task_description,
+            JobHistory.planned_hours,
+            JobHistory.actual_hours,
+            (JobHistory.actual_hours - JobHistory.planned_hours).label("overrun_hours"),
+            ((JobHistory.actual_hours - JobHistory.planned_hours) * rate).label("overrun_cost")
+        ).filter(
+            year_filter,
+            JobHistory.actual_hours > JobHistory.planned_hours,
+            ~contains_ci(JobHistory.task_description, "Dismantling & Inspection", db.engine.dialect.name)
+        ).order_by(((JobHistory.actual_hours - JobHistory.planned_hours) * rate).desc()).limit(10).all()
+
+    # 🔹 3. NCR Summary by Part
+    def ncr_summary_query(session):
+        return session.query(
+            JobHistory.part_name,
+            func.sum(JobHistory.actual_hours).label("total_ncr_hours"),
+            func.sum(JobHistory.actual_hours * rate).label("total_ncr_cost"),
+            func.count(JobHistory.id).label("ncr_occurrences")
+        ).filter(
+            year_filter,
+            equals_ci(JobHistory.work_center, "NCR")
+        ).group_by(JobHistory.part_name).order_by(func.sum(JobHistory.actual_hours * rate).desc()).all()
+
+    # 🔹 4. Work Center Performance
+    def wc_query(session):
+        return session.query(
+            JobHistory.work_center,
+            func.sum(JobHistory.planned_hours),
+            func.sum(JobHistory.actual_hours),
+            func.sum(overrun_case),
+            func.sum(overrun_case * rate)
+        ).filter(
+            year_filter
+        ).group_by(JobHistory.work_center).order_by(func.sum(JobHistory.actual_hours).desc()).all()
+
+    # 🔹 5. Repeat NCR Failures
+    def repeat_ncr_query(session):
+        return session.query(
+            JobHistory.part_name,
+            func.count(func.distinct(JobHistory.job_number)).label("distinct_jobs"),
+            func.sum(JobHistory.actual_hours).label("repeat_ncr_hours")
+        ).filter(
+            year_filter,
+            equals_ci(JobHistory.work_center, "NCR")
+        ).group_by(JobHistory.part_name).having(func.count(func.distinct(JobHistory.job_number)) > 1).all()
+
+    # 🔹 6. Quarterly Summary
+    def quarterly_query(session):
+        return session.query(
+            JobHistory.operation_finish_date,
+            func.sum(JobHistory.planned_hours),
+            func.sum(JobHistory.actual_hours),
+            func.sum(overrun_case),
+            func.sum(overrun_case * rate),
+            func.count(func.distinct(JobHistory.job_number))
+        ).filter(
+            year_filter
+        ).group_by(JobHistory.operation_finish_date).all()
+
+    # 🔹 7. Job Adjustments
+    def job_adjustments_query(session):
+        return session.query(
+            JobHistory.job_number,
+            func.sum(JobHistory.planned_hours),
+            func.sum(JobHistory.actual_hours),
+            func.sum(overrun_case)
+        ).filter(
+            year_filter
+        ).group_by(JobHistory.job_number).having(func.sum(overrun_case) > 0).all()
+
+    # 🔹 8. Overrun Adjustment Recommendations by Part
+    # 🔹 9. Task-Level Overrun Breakdown (for parts above) - depends on 8, so both run in one task
+    def part_overruns_query(session):
+        part_overruns_raw = session.query(
+            JobHistory.part_name,
+            func.sum(JobHistory.planned_hours).label("total_planned"),
+            func.sum(JobHistory.actual_hours).label("total_actual"),
+            func.sum(overrun_case).label("total_overrun")
+        ).filter(
+            year_filter,
+            JobHistory.actual_hours > JobHistory.planned_hours
+        ).group_by(JobHistory.part_name).having(func.sum(overrun_case) > 0).order_by(func.sum(overrun_case).desc()).limit(20).all()
+
+        tracked_parts = [row.part_name for row in part_overruns_raw]
+
+        task_breakdown_raw = session.query(
+            JobHistory.part_name,
+            JobHistory.task_description,
+            func.sum(JobHistory.planned_hours).label("total_planned"),
+            func.sum(JobHistory.actual_hours).label("total_actual"),
+            func.sum(overrun_case).label("total_overrun")
+        ).filter(
+            year_filter,
+            JobHistory.actual_hours > JobHistory.planned_hours,
+            JobHistory.part_name.in_(tracked_parts)
+        ).group_by(JobHistory.part_name, JobHistory.task_description).having(func.sum(overrun_case) > 0).all()
+
+        return part_overruns_raw, task_breakdown_raw
+
+    # 🔹 10. NCR Averages (All-Time)
+    def ncr_years_query(session):
+        return session.query(
+            func.extract('year', JobHistory.operation_finish_date)
+        ).filter(
+            equals_ci(JobHistory.work_center, "NCR")
+        ).distinct().all()
+
+    def ncr_cost_query(session):
+        return session.query(
+            func.sum(JobHistory.actual_hours * rate)
+        ).filter(
+            equals_ci(JobHistory.work_center, "NCR")
+        ).scalar() or 0
+
+    def ncr_parts_query(session):
+        return session.query(
+            func.count(distinct(JobHistory.part_name))
+        ).filter(
+            equals_ci(JobHistory.work_center, "NCR")
+        ).scalar() or 0
+
+    results = run_queries(db.engine, {
+        "summary": summary_query,
+        "top_overruns": top_overruns_query,
+        "ncr_summary": ncr_summary_query,
+        "workcenters": wc_query,
+        "repeat_ncr": repeat_ncr_query,
+        "quarterly": quarterly_query,
+        "job_adjustments": job_adjustments_query,
+        "part_overruns": part_overruns_query,
+        "ncr_years": ncr_years_query,
+        "ncr_cost": ncr_cost_query,
+        "ncr_parts": ncr_parts_query
+    })
 
+    summary_result = results["summary"]
     total_planned = float(summary_result[0] or 0)
     total_actual = float(summary_result[1] or 0)
     total_overrun = float(summary_result[2] or 0)
@@ -671,7 +811,7 @@ def get_yearly_summary_breakdown(year):
         "total_overrun_hours": total_overrun,
         "ghost_hours": ghost_hours,
         "opportunity_cost_hours": opportunity_hours,
-        "opportunity_cost_dollars": opportunity_hours * BURDEN_RATE,
+        "opportunity_cost_dollars": float(summary_result[11] or 0),
         "recommended_buffer_percent": round(buffer_percent, 2),
         "total_actual_cost": float(summary_result[3] or 0),
         "total_planned_cost": float(summary_result[4] or 0),
@@ -682,22 +822,6 @@ def get_yearly_summary_breakdown(year):
         "total_unique_parts": int(summary_result[9] or 0)
     }
 
-    # 🔹 2. Top Overruns
-    top_overruns_query = db.session.query(
-        JobHistory.job_number,
-        JobHistory.part_name,
-        JobHistory.work_center,
-        JobHistory.task_description,
-        JobHistory.planned_hours,
-        JobHistory.actual_hours,
-        (JobHistory.actual_hours - JobHistory.planned_hours).label("overrun_hours"),
-        ((JobHistory.actual_hours - JobHistory.planned_hours) * BURDEN_RATE).label("overrun_cost")
-    ).filter(
-        func.extract('year', JobHistory.operation_finish_date) == year,
-        JobHistory.actual_hours > JobHistory.planned_hours,
-        ~JobHistory.task_description.ilike("%Dismantling & Inspection%")
-    ).order_by(((JobHistory.actual_hours - JobHistory.planned_hours) * BURDEN_RATE).desc()).limit(10).all()
-
     top_overruns = [
         {
             "job_number": row.job_number,
@@ -709,20 +833,9 @@ def get_yearly_summary_breakdown(year):
             "overrun_hours": float(row.overrun_hours or 0),
             "overrun_cost": float(row.overrun_cost or 0)
         }
-        for row in top_overruns_query
+        for row in results["top_overruns"]
     ]
 
-    # 🔹 3. NCR Summary by Part
-    ncr_summary_query = db.session.query(
-        JobHistory.part_name,
-        func.sum(JobHistory.actual_hours).label("total_ncr_hours"),
-        func.sum(JobHistory.actual_hours * BURDEN_RATE).label("total_ncr_cost"),
-        func.count(JobHistory.id).label("ncr_occurrences")
-    ).filter(
-        func.extract('year', JobHistory.operation_finish_date) == year,
-        JobHistory.work_center.ilike("NCR")
-    ).group_by(JobHistory.part_name).order_by(func.sum(JobHistory.actual_hours * BURDEN_RATE).desc()).all()
-
     ncr_summary = [
         {
             "part_name": row.part_name,
@@ -730,20 +843,9 @@ def get_yearly_summary_breakdown(year):
             "total_ncr_cost": float(row.total_ncr_cost or 0),
             "ncr_occurrences": row.ncr_occurrences
         }
-        for row in ncr_summary_query
+        for row in results["ncr_summary"]
     ]
 
-    # 🔹 4. Work Center Performance
-    wc_query = db.session.query(
-        JobHistory.work_center,
-        func.sum(JobHistory.planned_hours),
-        func.sum(JobHistory.actual_hours),
-        func.sum(overrun_case),
-        func.sum(overrun_case * BURDEN_RATE)
-    ).filter(
-        func.extract('year', JobHistory.operation_finish_date) == year
-    ).group_by(JobHistory.work_center).order_by(func.sum(JobHistory.actual_hours).desc()).all()
-
     workcenter_summary = [
         {
             "work_center": row[0],
@@ -752,42 +854,20 @@ def get_yearly_summary_breakdown(year):
             "overrun_hours": float(row[3] or 0),
             "overrun_cost": float(row[4] or 0)
         }
-        for row in wc_query
+        for row in results["workcenters"]
     ]
 
-    # 🔹 5. Repeat NCR Failures
-    repeat_ncr_raw = db.session.query(
-        JobHistory.part_name,
-        func.count(func.distinct(JobHistory.job_number)).label("distinct_jobs"),
-        func.sum(JobHistory.actual_hours).label("repeat_ncr_hours")
-    ).filter(
-        func.extract('year', JobHistory.operation_finish_date) == year,
-        JobHistory.work_center.ilike("NCR")
-    ).group_by(JobHistory.part_name).having(func.count(func.distinct(JobHistory.job_number)) > 1).all()
-
     repeat_ncr_failures = [
         {
             "part_name": row.part_name,
             "repeat_ncr_hours": float(row.repeat_ncr_hours or 0),
             "total_ncr_jobs": row.distinct_jobs
         }
-        for row in repeat_ncr_raw
+        for row in results["repeat_ncr"]
     ]
 
-    # 🔹 6. Quarterly Summary
-    quarterly_raw = db.session.query(
-        JobHistory.operation_finish_date,
-        func.sum(JobHistory.planned_hours),
-        func.sum(JobHistory.actual_hours),
-        func.sum(overrun_case),
-        func.sum(overrun_case * BURDEN_RATE),
-        func.count(func.distinct(JobHistory.job_number))
-    ).filter(
-        func.extract('year', JobHistory.operation_finish_date) == year
-    ).group_by(JobHistory.operation_finish_date).all()
-
     quarter_map = {}
-    for row in quarterly_raw:
+    for row in results["quarterly"]:
         date = row[0]
         if not date:
             continue
@@ -812,16 +892,6 @@ def get_yearly_summary_breakdown(year):
         for label, values in sorted(quarter_map.items())
     ]
 
-    # 🔹 7. Job Adjustments
-    job_adjustments_raw = db.session.query(
-        JobHistory.job_number,
-        func.sum(JobHistory.planned_hours),
-        func.sum(JobHistory.actual_hours),
-        func.sum(overrun_case)
-    ).filter(
-        func.extract('year', JobHistory.operation_finish_date) == year
-    ).group_by(JobHistory.job_number).having(func.sum(overrun_case) > 0).all()
-
     job_adjustments = [
         {
             "job_number": row[0],
@@ -829,19 +899,10 @@ def get_yearly_summary_breakdown(year):
             "total_actual": float(row[2] or 0),
             "needed_increase": float(row[3] or 0)
         }
-        for row in job_adjustments_raw
+        for row in results["job_adjustments"]
     ]
 
-    # 🔹 8. Overrun Adjustment Recommendations by Part
-    part_overruns_raw = db.session.query(
-        JobHistory.part_name,
-        func.sum(JobHistory.planned_hours).label("total_planned"),
-        func.sum(JobHistory.actual_hours).label("total_actual"),
-        func.sum(overrun_case).label("total_overrun")
-    ).filter(
-        func.extract('year', JobHistory.operation_finish_date) == year,
-        JobHistory.actual_hours > JobHistory.planned_hours
-    ).group_by(JobHistory.part_name).having(func.sum(overrun_case) > 0).order_by(func.sum(overrun_case).desc()).limit(20).all()
+    part_overruns_raw, task_breakdown_raw = results["part_overruns"]
 
     part_overruns = [
         {
@@ -854,21 +915,6 @@ def get_yearly_summary_breakdown(year):
         for row in part_overruns_raw
     ]
 
-    # 🔹 9. Task-Level Overrun Breakdown (for parts above)
-    tracked_parts = [row.part_name for row in part_overruns_raw]
-
-    task_breakdown_raw = db.session.query(
-        JobHistory.part_name,
-        JobHistory.task_description,
-        func.sum(JobHistory.planned_hours).label("total_planned"),
-        func.sum(JobHistory.actual_hours).label("total_actual"),
-        func.sum(overrun_case).label("total_overrun")
-    ).filter(
-        func.extract('year', JobHistory.operation_finish_date) == year,
-        JobHistory.actual_hours > JobHistory.planned_hours,
-        JobHistory.part_name.in_(tracked_parts)
-    ).group_by(JobHistory.part_name, JobHistory.task_description).having(func.sum(overrun_case) > 0).all()
-
     part_task_details = [
         {
             "part_name": row.part_name,
@@ -881,26 +927,9 @@ def get_yearly_summary_breakdown(year):
         for row in task_breakdown_raw
     ]
 
-
-    # 🔹 9. NCR Averages (All-Time)
-    years_with_ncr = db.session.query(
-        func.extract('year', JobHistory.operation_finish_date)
-    ).filter(
-        JobHistory.work_center.ilike("NCR")
-    ).distinct().all()
-    year_count = len(years_with_ncr)
-
-    total_ncr_cost = db.session.query(
-        func.sum(JobHistory.actual_hours * BURDEN_RATE)
-    ).filter(
-        JobHistory.work_center.ilike("NCR")
-    ).scalar() or 0
-
-    total_parts = db.session.query(
-        func.count(distinct(JobHistory.part_name))
-    ).filter(
-        JobHistory.work_center.ilike("NCR")
-    ).scalar() or 0
+    year_count = len(results["ncr_years"])
+    total_ncr_cost = results["ncr_cost"]
+    total_parts = results["ncr_parts"]
 
     ncr_averages = {
         "avg_ncr_cost_per_year": round(total_ncr_cost / year_count, 2) if year_count else 0,
@@ -908,7 +937,7 @@ def get_yearly_summary_breakdown(year):
     }
 
     # ✅ Final JSON Response
-    return jsonify({
+    return json_response({
         "summary": summary,
         "top_overruns": top_overruns,
         "ncr_summary": ncr_summary,
@@ -931,44 +960,46 @@ def get_ncr_part_details():
     year = request.args.get("year", type=int)
     part = request.args.get("part", type=str)
 
-    # 🔹 1. Specific Part Breakdown (year + part filter)
-    part_results = db.session.query(
-        JobHistory.job_number,
-        JobHistory.work_order_number,
-        func.sum(JobHistory.actual_hours).label("ncr_hours")
-    ).filter(
-        JobHistory.part_name == part,
-        JobHistory.work_center.ilike("NCR"),
-        func.extract('year', JobHistory.operation_finish_date) == year
-    ).group_by(JobHistory.job_number, JobHistory.work_order_number).all()
+    # 🔹 1. Specific Part Breakdown (year + part filter); empty without a numeric year
+    part_results = []
+    if year is not None:
+        part_results = db.session.query(
+            JobHistory.job_number,
+            JobHistory.work_order_number,
+            func.sum(JobHistory.actual_hours).label("ncr_hours")
+        ).filter(
+            JobHistory.part_name == part,
+            equals_ci(JobHistory.work_center, "NCR"),
+            year_range(JobHistory.operation_finish_date, year)
+        ).group_by(JobHistory.job_number, JobHistory.work_order_number).all()
 
     # 🔹 2. All-Time Summary Stats
     # Get distinct years with NCR activity
     years_with_ncr = db.session.query(
         func.extract('year', JobHistory.operation_finish_date).label("yr")
     ).filter(
-        JobHistory.work_center.ilike("NCR")
+        equals_ci(JobHistory.work_center, "NCR")
     ).distinct().all()
     year_count = len(years_with_ncr)
 
     # Total NCR cost and part count across all years
     total_ncr_cost = db.session.query(
-        func.sum(JobHistory.actual_hours * 199)
+        func.sum(JobHistory.actual_hours * sql_burden_rate(JobHistory.__table__))
     ).filter(
-        JobHistory.work_center.ilike("NCR")
+        equals_ci(JobHistory.work_center, "NCR")
     ).scalar() or 0
 
     total_parts = db.session.query(
         func.count(distinct(JobHistory.part_name))
     ).filter(
-        JobHistory.work_center.ilike("NCR")
+        equals_ci(JobHistory.work_center, "NCR")
     ).scalar() or 0
 
     # 🔹 3. Safe averages
     avg_cost_per_year = total_ncr_cost / year_count if year_count else 0
     avg_parts_per_year = total_parts / year_count if year_count else 0
 
-    return jsonify({
+    return json_response({
         "job_data": [
             {
                 "job_number": row.job_number,
@@ -983,19 +1014,155 @@ def get_ncr_part_details():
     })
 
 
+# Summary endpoints read the per-year rollup tables kept current by the upload
+# (utils/summary_tables), so their cost depends on the number of years, customers
+# and parts rather than on the size of job_history. The statements are built once
+# at import; SQLAlchemy caches their compiled SQL (see utils/db_engine.QUERY_CACHE_SIZE).
+from sqlalchemy import select
+from utils.summary_tables import (
+    ensure_summary_tables,
+    summary_customer_year,
+    summary_part_job_year,
+    summary_part_year,
+    summary_tables_current,
+    summary_workcenter_year,
+    summary_yearly
+)
+
+
+# Pool sizing and statement caching come from the app's engine options, set before
+# db.init_app(app):
+#     app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+# The per-connection SQLite settings (WAL, busy timeout) are installed here,
+# before the startup hooks below open any connection.
+@workhistory_api.record_once
+def tune_engine(state):
+    with state.app.app_context():
+        configure_engine(db.engine)
+
+
+@workhistory_api.record_once
+def create_job_history_indexes(state):
+    """Index the lower()-normalized text columns and finish date used by the workhistory filters."""
+    with state.app.app_context():
+        with db.engine.begin() as conn:
+            create_search_indexes(conn, JobHistory.__table__)
+
+
+@workhistory_api.record_once
+def create_summary_tables(state):
+    """Build the summary tables from job_history if this database doesn't have them yet."""
+    with state.app.app_context():
+        with db.engine.begin() as conn:
+            ensure_summary_tables(conn, JobHistory.__table__)
+
+
+def ensure_current_summary_costs():
+    """Rebuild the summary tables first if the labor rates changed since their costs were computed."""
+    if not summary_tables_current():
+        with db.engine.begin() as conn:
+            ensure_summary_tables(conn, JobHistory.__table__)
+
+
+# SQL timing: per-statement stats for every endpoint, slow statements logged
+# to "workhistory.slow_sql" (threshold: WORKHISTORY_SLOW_QUERY_MS)
+from utils.sql_stats import (
+    SLOW_QUERY_MS,
+    endpoint_totals,
+    install_sql_stats,
+    reset_sql_stats,
+    top_statements
+)
+
+LOCAL_ADDRESSES = ("127.0.0.1", "::1")
+
+
+@workhistory_api.record_once
+def enable_sql_stats(state):
+    with state.app.app_context():
+        install_sql_stats(db.engine)
+
+
+@workhistory_api.route("/debug/sql-stats", methods=["GET", "DELETE"])
+def sql_stats():
+    """Top statements by total time and SQL time per endpoint (local requests only)."""
+    if request.remote_addr not in LOCAL_ADDRESSES:
+        return json_response({"error": "Not found"}, status=404)
+
+    if request.method == "DELETE":
+        reset_sql_stats()
+        return json_response({"status": "reset"})
+
+    limit = request.args.get("limit", 20, type=int)
+    return json_response({
+        "threshold_ms": SLOW_QUERY_MS,
+        "endpoints": endpoint_totals(),
+        "statements": top_statements(limit)
+    })
+
+
+YEARLY_SUMMARY_STMT = select(
+    summary_yearly.c.year,
+    summary_yearly.c.work_orders,
+    summary_yearly.c.unique_parts,
+    summary_yearly.c.planned_hours,
+    summary_yearly.c.actual_hours,
+    summary_yearly.c.actual_cost
+).order_by(summary_yearly.c.year)
+
+CUSTOMER_SUMMARY_STMT = select(
+    summary_customer_year.c.customer_name,
+    func.sum(summary_customer_year.c.planned_hours).label("planned_hours"),
+    func.sum(summary_customer_year.c.actual_hours).label("actual_hours"),
+    (func.sum(summary_customer_year.c.planned_cost) - func.sum(summary_customer_year.c.actual_cost)).label("profit_loss")
+).group_by(summary_customer_year.c.customer_name).order_by(func.sum(summary_customer_year.c.actual_hours).desc())
+
+# Work orders are counted once per part across all years from the (part, work order) pairs
+PART_JOB_COUNTS = select(
+    summary_part_job_year.c.part_name,
+    func.count(func.distinct(summary_part_job_year.c.work_order_number)).label("job_count")
+).group_by(summary_part_job_year.c.part_name).subquery()
+
+PART_TOTALS = select(
+    summary_part_year.c.part_name,
+    func.sum(summary_part_year.c.planned_hours).label("planned_hours"),
+    func.sum(summary_part_year.c.actual_hours).label("actual_hours"),
+    func.sum(summary_part_year.c.planned_cost).label("planned_cost"),
+    func.sum(summary_part_year.c.actual_cost).label("actual_cost")
+).group_by(summary_part_year.c.part_name).subquery()
+
+PART_SUMMARY_STMT = select(
+    PART_TOTALS.c.part_name,
+    func.coalesce(PART_JOB_COUNTS.c.job_count, 0).label("job_count"),
+    PART_TOTALS.c.planned_hours,
+    PART_TOTALS.c.actual_hours,
+    (PART_TOTALS.c.planned_cost - PART_TOTALS.c.actual_cost).label("roi")
+).outerjoin(
+    PART_JOB_COUNTS, PART_TOTALS.c.part_name.is_not_distinct_from(PART_JOB_COUNTS.c.part_name)
+).order_by(PART_TOTALS.c.actual_hours.desc()).limit(100)
+
+WORKCENTER_SUMMARY_STMT = select(
+    summary_workcenter_year.c.work_center,
+    func.sum(summary_workcenter_year.c.operations).label("operations"),
+    func.sum(summary_workcenter_year.c.planned_hours).label("planned_hours"),
+    func.sum(summary_workcenter_year.c.actual_hours).label("actual_hours"),
+    (func.sum(summary_workcenter_year.c.actual_cost) - func.sum(summary_workcenter_year.c.planned_cost)).label("overrun_cost")
+).group_by(summary_workcenter_year.c.work_center).order_by(func.sum(summary_workcenter_year.c.actual_hours).desc())
+
+TRENDS_STMT = select(
+    summary_yearly.c.year,
+    summary_yearly.c.actual_cost.label("total_cost")
+).order_by(summary_yearly.c.year)
+
+
 # 1. Yearly Summary - Main page
 @workhistory_api.route("/api/workhistory/summary/yearly")
+@conditional()
 def get_yearly_summary():
-    results = db.session.query(
-        func.extract('year', JobHistory.operation_finish_date).label("year"),
-        func.count(func.distinct(JobHistory.work_order_number)).label("work_orders"),
-        func.count(func.distinct(JobHistory.part_name)).label("unique_parts"),
-        func.sum(JobHistory.planned_hours).label("planned_hours"),
-        func.sum(JobHistory.actual_hours).label("actual_hours"),
-        (func.sum(JobHistory.actual_hours) * BURDEN_RATE).label("actual_cost")
-    ).group_by("year").order_by("year").all()
+    ensure_current_summary_costs()
+    results = db.session.execute(YEARLY_SUMMARY_STMT).all()
 
-    return jsonify([dict(row._asdict()) for row in results])
+    return json_response([dict(row._asdict()) for row in results])
 
 @workhistory_api.route("/api/workhistory/summary/full")
 def get_full_summary():
@@ -1003,22 +1170,9 @@ def get_full_summary():
     import logging
 
     logger = logging.getLogger(__name__)
-    BURDEN_RATE = 199
+    rate = sql_burden_rate(JobHistory.__table__)
 
     try:
-        # 🔍 Print sample records
-        sample_rows = db.session.query(
-            JobHistory.job_number,
-            JobHistory.task_description,
-            JobHistory.planned_hours,
-            JobHistory.actual_hours,
-            JobHistory.operation_finish_date,
-            JobHistory.recorded_date
-        ).limit(5).all()
-
-        for row in sample_rows:
-            logger.info(f"🔍 Sample Job: {row}")
-
         # ✅ Safe CASE syntax for SQLAlchemy 2.x
         overrun_case = case(
             (JobHistory.actual_hours > JobHistory.planned_hours,
@@ -1032,23 +1186,69 @@ def get_full_summary():
         )
 
 
+        # 🔍 Sample records (for the log)
+        def sample_query(session):
+            return session.query(
+                JobHistory.job_number,
+                JobHistory.task_description,
+                JobHistory.planned_hours,
+                JobHistory.actual_hours,
+                JobHistory.operation_finish_date,
+                JobHistory.recorded_date
+            ).limit(5).all()
+
         # --- Summary Metrics ---
-        summary_result = db.session.query(
-            func.sum(JobHistory.planned_hours),
-            func.sum(JobHistory.actual_hours),
-            func.sum(overrun_case),
-            func.sum(JobHistory.actual_hours * BURDEN_RATE),
-            func.sum(JobHistory.planned_hours * BURDEN_RATE),
-            func.count(JobHistory.id),
-            func.count(func.distinct(JobHistory.job_number)),
-            func.count(func.distinct(JobHistory.customer_name)),
-            func.sum(ncr_case),
-            func.count(func.distinct(JobHistory.part_name))
-        ).first()
+        def summary_query(session):
+            return session.query(
+                func.sum(JobHistory.planned_hours),
+                func.sum(JobHistory.actual_hours),
+                func.sum(overrun_case),
+                func.sum(JobHistory.actual_hours * rate),
+                func.sum(JobHistory.planned_hours * rate),
+                func.count(JobHistory.id),
+                func.count(func.distinct(JobHistory.job_number)),
+                func.count(func.distinct(JobHistory.customer_name)),
+                func.sum(ncr_case),
+                func.count(func.distinct(JobHistory.part_name))
+            ).first()
+
+        # --- Yearly Breakdown ---
+        def yearly_query(session):
+            return session.query(
+                func.extract('year', JobHistory.operation_finish_date).label("year"),
+                func.sum(JobHistory.planned_hours),
+                func.sum(JobHistory.actual_hours),
+                func.sum(overrun_case),
+                func.sum(ncr_case),
+                func.count(func.distinct(JobHistory.job_number)),
+                func.count(JobHistory.id),
+                func.count(func.distinct(JobHistory.customer_name))
+            ).group_by("year").order_by("year").all()
+
+        # --- Work Center Breakdown ---
+        def wc_query(session):
+            return session.query(
+                JobHistory.work_center,
+                func.sum(JobHistory.planned_hours),
+                func.sum(JobHistory.actual_hours),
+                func.sum(overrun_case)
+            ).group_by(JobHistory.work_center).order_by(func.sum(JobHistory.actual_hours).desc()).all()
+
+        # The four queries are independent, so run them concurrently
+        results = run_queries(db.engine, {
+            "sample": sample_query,
+            "summary": summary_query,
+            "yearly": yearly_query,
+            "workcenters": wc_query
+        })
+
+        for row in results["sample"]:
+            logger.info(f"🔍 Sample Job: {row}")
 
+        summary_result = results["summary"]
         if not summary_result:
             logger.warning("No data returned in summary query.")
-            return jsonify({"error": "No data found"}), 404
+            return json_response({"error": "No data found"}), 404
 
         summary = {
             "total_planned_hours": float(summary_result[0] or 0),
@@ -1063,20 +1263,8 @@ def get_full_summary():
             "total_unique_parts": int(summary_result[9] or 0)
         }
 
-        # --- Yearly Breakdown ---
-        yearly_query = db.session.query(
-            func.extract('year', JobHistory.operation_finish_date).label("year"),
-            func.sum(JobHistory.planned_hours),
-            func.sum(JobHistory.actual_hours),
-            func.sum(overrun_case),
-            func.sum(ncr_case),
-            func.count(func.distinct(JobHistory.job_number)),
-            func.count(JobHistory.id),
-            func.count(func.distinct(JobHistory.customer_name))
-        ).group_by("year").order_by("year").all()
-
         yearly_breakdown = []
-        for row in yearly_query:
+        for row in results["yearly"]:
             try:
                 yearly_breakdown.append({
                     "year": int(row[0]) if row[0] else None,
@@ -1091,16 +1279,8 @@ def get_full_summary():
             except Exception as e:
                 logger.warning(f"⚠️ Failed to parse yearly row: {row} → {e}")
 
-        # --- Work Center Breakdown ---
-        wc_query = db.session.query(
-            JobHistory.work_center,
-            func.sum(JobHistory.planned_hours),
-            func.sum(JobHistory.actual_hours),
-            func.sum(overrun_case)
-        ).group_by(JobHistory.work_center).order_by(func.sum(JobHistory.actual_hours).desc()).all()
-
         workcenter_breakdown = []
-        for row in wc_query:
+        for row in results["workcenters"]:
             try:
                 workcenter_breakdown.append({
                     "work_center": row[0] or "UNKNOWN",
@@ -1113,7 +1293,7 @@ def get_full_summary():
 
         logger.info("✅ Full summary API returned successfully.")
 
-        return jsonify({
+        return json_response({
             "summary": summary,
             "yearly_breakdown": yearly_breakdown,
             "workcenter_breakdown": workcenter_breakdown
@@ -1121,50 +1301,39 @@ def get_full_summary():
 
     except Exception as e:
         logger.exception("❌ Error in /summary/full API")
-        return jsonify({"error": "Internal server error", "details": str(e)}), 500
+        return json_response({"error": "Internal server error", "details": str(e)}), 500
 
 
 
 
 # 2. Customer Profitability Summary
 @workhistory_api.route("/api/workhistory/summary/customers")
+@conditional()
 def get_customer_summary():
-    results = db.session.query(
-        JobHistory.customer_name,
-        func.sum(JobHistory.planned_hours).label("planned_hours"),
-        func.sum(JobHistory.actual_hours).label("actual_hours"),
-        ((func.sum(JobHistory.planned_hours) - func.sum(JobHistory.actual_hours)) * BURDEN_RATE).label("profit_loss")
-    ).group_by(JobHistory.customer_name).order_by(func.sum(JobHistory.actual_hours).desc()).all()
+    ensure_current_summary_costs()
+    results = db.session.execute(CUSTOMER_SUMMARY_STMT).all()
 
-    return jsonify([dict(row._asdict()) for row in results])
+    return json_response([dict(row._asdict()) for row in results])
 
 
 # 3. Part Performance Summary
 @workhistory_api.route("/api/workhistory/summary/parts")
+@conditional()
 def get_part_summary():
-    results = db.session.query(
-        JobHistory.part_name,
-        func.count(func.distinct(JobHistory.work_order_number)).label("job_count"),
-        func.sum(JobHistory.planned_hours).label("planned_hours"),
-        func.sum(JobHistory.actual_hours).label("actual_hours"),
-        ((func.sum(JobHistory.planned_hours) - func.sum(JobHistory.actual_hours)) * BURDEN_RATE).label("roi")
-    ).group_by(JobHistory.part_name).order_by(func.sum(JobHistory.actual_hours).desc()).limit(100).all()
+    ensure_current_summary_costs()
+    results = db.session.execute(PART_SUMMARY_STMT).all()
 
-    return jsonify([dict(row._asdict()) for row in results])
+    return json_response([dict(row._asdict()) for row in results])
 
 
 # 4. Work Center Trends
 @workhistory_api.route("/api/workhistory/summary/workcenters")
+@conditional()
 def get_workcenter_summary():
-    results = db.session.query(
-        JobHistory.work_center,
-        func.count(JobHistory.operation_number).label("operations"),
-        func.sum(JobHistory.planned_hours).label("planned_hours"),
-        func.sum(JobHistory.actual_hours).label("actual_hours"),
-        ((func.sum(JobHistory.actual_hours) - func.sum(JobHistory.planned_hours)) * BURDEN_RATE).label("overrun_cost")
-    ).group_by(JobHistory.work_center).order_by(func.sum(JobHistory.actual_hours).desc()).all()
+    ensure_current_summary_costs()
+    results = db.session.execute(WORKCENTER_SUMMARY_STMT).all()
 
-    return jsonify([dict(row._asdict()) for row in results])
+    return json_response([dict(row._asdict()) for row in results])
 
 
 # 5. Deep Dive Filtering
@@ -1176,19 +1345,20 @@ def filter_work_history():
     work_center = request.args.get("work_center")
 
     query = db.session.query(JobHistory)
+    dialect = db.engine.dialect.name
 
     if year:
-        query = query.filter(func.extract('year', JobHistory.operation_finish_date) == int(year))
+        query = query.filter(year_range(JobHistory.operation_finish_date, int(year)))
     if customer:
-        query = query.filter(JobHistory.customer_name.ilike(f"%{customer}%"))
+        query = query.filter(contains_ci(JobHistory.customer_name, customer, dialect))
     if part:
-        query = query.filter(JobHistory.part_name.ilike(f"%{part}%"))
+        query = query.filter(contains_ci(JobHistory.part_name, part, dialect))
     if work_center:
-        query = query.filter(JobHistory.work_center.ilike(f"%{work_center}%"))
+        query = query.filter(contains_ci(JobHistory.work_center, work_center, dialect))
 
     records = query.limit(1000).all()
 
-    return jsonify([
+    return json_response([
         {
             "job_number": r.job_number,
             "customer_name": r.customer_name,
@@ -1204,12 +1374,11 @@ def filter_work_history():
 
 # 6. Trend Analysis (rolling yearly cost)
 @workhistory_api.route("/api/workhistory/trends")
+@conditional()
 def get_trends():
-    results = db.session.query(
-        func.extract('year', JobHistory.operation_finish_date).label("year"),
-        func.sum(JobHistory.actual_hours * BURDEN_RATE).label("total_cost")
-    ).group_by("year").order_by("year").all()
+    ensure_current_summary_costs()
+    results = db.session.execute(TRENDS_STMT).all()
 
-    return jsonify([dict(row._asdict()) for row in results])
+    return json_response([dict(row._asdict()) for row in results])
 
 # End Work history python code----------------------------------------------------------------------------------------------------------------
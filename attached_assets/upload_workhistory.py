@@ -1,8 +1,15 @@
+import os
+import uuid
 import pandas as pd
 import logging
 from datetime import datetime
+from sqlalchemy import Column, Index, MetaData, Table, and_, exists, func, insert, or_, select, union
+from sqlalchemy.dialects import postgresql, sqlite
 from app import app, db  # ✅ Ensure proper database connection
 from setup_database import JobHistory  # ✅ Use JobHistory model
+from utils.data_utils import upload_invalidation_tags
+from utils.data_version import bump_data_version
+from utils.summary_tables import ensure_summary_tables, refresh_summary_tables
 
 # ✅ Column Mapping for Consistency
 COLUMN_MAPPING = {
@@ -28,6 +35,132 @@ CALCULATED_FIELDS = [
 
 WORKHISTORY_FILE = "C:/Users/srava/Downloads/WORKHISTORY.xlsx"
 
+# ✅ Rows per INSERT batch; each batch is committed on its own
+CHUNK_SIZE = int(os.environ.get("WORKHISTORY_UPLOAD_CHUNK_SIZE", "5000"))
+
+# ✅ An operation is identified by job, work order and operation number
+KEY_COLUMNS = ['job_number', 'work_order_number', 'operation_number']
+
+# ✅ Columns refreshed on existing operations when their hours changed
+UPDATE_COLUMNS = [
+    'planned_hours', 'actual_hours', 'work_center', 'part_name',
+    'task_description', 'customer_name', 'operation_finish_date', 'recorded_date'
+]
+
+# ✅ Each upload stages into its own table (prefix + random suffix), so concurrent
+# uploads never truncate or merge each other's rows
+STAGING_TABLE_PREFIX = "job_history_staging"
+
+
+def get_staging_table(columns):
+    """Build a staging table for one upload with the job_history column types for the uploaded columns."""
+    source = JobHistory.__table__
+    return Table(
+        f"{STAGING_TABLE_PREFIX}_{uuid.uuid4().hex}", MetaData(),
+        *[Column(c.name, c.type) for c in source.columns if c.name in columns]
+    )
+
+
+def ensure_unique_operation_index():
+    """Create the unique composite index ON CONFLICT relies on (no-op if it exists)."""
+    table = JobHistory.__table__
+    index = Index("uq_job_history_operation", *[table.c[col] for col in KEY_COLUMNS], unique=True)
+    with db.engine.begin() as conn:
+        index.create(conn, checkfirst=True)
+
+
+def merge_staging(staging):
+    """
+    Upsert staged rows into job_history in a single statement.
+
+    New operations are inserted; existing ones are updated only when their hours changed.
+    The summary tables are refreshed for the affected years in the same transaction.
+    Returns (inserted, updated, unchanged) counts and the set of years touched.
+    """
+    table = JobHistory.__table__
+    key_match = and_(*[table.c[col] == staging.c[col] for col in KEY_COLUMNS])
+    # ✅ IS DISTINCT FROM: a NULL stored hour compared with a staged value counts as changed
+    hours_changed = or_(
+        table.c.planned_hours.is_distinct_from(staging.c.planned_hours),
+        table.c.actual_hours.is_distinct_from(staging.c.actual_hours)
+    )
+
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        insert_func = postgresql.insert
+    elif dialect == "sqlite":
+        insert_func = sqlite.insert
+    else:
+        raise RuntimeError(f"Upsert is not supported for the {dialect} dialect")
+
+    columns = [c.name for c in staging.columns]
+    # "WHERE true" keeps SQLite from parsing ON CONFLICT as part of the SELECT's join
+    stmt = insert_func(table).from_select(columns, select(staging).where(True))
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=KEY_COLUMNS,
+        set_={col: excluded[col] for col in UPDATE_COLUMNS if col in columns},
+        where=or_(
+            table.c.planned_hours.is_distinct_from(excluded.planned_hours),
+            table.c.actual_hours.is_distinct_from(excluded.actual_hours)
+        )
+    )
+
+    with db.engine.begin() as conn:
+        staged = conn.execute(select(func.count()).select_from(staging)).scalar()
+        # ✅ Anti-join / join counts so the log reports what the merge will do
+        inserted = conn.execute(
+            select(func.count()).select_from(staging).where(~exists().where(key_match))
+        ).scalar()
+        updated = conn.execute(
+            select(func.count()).select_from(staging.join(table, key_match)).where(hours_changed)
+        ).scalar()
+
+        # ✅ Years touched: new rows, plus old and new years of changed rows
+        staged_year = func.extract('year', staging.c.operation_finish_date)
+        stored_year = func.extract('year', table.c.operation_finish_date)
+        touched = union(
+            select(staged_year).where(~exists().where(key_match)),
+            select(staged_year).select_from(staging.join(table, key_match)).where(hours_changed),
+            select(stored_year).select_from(staging.join(table, key_match)).where(hours_changed)
+        )
+        years = {y for (y,) in conn.execute(touched)}
+
+        conn.execute(stmt)
+
+        ensure_summary_tables(conn, table)
+        refresh_summary_tables(conn, table, years)
+        if years:
+            logging.info(f"📊 Refreshed summary tables for years: {sorted(years, key=str)}")
+
+    return inserted, updated, staged - inserted - updated, years
+
+
+def bulk_insert_rows(df, table, chunk_size=CHUNK_SIZE):
+    """
+    Insert DataFrame rows into a table with Core executemany, one transaction per chunk.
+
+    A failing chunk is rolled back and logged without losing the chunks before it.
+    Returns (inserted_rows, failed_rows).
+    """
+    total = len(df)
+    inserted = 0
+    failed = 0
+
+    for start in range(0, total, chunk_size):
+        records = df.iloc[start:start + chunk_size].to_dict(orient="records")
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(insert(table), records)
+            inserted += len(records)
+        except Exception as e:
+            failed += len(records)
+            logging.error(f"❌ Rows {start + 1}-{start + len(records)} failed to insert: {e}")
+
+        logging.info(f"📦 Upload progress: {min(start + chunk_size, total)}/{total} rows processed")
+
+    return inserted, failed
+
 
 def process_workhistory(file_path):
     """Processes and uploads WORKHISTORY Excel data into job_history table."""
@@ -73,37 +206,32 @@ def process_workhistory(file_path):
         # ✅ Remove duplicates before insert
         df.drop_duplicates(subset=['job_number', 'work_order_number', 'operation_number'], inplace=True)
 
-        # ✅ Check Existing Entries in Database
-        with app.app_context():
-            existing_records = db.session.query(
-                JobHistory.job_number,
-                JobHistory.work_order_number,
-                JobHistory.operation_number
-            ).all()
+        # ✅ Replace any lingering NaN/NaT before insert
+        df = df.where(pd.notnull(df), None)
 
-            existing_set = set((r.job_number, r.work_order_number, r.operation_number) for r in existing_records)
-            logging.info(f"🔍 Existing records loaded: {len(existing_set)} entries.")
-
-            new_df = df[~df.apply(
-                lambda row: (row['job_number'], row['work_order_number'], row['operation_number']) in existing_set,
-                axis=1
-            )]
-
-            skipped = len(df) - len(new_df)
-            logging.info(f"🔄 Rows skipped due to duplication: {skipped}")
-
-            # ✅ Replace any lingering NaN/NaT before insert
-            new_df = new_df.where(pd.notnull(new_df), None)
-
-            job_entries = [JobHistory(**row) for row in new_df.to_dict(orient='records')]
-            db.session.bulk_save_objects(job_entries)
+        # ✅ Stage the file, then let the database dedup against job_history
+        with app.app_context():
+            ensure_unique_operation_index()
 
+            staging = get_staging_table(df.columns)
+            staging.create(db.engine)
             try:
-                db.session.commit()
-                logging.info(f"✅ Successfully uploaded {len(job_entries)} new records into job_history.")
-            except Exception as e:
-                db.session.rollback()
-                logging.error(f"❌ Bulk insertion failed: {e}")
+                staged, failed = bulk_insert_rows(df, staging)
+                if failed:
+                    logging.error(f"❌ {failed} records failed to stage.")
+
+                inserted, updated, unchanged, years = merge_staging(staging)
+            finally:
+                staging.drop(db.engine, checkfirst=True)
+
+            logging.info(f"✅ Uploaded {inserted} new records into job_history.")
+            logging.info(f"🔁 Updated {updated} existing records whose hours changed.")
+            logging.info(f"🔄 Rows skipped as unchanged duplicates: {unchanged}")
+
+            # ✅ Invalidate cached API responses (ETags are keyed by data version)
+            # and the cached results for the years this upload touched
+            if inserted or updated:
+                bump_data_version(upload_invalidation_tags(years))
 
     except Exception as e:
         logging.error(f"❌ Error processing WORKHISTORY file: {e}")
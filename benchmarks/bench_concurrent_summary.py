@@ -0,0 +1,167 @@
+"""
+Benchmark: concurrent summary queries against SQLite while an upload is writing
+
+Compares SQLAlchemy's default SQLite setup with utils/db_engine (WAL, busy
+timeout, pool sizing, statement caching). Run from the repository root:
+
+    python benchmarks/bench_concurrent_summary.py --rows 200000 --readers 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import (Column, Date, Float, Integer, MetaData, String, Table,
+                        create_engine, func, insert, select)
+from sqlalchemy.exc import OperationalError
+
+from utils.db_engine import create_workhistory_engine
+
+metadata = MetaData()
+
+# Mirrors the job_history columns the summary endpoints read
+job_history = Table(
+    "job_history", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("job_number", String),
+    Column("work_order_number", String),
+    Column("operation_number", Float),
+    Column("work_center", String),
+    Column("part_name", String),
+    Column("customer_name", String),
+    Column("planned_hours", Float),
+    Column("actual_hours", Float),
+    Column("operation_finish_date", Date)
+)
+
+WORK_CENTERS = ["MILLING", "LATHE", "ASSEMBLY", "WELDING", "INSPECTION", "NCR", "FINISHING"]
+CUSTOMERS = [f"Customer {i}" for i in range(40)]
+
+# Same shape as the /summary/workcenters and /summary/yearly queries
+SUMMARY_STMTS = [
+    select(
+        job_history.c.work_center,
+        func.count(job_history.c.operation_number),
+        func.sum(job_history.c.planned_hours),
+        func.sum(job_history.c.actual_hours)
+    ).group_by(job_history.c.work_center),
+    select(
+        func.strftime("%Y", job_history.c.operation_finish_date).label("year"),
+        func.count(func.distinct(job_history.c.work_order_number)),
+        func.sum(job_history.c.planned_hours),
+        func.sum(job_history.c.actual_hours)
+    ).group_by("year")
+]
+
+
+def make_rows(count, start_id=0):
+    rng = random.Random(start_id)
+    base = date(2018, 1, 1)
+    rows = []
+    for i in range(start_id, start_id + count):
+        planned = rng.uniform(1, 40)
+        rows.append({
+            "job_number": f"J{i // 20:06d}",
+            "work_order_number": f"WO{i // 5:07d}",
+            "operation_number": float(i % 5 * 10),
+            "work_center": rng.choice(WORK_CENTERS),
+            "part_name": f"PART-{rng.randint(1, 500):03d}",
+            "customer_name": rng.choice(CUSTOMERS),
+            "planned_hours": planned,
+            "actual_hours": planned * rng.uniform(0.7, 1.5),
+            "operation_finish_date": base + timedelta(days=rng.randint(0, 7 * 365))
+        })
+    return rows
+
+
+def run(engine, label, rows, readers, upload_chunks, chunk_size):
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        for offset in range(0, rows, 50000):
+            conn.execute(insert(job_history), make_rows(min(50000, rows - offset), offset))
+
+    stop = threading.Event()
+    counts = [0] * readers
+    errors = [0] * readers
+    latencies = []
+    upload_time = [0.0]
+    writer_retries = [0]
+
+    def reader(index):
+        while not stop.is_set():
+            try:
+                request_started = time.perf_counter()
+                with engine.connect() as conn:
+                    for stmt in SUMMARY_STMTS:
+                        conn.execute(stmt).all()
+                latencies.append(time.perf_counter() - request_started)
+                counts[index] += 1
+            except OperationalError:
+                errors[index] += 1
+
+    def writer():
+        started = time.perf_counter()
+        next_id = rows
+        for _ in range(upload_chunks):
+            batch = make_rows(chunk_size, next_id)
+            next_id += chunk_size
+            while True:
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(job_history), batch)
+                    break
+                except OperationalError:
+                    writer_retries[0] += 1
+                    time.sleep(0.01)
+        upload_time[0] = time.perf_counter() - started
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    upload = threading.Thread(target=writer)
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    upload.start()
+    # Readers run for as long as the upload takes
+    upload.join()
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0
+    print(f"{label:<8} {sum(counts) / elapsed:>8.1f} req/s {p95:>9.0f} ms {sum(errors):>8} "
+          f"{upload_time[0]:>10.2f}s {writer_retries[0]:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--upload-chunks", type=int, default=20)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} rows, {args.readers} concurrent summary readers, "
+          f"upload of {args.upload_chunks} x {args.chunk_size:,} rows\n")
+    print(f"{'engine':<8} {'summary':>14} {'p95':>12} {'failed':>8} {'upload':>11} {'retries':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        default_uri = f"sqlite:///{os.path.join(tmp, 'default.db')}"
+        run(create_engine(default_uri),
+            "default", args.rows, args.readers, args.upload_chunks, args.chunk_size)
+
+        tuned_uri = f"sqlite:///{os.path.join(tmp, 'tuned.db')}"
+        run(create_workhistory_engine(tuned_uri),
+            "tuned", args.rows, args.readers, args.upload_chunks, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
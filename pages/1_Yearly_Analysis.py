@@ -6,7 +6,18 @@ from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime
 from utils.formatters import format_money, format_number, format_percent
-from utils.data_utils import load_year_data
+from utils.data_utils import (
+    SKETCH_DIMENSIONS,
+    get_date_index,
+    load_date_range_data,
+    load_overrun_distribution,
+    load_overrun_histogram,
+    load_year_data
+)
+from utils.date_range_picker import date_range_picker
+from utils.visualization import create_overrun_histogram
+from utils.pagination import paginate_frame
+from utils.paginated_table import paginated_table
 
 # Page configuration
 st.set_page_config(
@@ -118,14 +129,15 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Year selection - use only years that exist in the data
-from utils.data_utils import load_excel_data
+from utils.calendar_columns import available_years as dataset_years
+from utils.data_utils import get_dataset
 import pandas as pd
 
 # Load Excel file to get available years
 try:
-    df = load_excel_data()
-    if not df.empty and 'operation_finish_date' in df.columns:
-        available_years = sorted(df['operation_finish_date'].dt.year.unique().tolist())
+    df = get_dataset()
+    if not df.empty and 'year' in df.columns:
+        available_years = dataset_years(df)
     else:
         available_years = [2021, 2022, 2023]  # Default years if data not available
 except Exception as e:
@@ -193,8 +205,7 @@ def metric_card(title, value, delta=None, icon=None, color="#1E88E5", help_text=
     </div>
     """
 
-# Function to fetch and process yearly data
-@st.cache_data(ttl=3600)
+# Function to fetch and process yearly data (results are cached in the data layer)
 def get_yearly_data(selected_year):
     try:
         data = load_year_data(selected_year)
@@ -593,23 +604,28 @@ if data:
             # Create DataFrame for work centers
             wc_df = pd.DataFrame(data["workcenter_summary"])
             
-            # Format columns for display
-            display_wc = wc_df.copy()
-            display_wc["planned_hours"] = display_wc["planned_hours"].apply(format_number)
-            display_wc["actual_hours"] = display_wc["actual_hours"].apply(format_number)
-            display_wc["overrun_hours"] = display_wc["overrun_hours"].apply(format_number)
-            display_wc["overrun_cost"] = display_wc["overrun_cost"].apply(format_money)
-            
-            # Rename columns
-            display_wc = display_wc.rename(columns={
-                "work_center": "Work Center",
-                "planned_hours": "Planned",
-                "actual_hours": "Actual",
-                "overrun_hours": "Overrun",
-                "overrun_cost": "Cost"
-            })
-            
-            st.dataframe(display_wc, use_container_width=True, hide_index=True)
+            # Paged table; only the visible rows are formatted
+            paginated_table(
+                f"year_workcenters_{year}",
+                lambda page, page_size, sort_by, ascending, search: paginate_frame(
+                    wc_df, page, page_size, sort_by, ascending, search
+                ),
+                formats={
+                    "planned_hours": format_number,
+                    "actual_hours": format_number,
+                    "overrun_hours": format_number,
+                    "overrun_cost": format_money
+                },
+                rename={
+                    "work_center": "Work Center",
+                    "planned_hours": "Planned",
+                    "actual_hours": "Actual",
+                    "overrun_hours": "Overrun",
+                    "overrun_cost": "Cost"
+                },
+                sort_columns=["overrun_cost", "overrun_hours", "actual_hours", "planned_hours", "work_center"],
+                default_sort="overrun_cost"
+            )
             
             # Create work center chart
             fig = px.bar(
@@ -763,3 +779,139 @@ if data:
             st.info("No adjustment data available for this year.")
 else:
     st.warning(f"No data available for year {year}. Please select a different year or upload data.")
+
+# ---- OVERRUN RATIO DISTRIBUTION ----
+# Quantiles and histograms are read from per-year sketches rather than sorting the operations
+st.divider()
+st.subheader("Overrun Ratio Distribution")
+st.caption("Actual / planned hours per operation: 1.0× is on plan, 1.5× is a 50% overrun.")
+
+dist_labels = {"work_center": "Work Center", "part_name": "Part"}
+dist_col1, dist_col2 = st.columns([1, 3])
+with dist_col1:
+    dist_dimension = st.selectbox(
+        "Group by", list(SKETCH_DIMENSIONS), format_func=lambda x: dist_labels.get(x, x), key="dist_dimension"
+    )
+    dist_all_years = st.checkbox("All years", key="dist_all_years")
+dist_year = None if dist_all_years else year
+
+try:
+    distribution = load_overrun_distribution(dist_dimension, dist_year)
+except Exception as e:
+    st.error(f"Error loading overrun distribution: {str(e)}")
+    distribution = None
+
+if distribution and distribution["overall"]["count"]:
+    overall = distribution["overall"]
+    with dist_col2:
+        q_col1, q_col2, q_col3, q_col4 = st.columns(4)
+        with q_col1:
+            st.metric("Planned Operations", format_number(overall["count"], 0))
+        with q_col2:
+            st.metric("Median (p50)", f"{overall['p50']:.2f}×")
+        with q_col3:
+            st.metric("p90", f"{overall['p90']:.2f}×")
+        with q_col4:
+            st.metric("p99", f"{overall['p99']:.2f}×")
+    
+    hist_col, table_col = st.columns(2)
+    with table_col:
+        dist_df = pd.DataFrame(distribution["groups"])
+        if not dist_df.empty:
+            focus_options = ["All"] + dist_df[dist_dimension].tolist()
+            focus = st.selectbox(f"Histogram for {dist_labels.get(dist_dimension, dist_dimension)}", focus_options, key="dist_focus")
+            for col in ["p50", "p90", "p99"]:
+                dist_df[col] = dist_df[col].apply(lambda x: f"{x:.2f}×" if x is not None else "-")
+            dist_df = dist_df.rename(columns={
+                dist_dimension: dist_labels.get(dist_dimension, dist_dimension),
+                "count": "Operations",
+                "p50": "p50",
+                "p90": "p90",
+                "p99": "p99"
+            })
+            st.dataframe(dist_df, use_container_width=True, hide_index=True)
+        else:
+            focus = "All"
+    with hist_col:
+        histogram = load_overrun_histogram(
+            dist_dimension if focus != "All" else None,
+            focus if focus != "All" else None,
+            dist_year
+        )
+        st.plotly_chart(
+            create_overrun_histogram(histogram, f"Overrun Ratio - {focus if focus != 'All' else 'All Operations'}"),
+            use_container_width=True
+        )
+else:
+    st.info("No planned operations available for an overrun distribution.")
+
+# ---- CUSTOM PERIOD ----
+# Any date range (trailing window, fiscal year, custom dates) is a slice of the finish-date index
+st.divider()
+st.subheader("Custom Period")
+date_index = get_date_index()
+if len(date_index):
+    start, end, range_label = date_range_picker("year_range", date_index.first_date, date_index.last_date, default="Fiscal year")
+    with st.spinner(f"Loading data for {range_label}..."):
+        range_data = load_date_range_data(start, end)
+    range_summary = range_data["summary"]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown(metric_card("Planned Hours", 
+                              format_number(range_summary["total_planned_hours"]),
+                              icon="⏱️"), unsafe_allow_html=True)
+    with col2:
+        st.markdown(metric_card("Actual Hours", 
+                              format_number(range_summary["total_actual_hours"]),
+                              icon="⌛"), unsafe_allow_html=True)
+    with col3:
+        st.markdown(metric_card("Overrun Hours", 
+                              format_number(range_summary["total_overrun_hours"]),
+                              icon="⚠️",
+                              color="#e5383b"), unsafe_allow_html=True)
+    with col4:
+        st.markdown(metric_card("Opportunity Cost", 
+                              format_money(range_summary["opportunity_cost_dollars"]),
+                              icon="💸",
+                              color="#e5383b"), unsafe_allow_html=True)
+    
+    range_col1, range_col2 = st.columns(2)
+    with range_col1:
+        st.markdown("**Work Centers**")
+        if range_data["workcenter_summary"]:
+            wc_range_df = pd.DataFrame(range_data["workcenter_summary"])
+            for col in ["planned_hours", "actual_hours", "overrun_hours"]:
+                wc_range_df[col] = wc_range_df[col].apply(format_number)
+            wc_range_df["overrun_cost"] = wc_range_df["overrun_cost"].apply(format_money)
+            wc_range_df = wc_range_df.rename(columns={
+                "work_center": "Work Center",
+                "job_count": "Jobs",
+                "planned_hours": "Planned",
+                "actual_hours": "Actual",
+                "overrun_hours": "Overrun",
+                "overrun_cost": "Overrun Cost"
+            })
+            st.dataframe(wc_range_df, use_container_width=True, hide_index=True)
+        else:
+            st.info("No work center data available for this period.")
+    with range_col2:
+        st.markdown("**Top Overruns**")
+        if range_data["top_overruns"]:
+            overrun_range_df = pd.DataFrame(range_data["top_overruns"])[
+                ["job_number", "part_name", "work_center", "overrun_hours", "overrun_cost"]
+            ]
+            overrun_range_df["overrun_hours"] = overrun_range_df["overrun_hours"].apply(format_number)
+            overrun_range_df["overrun_cost"] = overrun_range_df["overrun_cost"].apply(format_money)
+            overrun_range_df = overrun_range_df.rename(columns={
+                "job_number": "Job",
+                "part_name": "Part",
+                "work_center": "Work Center",
+                "overrun_hours": "Overrun",
+                "overrun_cost": "Overrun Cost"
+            })
+            st.dataframe(overrun_range_df, use_container_width=True, hide_index=True)
+        else:
+            st.info("No overrun data available for this period.")
+else:
+    st.info("No dated operations available.")
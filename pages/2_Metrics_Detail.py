@@ -3,7 +3,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from utils.formatters import format_money, format_number, format_percent
-from utils.data_utils import load_metric_data
+from utils.data_utils import METRIC_JOB_SORT, load_metric_data, load_metric_jobs_page, load_rolling_metric
+from utils.rolling_metrics import ROLLING_FREQUENCIES, ROLLING_METRICS
+from utils.visualization import create_rolling_chart
+from utils.paginated_table import paginated_table
 
 # Page configuration
 st.set_page_config(
@@ -29,19 +32,24 @@ METRICS = {
     "total_customers": "Total Customers"
 }
 
+# Unit of one rolling-trend period
+PERIOD_UNITS = {"D": "Day", "W": "Week", "M": "Month"}
+
 # Title and description
 st.title("📈 Metrics Detail Analysis")
 st.markdown("Detailed analysis of specific metrics across time periods, work centers, and customers.")
 
-# Metric selection
+# Metric selection (preselected when arriving from the dashboard search)
+metric_options = list(METRICS.keys())
+default_metric = st.session_state.get('selected_metric', metric_options[0])
 selected_metric = st.selectbox(
     "Select Metric to Analyze", 
-    options=list(METRICS.keys()), 
+    options=metric_options, 
+    index=metric_options.index(default_metric) if default_metric in metric_options else 0,
     format_func=lambda x: METRICS.get(x, x)
 )
 
-# Function to fetch and process metric data
-@st.cache_data(ttl=3600)
+# Function to fetch and process metric data (results are cached in the data layer)
 def get_metric_data(metric):
     try:
         data = load_metric_data(metric)
@@ -193,6 +201,68 @@ if data:
     else:
         st.info("No yearly trend data available for this metric.")
     
+    # ---- ROLLING TREND ----
+    st.subheader("Rolling Trend")
+    
+    if selected_metric in ROLLING_METRICS:
+        # Trailing windows are answered from prefix sums, so any window length costs the same
+        roll_col1, roll_col2, roll_col3, roll_col4 = st.columns(4)
+        with roll_col1:
+            rolling_freq = st.selectbox(
+                "Period",
+                options=list(ROLLING_FREQUENCIES),
+                index=list(ROLLING_FREQUENCIES).index("M"),
+                format_func=lambda x: ROLLING_FREQUENCIES[x],
+                key="rolling_freq"
+            )
+        with roll_col2:
+            default_window = {"D": 30, "W": 4, "M": 12}[rolling_freq]
+            rolling_window = st.number_input(
+                "Window (periods)", min_value=1, max_value=520, value=default_window, key=f"rolling_window_{rolling_freq}"
+            )
+        with roll_col3:
+            rolling_stat = st.selectbox(
+                "Statistic",
+                options=["sum", "mean"],
+                format_func=lambda x: "Window total" if x == "sum" else "Moving average",
+                key="rolling_stat",
+                disabled=ROLLING_METRICS[selected_metric][1] is not None
+            )
+        with roll_col4:
+            by_work_center = st.checkbox("By work center", key="rolling_by_wc")
+        
+        try:
+            rolling = load_rolling_metric(
+                selected_metric, rolling_freq, int(rolling_window), rolling_stat,
+                "work_center" if by_work_center else None
+            )
+            rolling_df = pd.DataFrame(rolling["series"])
+        except Exception as e:
+            st.error(f"Error loading rolling data for metric {selected_metric}: {str(e)}")
+            rolling_df = pd.DataFrame()
+        
+        if not rolling_df.empty:
+            if by_work_center:
+                work_centers = sorted(rolling_df["group"].dropna().unique().tolist())
+                shown = st.multiselect("Work centers", work_centers, default=work_centers[:5], key="rolling_groups")
+                rolling_df = rolling_df[rolling_df["group"].isin(shown)]
+            
+            window_label = f"{int(rolling_window)} {PERIOD_UNITS[rolling_freq]}"
+            st.plotly_chart(
+                create_rolling_chart(
+                    rolling_df,
+                    f"{METRICS[selected_metric]} - Trailing {window_label} Window",
+                    "Cost ($)" if "cost" in selected_metric else "Percent" if "percent" in selected_metric else "Hours" if "hours" in selected_metric else "Count",
+                    percent="percent" in selected_metric,
+                    money="cost" in selected_metric
+                ),
+                use_container_width=True
+            )
+        else:
+            st.info("No dated data available for a rolling trend.")
+    else:
+        st.info(f"Rolling trends are not available for {METRICS[selected_metric]}.")
+    
     # ---- BREAKDOWN BY CATEGORY ----
     tab1, tab2, tab3 = st.tabs(["By Customer", "By Work Center", "By Month"])
     
@@ -405,42 +475,26 @@ if data:
         # ---- RELATED JOBS DATA ----
         st.subheader("Jobs Related to This Metric")
         
-        if "related_jobs" in data and data["related_jobs"]:
-            jobs_df = pd.DataFrame(data["related_jobs"])
-            
-            # Metrics about the jobs
-            jobs_col1, jobs_col2, jobs_col3 = st.columns(3)
-            
-            with jobs_col1:
-                total_jobs = len(jobs_df)
-                st.metric("Total Related Jobs", format_number(total_jobs, 0))
-            
-            with jobs_col2:
-                if "planned_hours" in jobs_df.columns and "actual_hours" in jobs_df.columns:
-                    total_variance = (jobs_df["actual_hours"].sum() - jobs_df["planned_hours"].sum())
-                    st.metric("Total Hours Variance", format_number(total_variance))
-                else:
-                    st.metric("Total Jobs Value", format_number(jobs_df["value"].sum() if "value" in jobs_df.columns else 0))
-            
-            with jobs_col3:
-                if "planned_hours" in jobs_df.columns and "actual_hours" in jobs_df.columns and jobs_df["planned_hours"].sum() > 0:
-                    efficiency = (jobs_df["planned_hours"].sum() / jobs_df["actual_hours"].sum() * 100) if jobs_df["actual_hours"].sum() > 0 else 100
-                    st.metric("Planning Efficiency", format_percent(efficiency/100))
-                else:
-                    unique_parts = len(jobs_df["part_name"].unique()) if "part_name" in jobs_df.columns else 0
-                    st.metric("Unique Parts", format_number(unique_parts, 0))
-            
-            # Format columns for display
-            display_jobs = jobs_df.copy()
-            
-            # Format numeric columns
-            numeric_columns = ["planned_hours", "actual_hours", "overrun_hours", "labor_rate", "overrun_cost"]
-            for col in numeric_columns:
-                if col in display_jobs.columns:
-                    display_jobs[col] = display_jobs[col].apply(lambda x: format_money(x) if "cost" in col or "rate" in col else format_number(x))
-            
-            # Rename columns for better display
-            rename_dict = {
+        # Metrics about the jobs (filled in once the first page is fetched)
+        jobs_col1, jobs_col2, jobs_col3 = st.columns(3)
+        
+        # Only the visible page is fetched, sorted and formatted
+        jobs_page = paginated_table(
+            f"related_jobs_{selected_metric}",
+            lambda page, page_size, sort_by, ascending, search: load_metric_jobs_page(
+                selected_metric, page, page_size, sort_by, ascending, search
+            ),
+            formats={
+                "planned_hours": format_number,
+                "actual_hours": format_number,
+                "overrun_hours": format_number,
+                "overrun_percent": format_percent,
+                "planned_cost": format_money,
+                "actual_cost": format_money,
+                "overrun_cost": format_money,
+                "operation_finish_date": lambda d: d.strftime('%Y-%m-%d') if pd.notna(d) else ""
+            },
+            rename={
                 "job_number": "Job",
                 "part_name": "Part",
                 "customer_name": "Customer",
@@ -449,20 +503,34 @@ if data:
                 "planned_hours": "Planned Hours",
                 "actual_hours": "Actual Hours",
                 "overrun_hours": "Overrun",
-                "labor_rate": "Rate",
+                "overrun_percent": "Overrun %",
+                "planned_cost": "Planned Cost",
+                "actual_cost": "Actual Cost",
                 "overrun_cost": "Overrun Cost",
-                "operation_finish_date": "Finish Date",
-                "value": "Value"
-            }
-            
-            # Apply renames, but only for columns that exist
-            valid_renames = {k: v for k, v in rename_dict.items() if k in display_jobs.columns}
-            display_jobs = display_jobs.rename(columns=valid_renames)
-            
-            # Show the jobs data
-            st.dataframe(display_jobs, use_container_width=True, hide_index=True)
-        else:
-            st.info("No related jobs data available for this metric after correlation analysis.")
+                "operation_finish_date": "Finish Date"
+            },
+            sort_columns=[
+                "actual_hours", "planned_hours", "overrun_hours", "overrun_percent",
+                "actual_cost", "planned_cost", "overrun_cost", "operation_finish_date",
+                "job_number", "customer_name", "part_name", "work_center"
+            ],
+            default_sort=METRIC_JOB_SORT.get(selected_metric, "actual_hours")
+        )
+        
+        jobs_summary = jobs_page["summary"]
+        with jobs_col1:
+            st.metric("Total Related Jobs", format_number(jobs_page["total"], 0))
+        
+        with jobs_col2:
+            total_variance = jobs_summary["actual_hours"] - jobs_summary["planned_hours"]
+            st.metric("Total Hours Variance", format_number(total_variance))
+        
+        with jobs_col3:
+            if jobs_summary["planned_hours"] > 0:
+                efficiency = (jobs_summary["planned_hours"] / jobs_summary["actual_hours"] * 100) if jobs_summary["actual_hours"] > 0 else 100
+                st.metric("Planning Efficiency", format_percent(efficiency/100))
+            else:
+                st.metric("Unique Parts", format_number(jobs_summary["unique_parts"], 0))
     else:
         st.info("No correlation data available for this metric.")
 else:
@@ -4,6 +4,9 @@ import numpy as np
 from datetime import datetime
 import os
 import io
+from utils.data_utils import invalidate_years
+from utils.pagination import paginate_frame
+from utils.paginated_table import paginated_table
 
 # Page configuration
 st.set_page_config(
@@ -57,9 +60,6 @@ including planned hours, actual hours, work centers, and customers.
 # Function to process and validate uploaded work history data
 def process_workhistory(uploaded_file):
     try:
-        # Make sure to clear the cache when new data is uploaded
-        st.cache_data.clear()
-        
         # Read Excel file
         df = pd.read_excel(uploaded_file, sheet_name="Sheet1", dtype=str)
         
@@ -114,6 +114,9 @@ def process_workhistory(uploaded_file):
         # Here we'll save to session_state as an example
         st.session_state.processed_data = df
         
+        # Drop only the cached results for the years this file touches
+        invalidate_years(pd.to_datetime(df['operation_finish_date'], errors='coerce').dt.year.dropna().unique())
+        
         return True, f"Successfully processed {len(df)} records."
         
     except Exception as e:
@@ -130,89 +133,101 @@ if uploaded_file is not None:
             
             if success:
                 st.success(message)
-                
-                # Display preview of processed data
-                st.subheader("Preview of Processed Data")
-                st.dataframe(st.session_state.processed_data.head(10), use_container_width=True)
-                
-                # Display summary statistics
-                if "processed_data" in st.session_state:
-                    df = st.session_state.processed_data
-                    
-                    st.subheader("Summary Statistics")
-                    
-                    col1, col2, col3, col4 = st.columns(4)
-                    
-                    with col1:
-                        st.metric("Total Records", format(len(df), ","))
-                    
-                    with col2:
-                        st.metric("Total Jobs", format(df['job_number'].nunique(), ","))
-                    
-                    with col3:
-                        st.metric("Total Work Centers", format(df['work_center'].nunique(), ","))
-                    
-                    with col4:
-                        st.metric("Total Customers", format(df['customer_name'].nunique(), ","))
-                    
-                    # Date range
-                    date_col1, date_col2 = st.columns(2)
-                    with date_col1:
-                        min_date = pd.to_datetime(df['operation_finish_date'], errors='coerce').min()
-                        if pd.notna(min_date):
-                            st.metric("Earliest Operation Date", min_date.strftime('%Y-%m-%d'))
-                        else:
-                            st.metric("Earliest Operation Date", "N/A")
-                    
-                    with date_col2:
-                        max_date = pd.to_datetime(df['operation_finish_date'], errors='coerce').max()
-                        if pd.notna(max_date):
-                            st.metric("Latest Operation Date", max_date.strftime('%Y-%m-%d'))
-                        else:
-                            st.metric("Latest Operation Date", "N/A")
-                    
-                    # Hours and overruns
-                    st.subheader("Hours Analysis")
-                    
-                    hours_col1, hours_col2, hours_col3, hours_col4 = st.columns(4)
-                    
-                    with hours_col1:
-                        total_planned = df['planned_hours'].sum()
-                        st.metric("Total Planned Hours", f"{total_planned:,.1f}")
-                    
-                    with hours_col2:
-                        total_actual = df['actual_hours'].sum()
-                        st.metric("Total Actual Hours", f"{total_actual:,.1f}")
-                    
-                    with hours_col3:
-                        total_overrun = df['overrun_hours'].sum()
-                        st.metric("Total Overrun Hours", f"{total_overrun:,.1f}")
-                    
-                    with hours_col4:
-                        if total_planned > 0:
-                            overrun_percent = (total_overrun / total_planned) * 100
-                            st.metric("Overrun Percentage", f"{overrun_percent:.1f}%")
-                        else:
-                            st.metric("Overrun Percentage", "N/A")
-                    
-                    # Download processed data button
-                    output = io.BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        df.to_excel(writer, sheet_name='Processed_Data', index=False)
-                    
-                    output.seek(0)
-                    
-                    st.download_button(
-                        label="Download Processed Data",
-                        data=output,
-                        file_name="processed_work_history.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-                    
-                    # Continue to dashboard button
-                    st.button("Continue to Dashboard", on_click=lambda: st.switch_page("app.py"))
             else:
+                st.session_state.pop("processed_data", None)
                 st.error(message)
+    
+    # Preview and statistics stay on screen while paging through the preview
+    if "processed_data" in st.session_state:
+        df = st.session_state.processed_data
+        
+        # Display preview of processed data, one page at a time
+        st.subheader("Preview of Processed Data")
+        paginated_table(
+            "upload_preview",
+            lambda page, page_size, sort_by, ascending, search: paginate_frame(
+                df, page, page_size, sort_by, ascending, search
+            ),
+            sort_columns=list(df.columns),
+            default_ascending=True,
+            page_size=10
+        )
+        
+        # Display summary statistics
+        st.subheader("Summary Statistics")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Total Records", format(len(df), ","))
+        
+        with col2:
+            st.metric("Total Jobs", format(df['job_number'].nunique(), ","))
+        
+        with col3:
+            st.metric("Total Work Centers", format(df['work_center'].nunique(), ","))
+        
+        with col4:
+            st.metric("Total Customers", format(df['customer_name'].nunique(), ","))
+        
+        # Date range
+        date_col1, date_col2 = st.columns(2)
+        with date_col1:
+            min_date = pd.to_datetime(df['operation_finish_date'], errors='coerce').min()
+            if pd.notna(min_date):
+                st.metric("Earliest Operation Date", min_date.strftime('%Y-%m-%d'))
+            else:
+                st.metric("Earliest Operation Date", "N/A")
+        
+        with date_col2:
+            max_date = pd.to_datetime(df['operation_finish_date'], errors='coerce').max()
+            if pd.notna(max_date):
+                st.metric("Latest Operation Date", max_date.strftime('%Y-%m-%d'))
+            else:
+                st.metric("Latest Operation Date", "N/A")
+        
+        # Hours and overruns
+        st.subheader("Hours Analysis")
+        
+        hours_col1, hours_col2, hours_col3, hours_col4 = st.columns(4)
+        
+        with hours_col1:
+            total_planned = df['planned_hours'].sum()
+            st.metric("Total Planned Hours", f"{total_planned:,.1f}")
+        
+        with hours_col2:
+            total_actual = df['actual_hours'].sum()
+            st.metric("Total Actual Hours", f"{total_actual:,.1f}")
+        
+        with hours_col3:
+            total_overrun = df['overrun_hours'].sum()
+            st.metric("Total Overrun Hours", f"{total_overrun:,.1f}")
+        
+        with hours_col4:
+            if total_planned > 0:
+                overrun_percent = (total_overrun / total_planned) * 100
+                st.metric("Overrun Percentage", f"{overrun_percent:.1f}%")
+            else:
+                st.metric("Overrun Percentage", "N/A")
+        
+        # Download processed data button (the workbook is built once, not on every page change)
+        if st.session_state.get("processed_excel_id") != id(df):
+            output = io.BytesIO()
+            with pd.ExcelWriter(output, engine='openpyxl') as writer:
+                df.to_excel(writer, sheet_name='Processed_Data', index=False)
+            
+            st.session_state.processed_excel = output.getvalue()
+            st.session_state.processed_excel_id = id(df)
+        
+        st.download_button(
+            label="Download Processed Data",
+            data=st.session_state.processed_excel,
+            file_name="processed_work_history.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        
+        # Continue to dashboard button
+        st.button("Continue to Dashboard", on_click=lambda: st.switch_page("app.py"))
 
 # Display help information
 with st.expander("Need Help?"):
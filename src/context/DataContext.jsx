@@ -34,20 +34,20 @@ export const DataProvider = ({ children }) => {
     const fetchDashboardData = async () => {
       setLoading(prev => ({ ...prev, dashboard: true }));
       try {
-        // In a real app, these would be API calls
-        const yearsResponse = await axios.get('/api/yearly_summary');
-        const metricsResponse = await axios.get('/api/summary_metrics');
-        const customersResponse = await axios.get('/api/customer_profitability');
-        const workcentersResponse = await axios.get('/api/workcenter_trends');
+        // One bundled request instead of four sequential ones
+        const response = await axios.get('/api/dashboard', {
+          params: { fields: 'yearly_summary,summary_metrics,customer_profitability,workcenter_trends' }
+        });
+        const bundle = response.data;
         
-        setYearlySummary(yearsResponse.data);
-        setSummaryMetrics(metricsResponse.data);
-        setCustomerData(customersResponse.data);
-        setWorkcenterData(workcentersResponse.data);
+        setYearlySummary(bundle.yearly_summary);
+        setSummaryMetrics(bundle.summary_metrics);
+        setCustomerData(bundle.customer_profitability);
+        setWorkcenterData(bundle.workcenter_trends);
         
         // Set the most recent year as default selected year
-        if (yearsResponse.data && yearsResponse.data.length > 0) {
-          const sortedYears = [...yearsResponse.data].sort((a, b) => b.year - a.year);
+        if (bundle.yearly_summary && bundle.yearly_summary.length > 0) {
+          const sortedYears = [...bundle.yearly_summary].sort((a, b) => b.year - a.year);
           setSelectedYear(parseInt(sortedYears[0].year));
         }
       } catch (error) {
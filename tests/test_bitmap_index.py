@@ -0,0 +1,13 @@
+import numpy as np
+
+from utils.bitmap_index import popcount
+
+
+def test_popcount_table_fallback_matches_bitwise_count(monkeypatch):
+    bits = np.random.default_rng(0).integers(0, 2 ** 63, size=1000, dtype=np.uint64)
+    expected = sum(bin(int(word)).count("1") for word in bits)
+
+    assert popcount(bits) == expected
+    # NumPy 1.x has no np.bitwise_count
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert popcount(bits) == expected
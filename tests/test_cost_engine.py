@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from utils.cost_engine import (DEFAULT_BURDEN_RATE, REDUCED_BURDEN_RATE, burden_rates,
+                               frame_burden_rates, operation_costs)
+from utils.labor_rates import effective_rates, parse_rate_table
+
+RATES = parse_rate_table(pd.DataFrame({
+    "work_center": ["*", "MILL"],
+    "effective_from": ["2020-01-01", "2023-07-01"],
+    "rate": [185, 215]
+}))
+
+
+def test_reduced_rate_applies_on_any_matching_column():
+    rates = burden_rates(
+        ["RC", "Widget", "Widget", "Widget", None],
+        ["MILL", "REP ENG", "MILL", "MILL", None],
+        ["Machine", "Machine", "Engineering Time", "Machine", None]
+    )
+
+    assert rates.tolist() == [REDUCED_BURDEN_RATE] * 3 + [DEFAULT_BURDEN_RATE] * 2
+
+
+def test_reduced_rate_overrides_the_dated_rate():
+    df = pd.DataFrame({
+        "part_name": ["RC", "Widget"],
+        "work_center": ["MILL", "MILL"],
+        "task_description": ["Machine", "Machine"],
+        "operation_finish_date": pd.to_datetime(["2023-08-01", "2023-08-01"])
+    })
+
+    rates = frame_burden_rates(df, effective_rates(df, RATES))
+
+    assert rates.tolist() == [REDUCED_BURDEN_RATE, 215]
+
+
+def test_rows_without_an_applicable_rate_fall_back_to_the_default():
+    df = pd.DataFrame({
+        "part_name": ["Widget"],
+        "work_center": ["MILL"],
+        "task_description": ["Machine"],
+        "operation_finish_date": pd.to_datetime(["2019-01-01"])
+    })
+
+    assert frame_burden_rates(df, effective_rates(df, RATES)).tolist() == [DEFAULT_BURDEN_RATE]
+
+
+def test_operation_costs_match_frame_burden_rates():
+    ops = [
+        SimpleNamespace(part_name="Widget", work_center="MILL", task_description="Machine",
+                        planned_hours=2, actual_hours=3, operation_finish_date=pd.Timestamp("2023-08-01")),
+        SimpleNamespace(part_name="RC", work_center="MILL", task_description="Machine",
+                        planned_hours=1, actual_hours=None, operation_finish_date=pd.Timestamp("2023-08-01")),
+        SimpleNamespace(part_name="Widget", work_center="LATHE", task_description="Machine",
+                        planned_hours=1, actual_hours=1, operation_finish_date=None)
+    ]
+    df = pd.DataFrame({
+        "part_name": [op.part_name for op in ops],
+        "work_center": [op.work_center for op in ops],
+        "task_description": [op.task_description for op in ops],
+        "operation_finish_date": [op.operation_finish_date for op in ops]
+    })
+
+    rates, planned, actual = operation_costs(ops, RATES)
+
+    np.testing.assert_array_equal(rates, frame_burden_rates(df, effective_rates(df, RATES)))
+    assert planned.tolist() == [430, REDUCED_BURDEN_RATE, 185]
+    assert actual.tolist() == [645, 0, 185]
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from utils.labor_rates import effective_rates, parse_rate_table
+
+RATES = parse_rate_table(pd.DataFrame({
+    "work_center": ["*", "*", "MILL", ""],
+    "effective_from": ["2020-01-01", "2023-01-01", "2023-07-01", "2024-01-01"],
+    "rate": [185, 199, 215, 205]
+}))
+
+
+def _rates(work_centers, dates, table=RATES, today=None):
+    df = pd.DataFrame({"work_center": work_centers, "operation_finish_date": pd.to_datetime(dates)})
+    return effective_rates(df, table, today=today)
+
+
+def test_work_center_rate_overrides_shop_wide_rate_once_in_effect():
+    rates = _rates(["MILL", "MILL", "LATHE"], ["2023-06-30", "2023-07-01", "2023-07-01"])
+
+    assert rates.tolist() == [199, 215, 199]
+
+
+def test_work_center_rate_outranks_later_shop_wide_change():
+    # A blank work center is shop-wide; MILL keeps its own rate after that change
+    rates = _rates(["MILL", "LATHE"], ["2024-02-01", "2024-02-01"])
+
+    assert rates.tolist() == [215, 205]
+
+
+def test_rows_dated_before_the_first_rate_get_nan():
+    rates = _rates(["MILL", "LATHE"], ["2019-12-31", "2020-01-01"])
+
+    assert np.isnan(rates[0])
+    assert rates[1] == 185
+
+
+def test_rows_without_finish_date_get_todays_rate():
+    rates = _rates(["MILL", "LATHE"], [None, None], today="2021-05-01")
+
+    assert rates.tolist() == [185, 185]
+
+
+def test_rates_follow_row_order_not_date_order():
+    dates = ["2023-08-01", "2020-06-01", "2023-02-01"]
+
+    assert _rates(["MILL"] * 3, dates).tolist() == [215, 185, 199]
+
+
+def test_empty_rate_table_gives_nan():
+    empty = parse_rate_table(pd.DataFrame({"effective_from": [], "rate": []}))
+
+    assert np.isnan(_rates(["MILL"], ["2023-08-01"], table=empty)).all()
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.pagination import paginate_frame
+
+
+def _walk_pages(df, page_size, sort_by, ascending=True):
+    first = paginate_frame(df, 1, page_size, sort_by, ascending)
+    ids = []
+    for page in range(1, first["pages"] + 1):
+        ids.extend(paginate_frame(df, page, page_size, sort_by, ascending)["rows"]["id"].tolist())
+    return ids
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("column", ["h", "name"])
+def test_pages_cover_every_row_once_with_tied_keys(column, ascending):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "id": np.arange(4000),
+        "h": rng.choice([0.0, 1.5, 3.0], size=4000),
+        "name": rng.choice(["LATHE", "MILL", None], size=4000)
+    })
+
+    ids = _walk_pages(df, 50, column, ascending)
+
+    assert len(ids) == len(df)
+    assert sorted(ids) == df["id"].tolist()
+
+
+def test_tied_rows_keep_frame_order_across_partial_and_full_sorts():
+    df = pd.DataFrame({"id": np.arange(1000), "h": np.zeros(1000)})
+
+    # Early pages take the partial-sort path, late pages the full sort
+    assert paginate_frame(df, 1, 10, "h")["rows"]["id"].tolist() == list(range(10))
+    assert paginate_frame(df, 100, 10, "h")["rows"]["id"].tolist() == list(range(990, 1000))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from utils.quantile_sketch import SKETCH_ACCURACY, QuantileSketch, SketchIndex
+
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+
+def _values(seed, size=5000):
+    return np.random.default_rng(seed).lognormal(mean=0.1, sigma=0.4, size=size)
+
+
+def _assert_within_accuracy(sketch_values, values):
+    exact = np.quantile(values, QUANTILES, method="lower")
+    np.testing.assert_allclose(sketch_values, exact, rtol=SKETCH_ACCURACY * 1.001)
+
+
+def test_quantiles_stay_within_relative_accuracy():
+    values = _values(0)
+
+    _assert_within_accuracy(QuantileSketch.from_values(values).quantiles(QUANTILES), values)
+
+
+def test_merged_sketches_match_a_sketch_of_all_values():
+    first, second = _values(1), _values(2, size=3000) * 1.5
+    merged = QuantileSketch.from_values(first).merge(QuantileSketch.from_values(second))
+
+    both = np.concatenate([first, second])
+    np.testing.assert_array_equal(merged.counts, QuantileSketch.from_values(both).counts)
+    _assert_within_accuracy(merged.quantiles(QUANTILES), both)
+
+
+def test_index_merges_selected_partitions_per_group():
+    values = np.concatenate([_values(3), _values(4), _values(5)])
+    partitions = np.repeat([0, 1, 0], 5000)
+    codes = np.repeat([0, 0, 1], 5000)
+    index = SketchIndex(values, codes, ["MILL", "LATHE"], partitions, [2023, 2024])
+
+    mill_all = index.sketch("MILL")
+    assert mill_all.count == 10000
+    _assert_within_accuracy(mill_all.quantiles(QUANTILES), values[:10000])
+
+    mill_2024 = index.sketch("MILL", partitions=[2024])
+    _assert_within_accuracy(mill_2024.quantiles(QUANTILES), values[5000:10000])
+
+    counts, table = index.quantile_table(QUANTILES, partitions=[2023])
+    assert counts.tolist() == [5000, 5000]
+    _assert_within_accuracy(table[1], values[10000:])
+
+
+@pytest.mark.parametrize("group,partitions", [("DRILL", None), ("MILL", [2030])])
+def test_missing_groups_and_partitions_give_empty_sketches(group, partitions):
+    index = SketchIndex(_values(6, size=10), np.zeros(10), ["MILL"], np.zeros(10), [2023])
+
+    sketch = index.sketch(group, partitions=partitions)
+
+    assert sketch.count == 0
+    assert sketch.quantile(0.5) is None
+
+
+def test_zero_and_missing_values_count_as_zero():
+    sketch = QuantileSketch.from_values([0.0, np.nan, -1.0, 2.0])
+
+    assert sketch.count == 4
+    assert sketch.quantile(0.5) == 0.0
@@ -0,0 +1,195 @@
+"""
+JSON response helpers for the Work History API endpoints
+"""
+import gzip
+import hashlib
+import json
+import math
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+from flask import Response, make_response, request
+
+from utils.data_version import get_data_version
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+# Bodies smaller than this are sent uncompressed; the gzip header costs more than it saves
+MIN_COMPRESS_BYTES = 1024
+COMPRESS_LEVEL = 6
+
+# How long browsers and proxies may reuse a response before revalidating with If-None-Match
+CACHE_MAX_AGE = 30
+
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(obj):
+    """Convert values the JSON encoders don't handle natively."""
+    if isinstance(obj, pd.Timestamp) or obj is pd.NaT:
+        return None if pd.isna(obj) else obj.isoformat()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return None if np.isnan(obj) else float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        # orjson only serializes numeric ndarrays natively; object arrays land here
+        return obj.tolist()
+    if isinstance(obj, pd.Series):
+        return obj.to_numpy()
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="records")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _finite(value):
+    """Replace NaN and infinite floats with None, as orjson does; the json module would emit NaN."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def dumps(payload):
+    """Serialize a payload to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(
+        _finite(payload),
+        default=lambda obj: _finite(_default(obj)),
+        separators=(",", ":"),
+        allow_nan=False
+    ).encode("utf-8")
+
+
+def to_columnar(records):
+    """Convert a list of row dicts into {"columns": {name: [values]}, "length": n}."""
+    columns = {}
+    for record in records:
+        for key in record:
+            if key not in columns:
+                columns[key] = []
+    for name, values in columns.items():
+        values.extend(record.get(name) for record in records)
+    return {"columns": columns, "length": len(records)}
+
+
+def columnarize(payload):
+    """Recursively convert every list of row dicts (or DataFrame) in a payload to columnar form."""
+    if isinstance(payload, pd.DataFrame):
+        return {
+            "columns": {col: payload[col].to_numpy() for col in payload.columns},
+            "length": len(payload)
+        }
+    if isinstance(payload, dict):
+        return {key: columnarize(value) for key, value in payload.items()}
+    if isinstance(payload, list) and payload and all(isinstance(item, dict) for item in payload):
+        return to_columnar(payload)
+    return payload
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick gzip or deflate from an Accept-Encoding header, or None for identity."""
+    best, best_q = None, 0.0
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if token not in ("gzip", "deflate"):
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        # Prefer gzip on ties since it is the most widely supported
+        if q > best_q or (q == best_q and token == "gzip"):
+            best, best_q = token, q
+    return best if best_q > 0 else None
+
+
+def compress(body, encoding):
+    """Compress a response body with the negotiated content encoding."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+    if encoding == "deflate":
+        return zlib.compress(body, COMPRESS_LEVEL)
+    return body
+
+
+def json_response(payload, status=200, headers=None):
+    """
+    Build a Flask JSON response for the current request.
+
+    Pass ?format=columnar to receive lists of rows as arrays per column.
+    Bodies are gzip/deflate compressed when the client accepts it.
+    """
+    if request.args.get("format") == "columnar":
+        payload = columnarize(payload)
+
+    body = dumps(payload)
+    response = Response(status=status, mimetype="application/json", headers=headers)
+    response.vary.add("Accept-Encoding")
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        body = compress(body, encoding)
+        response.headers["Content-Encoding"] = encoding
+
+    response.set_data(body)
+    return response
+
+
+def make_etag(version, *parts):
+    """Derive an ETag value from the data version and request-specific parts."""
+    digest = hashlib.sha1(version.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\0")
+        digest.update(str(part).encode("utf-8"))
+    return digest.hexdigest()[:20]
+
+
+def conditional(version_func=get_data_version, max_age=CACHE_MAX_AGE):
+    """
+    Decorate a GET view so it answers If-None-Match with 304 Not Modified.
+
+    The ETag is derived from the current data version, the request path and its
+    query arguments, so the view (and its queries) only runs when the data changed.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = make_etag(version_func(), request.path, sorted(request.args.items(multi=True)))
+            cache_control = f"public, max-age={max_age}"
+
+            # Weak ETags: gzip and identity bodies of the same data are equivalent
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = cache_control
+            response.vary.add("Accept-Encoding")
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,148 @@
+"""
+Packed bitmap indexes for multi-predicate filters over the work history data
+
+Each indexed value (a year, quarter, month, work center or one of the largest
+customers) has one bit per row, packed 64 rows to a word. A predicate such as
+"year 2023 and work center NCR" is then a bitwise AND of two bitmaps, and its
+row count a popcount, so the cost depends on the bitmap size rather than on
+comparing every value of a column.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.calendar_columns import calendar_values
+
+# Customers with the most operations get a bitmap; the rest are served by the drill-down index
+BITMAP_TOP_CUSTOMERS = int(os.environ.get("WORKHISTORY_BITMAP_TOP_CUSTOMERS", "50"))
+
+# Calendar columns (added at ingest) that get a bitmap per value
+CALENDAR_DIMENSIONS = ("year", "quarter", "month")
+
+# Set bits of each byte value, for NumPy releases before 2.0 (no np.bitwise_count)
+_BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def popcount(bits):
+    """Return the number of set bits in an array of unsigned words."""
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(bits).sum())
+    return int(_BYTE_POPCOUNT[bits.view(np.uint8)].sum())
+
+
+class BitmapIndex:
+    """Packed row bitmaps per value of the calendar, work center and top customer dimensions.
+
+    Bit positions refer to df.iloc, so the index is only valid for the frame it was built from.
+    """
+
+    def __init__(self, df, top_customers=BITMAP_TOP_CUSTOMERS):
+        self.row_count = len(df)
+        self._words = (self.row_count + 63) // 64
+        self._bitmaps = {}
+        # Dimensions where only some values have a bitmap
+        self._partial = set()
+
+        for dim in CALENDAR_DIMENSIONS:
+            if dim in df.columns:
+                self._add(dim, calendar_values(df, dim))
+        if "work_center" in df.columns:
+            self._add("work_center", df["work_center"])
+        if "customer_name" in df.columns and top_customers > 0:
+            customers = df["customer_name"]
+            top = customers.value_counts(sort=True).index[:top_customers]
+            if len(top) < customers.nunique(dropna=True):
+                self._partial.add("customer_name")
+            self._add("customer_name", customers.where(customers.isin(top)))
+
+    def _pack(self, mask):
+        # Pad to whole 64-bit words so bitmaps can be combined a word at a time
+        packed = np.zeros(self._words * 8, dtype=np.uint8)
+        bytes_ = np.packbits(mask)
+        packed[:len(bytes_)] = bytes_
+        return packed.view(np.uint64)
+
+    def _add(self, dim, values):
+        codes, uniques = pd.factorize(values, sort=False)
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Rows with a missing value (code -1) sort first; skip past them
+        offsets = int((codes < 0).sum()) + np.concatenate(([0], np.cumsum(counts)))
+
+        mask = np.zeros(self.row_count, dtype=bool)
+        table = {}
+        for i, value in enumerate(uniques.tolist()):
+            positions = order[offsets[i]:offsets[i + 1]]
+            mask[positions] = True
+            table[value] = self._pack(mask)
+            mask[positions] = False
+        self._bitmaps[dim] = table
+
+    @property
+    def dimensions(self):
+        return list(self._bitmaps)
+
+    def values(self, dim):
+        """Return the values of a dimension that have a bitmap."""
+        return list(self._bitmaps.get(dim, {}))
+
+    def empty(self):
+        return np.zeros(self._words, dtype=np.uint64)
+
+    def full(self):
+        """Return a bitmap with every row set."""
+        return self._pack(np.ones(self.row_count, dtype=bool))
+
+    def bitmap(self, dim, value):
+        """Return the bitmap of a value (a list of values is OR-ed).
+
+        Raises KeyError if the dimension, or a top-customers value, is not indexed.
+        """
+        table = self._bitmaps.get(dim)
+        if table is None:
+            raise KeyError(f"Dimension not indexed: {dim}")
+
+        if isinstance(value, (list, tuple, set)):
+            result = self.empty()
+            for v in value:
+                result |= self.bitmap(dim, v)
+            return result
+
+        bits = table.get(value)
+        if bits is None:
+            if dim in self._partial:
+                raise KeyError(f"No bitmap for {dim}={value!r}")
+            return self.empty()
+        return bits
+
+    def has_bitmap(self, dim, value):
+        """Return True if bitmap(dim, value) can be answered from this index."""
+        return dim in self._bitmaps and (dim not in self._partial or value in self._bitmaps[dim])
+
+    def select(self, **filters):
+        """Return the bitmap of rows matching every filter.
+
+        Filters with a value of None are ignored; no filters selects every row.
+        """
+        bitmaps = [self.bitmap(dim, value) for dim, value in filters.items() if value is not None]
+        if not bitmaps:
+            return self.full()
+        result = bitmaps[0].copy()
+        for bits in bitmaps[1:]:
+            result &= bits
+        return result
+
+    def count(self, bits):
+        """Return the number of rows set in a bitmap."""
+        return popcount(bits)
+
+    def rows(self, bits):
+        """Return the ascending row positions set in a bitmap."""
+        return np.flatnonzero(np.unpackbits(bits.view(np.uint8), count=self.row_count))
+
+    def contains(self, bits, rows):
+        """Return a boolean array telling which of the row positions are set in a bitmap."""
+        rows = np.asarray(rows, dtype=np.int64)
+        bytes_ = bits.view(np.uint8)[rows >> 3]
+        return ((bytes_ >> (7 - (rows & 7)).astype(np.uint8)) & 1).astype(bool)
@@ -0,0 +1,73 @@
+"""
+Calendar columns derived once from each operation's finish date
+
+Ingest adds compact integer year, quarter, month, ISO week and fiscal period
+columns so loaders can filter and group on them directly instead of calling
+.dt accessors or strftime on the dates every time they run. Rows without a
+finish date get MISSING_PERIOD in every calendar column.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# First month of the fiscal year (1 = fiscal year matches the calendar year)
+FISCAL_YEAR_START_MONTH = int(os.environ.get("WORKHISTORY_FISCAL_YEAR_START_MONTH", "1"))
+
+# Value of every calendar column for rows without a finish date
+MISSING_PERIOD = 0
+
+# Calendar column -> dtype
+CALENDAR_COLUMNS = {
+    "year": np.int16,
+    "quarter": np.int8,
+    "month": np.int8,
+    "iso_week": np.int8,
+    "fiscal_year": np.int16,
+    "fiscal_period": np.int8
+}
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def add_calendar_columns(df, date_column="operation_finish_date", fiscal_start=FISCAL_YEAR_START_MONTH):
+    """Add the calendar columns to df in place, derived from date_column."""
+    if date_column not in df.columns:
+        return df
+
+    dates = pd.DatetimeIndex(pd.to_datetime(df[date_column], errors="coerce"))
+    missing = dates.isna()
+    iso = dates.isocalendar()
+    # Fiscal periods count from the fiscal start month; a fiscal year is named for the
+    # calendar year it ends in
+    shifted = dates.month - fiscal_start
+    fiscal_period = shifted % 12 + 1
+    fiscal_year = dates.year + (shifted >= 0) * (fiscal_start > 1)
+
+    values = {
+        "year": dates.year,
+        "quarter": dates.quarter,
+        "month": dates.month,
+        "iso_week": iso["week"].to_numpy(dtype="float64", na_value=np.nan),
+        "fiscal_year": fiscal_year,
+        "fiscal_period": fiscal_period
+    }
+    for col, dtype in CALENDAR_COLUMNS.items():
+        column = np.asarray(values[col], dtype="float64")
+        column[missing] = MISSING_PERIOD
+        df[col] = column.astype(dtype)
+    return df
+
+
+def calendar_values(df, col):
+    """Return a calendar column as nullable integers, with missing periods as <NA>."""
+    values = df[col]
+    return values.astype("Int64").where(values != MISSING_PERIOD)
+
+
+def available_years(df):
+    """Return the sorted years that have at least one dated operation."""
+    if "year" not in df.columns:
+        return []
+    years = np.unique(df["year"].to_numpy())
+    return [int(y) for y in years if y != MISSING_PERIOD]
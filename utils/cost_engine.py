@@ -0,0 +1,172 @@
+"""
+Vectorized labor cost engine
+
+Operations are costed at the standard burden rate, except engineering, admin and
+RC work, which is charged at a reduced rate. The rule is evaluated once per
+distinct part, work center and task description, and that rate lookup is then
+gathered onto whole columns, so costing the full history is a handful of array
+operations rather than one string comparison chain per operation. The same rules
+are available as a SQL CASE expression for queries that aggregate in the database.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, case, func, literal, or_
+
+from utils.labor_rates import ALL_WORK_CENTERS, effective_rates, get_rate_table
+
+DEFAULT_BURDEN_RATE = 199.0
+REDUCED_BURDEN_RATE = 10.0
+
+# Operations matching any of these are charged the reduced burden rate
+REDUCED_RATE_PARTS = frozenset({"RC", "Engineering", "Admin", "RC / Engineering / Admin."})
+REDUCED_RATE_WORK_CENTERS = frozenset({"REP ENG"})
+REDUCED_RATE_TASKS = frozenset({"Engineering Time"})
+
+
+def burden_rate(part_name=None, work_center=None, task_description=None, default_rate=DEFAULT_BURDEN_RATE):
+    """Return the burden rate of a single operation."""
+    if (
+        part_name in REDUCED_RATE_PARTS or
+        work_center in REDUCED_RATE_WORK_CENTERS or
+        task_description in REDUCED_RATE_TASKS
+    ):
+        return REDUCED_BURDEN_RATE
+    return default_rate
+
+
+def _reduced_rate_mask(values, accepted):
+    """Return, per value, whether it is in `accepted`, testing each distinct value once."""
+    if not isinstance(values, pd.Series):
+        values = pd.Series(list(values), dtype=object)
+    codes, uniques = pd.factorize(values, sort=False)
+    # Missing values (code -1) pick the trailing False
+    lookup = np.fromiter((u in accepted for u in uniques), dtype=bool, count=len(uniques))
+    return np.append(lookup, False)[codes]
+
+
+def burden_rates(part_names=None, work_centers=None, task_descriptions=None, default_rates=DEFAULT_BURDEN_RATE):
+    """Return the burden rate of each operation as an array.
+
+    The arguments are equal-length sequences (any may be None); default_rates is
+    a scalar or a per-operation array used where the reduced rate doesn't apply.
+    """
+    columns = [
+        (part_names, REDUCED_RATE_PARTS),
+        (work_centers, REDUCED_RATE_WORK_CENTERS),
+        (task_descriptions, REDUCED_RATE_TASKS)
+    ]
+    columns = [(values, accepted) for values, accepted in columns if values is not None]
+    if not columns:
+        return np.asarray(default_rates, dtype="float64")
+
+    reduced = np.zeros(len(columns[0][0]), dtype=bool)
+    for values, accepted in columns:
+        reduced |= _reduced_rate_mask(values, accepted)
+    return np.where(reduced, REDUCED_BURDEN_RATE, np.asarray(default_rates, dtype="float64"))
+
+
+def frame_burden_rates(df, effective_rates=None):
+    """Return the burden rate of each row of a work history DataFrame.
+
+    Rows outside the reduced-rate categories use their rate from effective_rates
+    (e.g. utils.labor_rates.effective_rates; NaN where none applies), then their
+    labor_rate when the data has one, then the default burden rate.
+    """
+    default_rates = np.full(len(df), DEFAULT_BURDEN_RATE)
+    if "labor_rate" in df.columns:
+        default_rates = pd.to_numeric(df["labor_rate"], errors="coerce").fillna(DEFAULT_BURDEN_RATE).to_numpy(dtype="float64")
+    if effective_rates is not None:
+        effective_rates = np.asarray(effective_rates, dtype="float64")
+        default_rates = np.where(np.isnan(effective_rates), default_rates, effective_rates)
+    return burden_rates(
+        df["part_name"] if "part_name" in df.columns else None,
+        df["work_center"] if "work_center" in df.columns else None,
+        df["task_description"] if "task_description" in df.columns else None,
+        default_rates
+    )
+
+
+def operation_costs(operations, rate_table=None):
+    """Return (rates, planned_costs, actual_costs) arrays for a list of operation records.
+
+    Operations need part_name, work_center, task_description, planned_hours and
+    actual_hours attributes; missing hours count as zero. Outside the reduced-rate
+    categories each operation is charged the labor rate of its work center in effect
+    on its operation_finish_date (see utils.labor_rates.effective_rates), falling
+    back to the default burden rate.
+    """
+    if rate_table is None:
+        rate_table = get_rate_table()
+    work_centers = [op.work_center for op in operations]
+
+    default_rates = DEFAULT_BURDEN_RATE
+    if not rate_table.empty:
+        dated = pd.DataFrame({
+            "work_center": pd.Series(work_centers, dtype=object),
+            "operation_finish_date": pd.Series(
+                [getattr(op, "operation_finish_date", None) for op in operations], dtype=object
+            )
+        })
+        default_rates = effective_rates(dated, rate_table)
+        default_rates = np.where(np.isnan(default_rates), DEFAULT_BURDEN_RATE, default_rates)
+
+    rates = burden_rates(
+        [op.part_name for op in operations],
+        work_centers,
+        [op.task_description for op in operations],
+        default_rates
+    )
+    planned = np.fromiter((op.planned_hours or 0 for op in operations), dtype="float64", count=len(operations))
+    actual = np.fromiter((op.actual_hours or 0 for op in operations), dtype="float64", count=len(operations))
+    return rates, planned * rates, actual * rates
+
+
+def sql_burden_rate(job_history, rate_table=None, today=None):
+    """Return a SQL CASE giving each job_history row the rate frame_burden_rates gives it.
+
+    The reduced-rate rule comes first, then the work center's own rate in effect on
+    the finish date (today for open operations), then the shop-wide rate, then the
+    default burden rate. The rate table is small, so each rate change is one WHEN.
+    """
+    if rate_table is None:
+        rate_table = get_rate_table()
+    c = job_history.c
+    whens = [(
+        or_(
+            c.part_name.in_(sorted(REDUCED_RATE_PARTS)),
+            c.work_center.in_(sorted(REDUCED_RATE_WORK_CENTERS)),
+            c.task_description.in_(sorted(REDUCED_RATE_TASKS))
+        ),
+        REDUCED_BURDEN_RATE
+    )]
+
+    if not rate_table.empty:
+        today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+        finish_date = func.coalesce(c.operation_finish_date, literal(today.date()))
+        # Latest change first, so the first matching WHEN is the rate in effect
+        changes = rate_table.sort_values("effective_from", ascending=False, kind="stable")
+        shop_wide = changes["work_center"] == ALL_WORK_CENTERS
+        for row in changes[~shop_wide].itertuples(index=False):
+            whens.append((
+                and_(c.work_center == str(row.work_center), finish_date >= row.effective_from.date()),
+                float(row.rate)
+            ))
+        for row in changes[shop_wide].itertuples(index=False):
+            whens.append((finish_date >= row.effective_from.date(), float(row.rate)))
+
+    return case(*whens, else_=DEFAULT_BURDEN_RATE)
+
+
+def cost_signature(rate_table=None):
+    """Return a token that changes whenever the costing rules or the rate table change."""
+    if rate_table is None:
+        rate_table = get_rate_table()
+    rules = (
+        DEFAULT_BURDEN_RATE, REDUCED_BURDEN_RATE,
+        sorted(REDUCED_RATE_PARTS), sorted(REDUCED_RATE_WORK_CENTERS), sorted(REDUCED_RATE_TASKS)
+    )
+    digest = hashlib.sha1(repr(rules).encode("utf-8"))
+    digest.update(rate_table.to_csv(index=False).encode("utf-8"))
+    return digest.hexdigest()[:20]
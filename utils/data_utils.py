@@ -6,6 +6,22 @@ import numpy as np
 from datetime import datetime
 import os
 import random
+import threading
+from utils.bitmap_index import BitmapIndex
+from utils.calendar_columns import MONTH_NAMES, add_calendar_columns, available_years
+from utils.data_version import EXCEL_PATHS, get_data_version
+from utils.date_index import DateIndex
+from utils.derived_columns import DerivedColumns, read_only
+from utils.disk_cache import load_artifact, save_artifact
+from utils.drilldown_index import DrilldownIndex
+from utils.pagination import DEFAULT_PAGE_SIZE, paginate_frame
+from utils.quantile_sketch import SketchIndex
+from utils.result_cache import cached_result, result_cache
+from utils.rolling_metrics import ROLLING_FREQUENCIES, ROLLING_METRICS, ROLLING_STATS, RollingSeries
+from utils.star_schema import StarSchema
+from utils.cost_engine import DEFAULT_BURDEN_RATE, frame_burden_rates
+from utils.labor_rates import effective_rates
+from utils.trigram_search import TrigramIndex
 
 def generate_customer_data(customers, total_value):
     """Helper function to generate customer data with list_name support"""
@@ -32,14 +48,7 @@ def generate_customer_data(customers, total_value):
 def load_excel_data():
     """Load data from the Excel file."""
     # Try multiple possible locations for the Excel file
-    possible_paths = [
-        'WORKHISTORY.xlsx',  # Root directory
-        'attached_assets/WORKHISTORY.xlsx',  # Assets folder
-        '../WORKHISTORY.xlsx',  # Parent directory
-        './WORKHISTORY.xlsx'   # Explicit current directory
-    ]
-    
-    for file_path in possible_paths:
+    for file_path in EXCEL_PATHS:
         if os.path.exists(file_path):
             print(f"Loading Excel data from: {file_path}")
             try:
@@ -86,7 +95,7 @@ def load_excel_data():
                 
                 # Add standard labor rate if not already present
                 if 'labor_rate' not in df.columns:
-                    df['labor_rate'] = 199.0  # Standard labor rate
+                    df['labor_rate'] = DEFAULT_BURDEN_RATE  # Standard labor rate
                 
                 # Clean up customer names if needed
                 if 'customer_name' in df.columns:
@@ -108,9 +117,9 @@ def load_excel_data():
                             if any(ncr_mask):
                                 df.loc[ncr_mask, 'work_center'] = 'NCR'
                 
-                # Add a year column if not present
-                if 'year' not in df.columns and 'operation_finish_date' in df.columns:
-                    df['year'] = pd.DatetimeIndex(df['operation_finish_date']).year
+                # Add integer year, quarter, month, ISO week and fiscal period columns once,
+                # so loaders don't re-derive them from the dates
+                add_calendar_columns(df)
                 
                 print(f"Successfully loaded Excel data with {len(df)} records")
                 return df
@@ -131,38 +140,200 @@ def load_excel_data():
     print("WARNING: Returning empty DataFrame as Excel file could not be found or loaded")
     return pd.DataFrame()
 
-def load_yearly_summary():
+# Process-wide copy of the loaded Excel data, keyed by data version
+_dataset_cache = {"version": None, "df": None, "index": None, "search": None, "star": None, "bitmaps": None, "derived": None, "dates": None, "rolling": None, "sketches": None}
+_dataset_lock = threading.Lock()
+
+def get_dataset():
+    """Return the shared work history DataFrame, reloading it when the data version changes.
+    
+    The frame is shared by every caller in the process and its values are read-only;
+    ask get_derived_columns() for computed columns instead of adding them.
+    """
+    version = get_data_version()
+    with _dataset_lock:
+        if _dataset_cache["df"] is None or _dataset_cache["version"] != version:
+            # A fresh process reuses the dataset parsed by an earlier one for this version
+            found, df = load_artifact("dataset", version)
+            if not found:
+                df = load_excel_data()
+                if not df.empty:
+                    save_artifact("dataset", df, version)
+            _dataset_cache["df"] = read_only(df)
+            _dataset_cache["version"] = version
+            _dataset_cache["index"] = None
+            _dataset_cache["search"] = None
+            _dataset_cache["star"] = None
+            _dataset_cache["bitmaps"] = None
+            _dataset_cache["derived"] = None
+            _dataset_cache["dates"] = None
+            _dataset_cache["rolling"] = None
+            _dataset_cache["sketches"] = None
+        return _dataset_cache["df"]
+
+def get_derived_columns():
+    """Return the memoized derived columns (overrun, costs, flags) of the shared dataset."""
+    df = get_dataset()
+    with _dataset_lock:
+        derived = _dataset_cache.get("derived")
+        if derived is None or _dataset_cache["df"] is not df:
+            derived = _dataset_cache["derived"] = DerivedColumns(df)
+        return derived
+
+def get_drilldown_index():
+    """Return the inverted index over the shared dataset, rebuilt when the data version changes."""
+    df = get_dataset()
+    with _dataset_lock:
+        index = _dataset_cache.get("index")
+        if index is None or _dataset_cache["df"] is not df:
+            index = _dataset_cache["index"] = DrilldownIndex(df)
+        return index
+
+def get_search_index():
+    """Return the trigram search index over the shared dataset, rebuilt when the data version changes."""
+    df = get_dataset()
+    with _dataset_lock:
+        index = _dataset_cache.get("search")
+        if index is None or _dataset_cache["df"] is not df:
+            index = _dataset_cache["search"] = TrigramIndex(df)
+        return index
+
+def _build_star_schema(df, rates=None):
+    """Code the dimensions of a frame, with planned and actual cost measures at each row's burden rate."""
+    star = StarSchema(df)
+    if 'planned_hours' in star.measures and 'actual_hours' in star.measures:
+        if rates is None:
+            rates = frame_burden_rates(df, effective_rates(df))
+        star.add_measure('planned_cost', star.measures['planned_hours'] * rates)
+        star.add_measure('actual_cost', star.measures['actual_hours'] * rates)
+    return star
+
+def get_star_schema(df=None):
+    """Return the integer-coded dimensions of a frame, shared per data version for the dataset."""
+    if df is not None and df is not _dataset_cache["df"]:
+        return _build_star_schema(df)
+    shared = get_dataset()
+    derived = get_derived_columns()
+    with _dataset_lock:
+        star = _dataset_cache.get("star")
+        if star is None or _dataset_cache["df"] is not shared:
+            # Cost measures use the burden rates memoized with the derived columns
+            rates = derived['burden_rate'].to_numpy()
+            star = _dataset_cache["star"] = _build_star_schema(shared, rates)
+        return star
+
+def get_bitmap_index(df=None):
+    """Return packed bitmaps over a frame, shared per data version for the dataset."""
+    if df is not None and df is not _dataset_cache["df"]:
+        return BitmapIndex(df)
+    shared = get_dataset()
+    with _dataset_lock:
+        index = _dataset_cache.get("bitmaps")
+        if index is None or _dataset_cache["df"] is not shared:
+            index = _dataset_cache["bitmaps"] = BitmapIndex(shared)
+        return index
+
+def get_date_index():
+    """Return the finish-date order of the shared dataset, rebuilt when the data version changes."""
+    df = get_dataset()
+    with _dataset_lock:
+        index = _dataset_cache.get("dates")
+        if index is None or _dataset_cache["df"] is not df:
+            index = _dataset_cache["dates"] = DateIndex(df)
+        return index
+
+def upload_invalidation_tags(years):
+    """Result cache tags affected by new or changed operations in the given years.
+    
+    Every metric and the dashboard span all years, so they are always included.
+    """
+    return {f"year:{int(y)}" for y in years if y is not None and not pd.isna(y)} | {"metrics", "dashboard"}
+
+def invalidate_years(years):
+    """Drop cached results affected by data changes in the given years."""
+    return result_cache.invalidate(upload_invalidation_tags(years))
+
+def search_work_history(query, limit=10):
+    """Return ranked job, customer, part and task matches for a search query."""
+    if not query or not query.strip():
+        return []
+    return get_search_index().search(query, limit=limit)
+
+# Columns returned by load_drilldown
+DRILLDOWN_COLUMNS = [
+    'job_number', 'work_order_number', 'operation_number', 'customer_name', 'part_name',
+    'work_center', 'task_description', 'planned_hours', 'actual_hours', 'operation_finish_date'
+]
+
+def load_drilldown(customer=None, part=None, work_center=None, year=None, limit=1000):
+    """Return operations matching every given filter, with totals over all matches.
+    
+    Each filter is an exact value or a list of values; None means no filter.
+    """
+    df = get_dataset()
+    if df.empty:
+        return {"total": 0, "planned_hours": 0, "actual_hours": 0, "records": []}
+    
+    positions = get_drilldown_index().query(
+        customer_name=customer,
+        part_name=part,
+        work_center=work_center,
+        year=year
+    )
+    matches = df.iloc[positions]
+    columns = [c for c in DRILLDOWN_COLUMNS if c in matches.columns]
+    
+    return {
+        "total": len(positions),
+        "planned_hours": float(matches['planned_hours'].sum()),
+        "actual_hours": float(matches['actual_hours'].sum()),
+        "records": matches[columns].head(limit).to_dict('records')
+    }
+
+@cached_result(lambda df=None: {"dashboard"}, persist=True)
+def load_yearly_summary(df=None):
     """Load yearly breakdown data from the Excel file."""
-    # Load Excel file
-    df = load_excel_data()
+    # Load Excel file unless the caller already has it
+    if df is None:
+        df = get_dataset()
     
     if df.empty:
         print("No data found in Excel file")
         return []
     
-    # Get unique years from operation_finish_date
-    years = sorted(df['operation_finish_date'].dt.year.unique().tolist())
+    # Years with at least one dated operation
+    years = available_years(df)
+    
+    # Year and NCR filters are ANDs of packed bitmaps; sums run over the coded rows
+    star = get_star_schema(df)
+    bitmaps = get_bitmap_index(df)
+    ncr_bits = bitmaps.bitmap('work_center', 'NCR')
     
     # Calculate yearly metrics
     data = []
     for year in years:
-        year_df = df[df['operation_finish_date'].dt.year == year]
+        year_bits = bitmaps.bitmap('year', year)
+        year_rows = bitmaps.rows(year_bits)
         
         # Calculate hours
-        planned_hours = year_df['planned_hours'].sum()
-        actual_hours = year_df['actual_hours'].sum()
+        planned_hours = star.total('planned_hours', year_rows)
+        actual_hours = star.total('actual_hours', year_rows)
         overrun_hours = actual_hours - planned_hours
         
+        # Calculate costs at each operation's burden rate
+        planned_cost = star.total('planned_cost', year_rows)
+        actual_cost = star.total('actual_cost', year_rows)
+        
         # Count NCR work
-        ncr_df = year_df[year_df['work_center'] == 'NCR']
-        ncr_hours = ncr_df['actual_hours'].sum() if not ncr_df.empty else 0
+        ncr_rows = bitmaps.rows(year_bits & ncr_bits)
+        ncr_hours = star.total('actual_hours', ncr_rows) if len(ncr_rows) else 0
         
         # Count jobs and operations
-        job_count = len(year_df['job_number'].unique())
-        operation_count = len(year_df)
+        job_count = star.distinct_total('job_number', year_rows)
+        operation_count = len(year_rows)
         
         # Count customers
-        customer_count = len(year_df['customer_name'].unique())
+        customer_count = star.distinct_total('customer_name', year_rows)
         
         data.append({
             "year": str(year),
@@ -170,6 +341,8 @@ def load_yearly_summary():
             "actual_hours": actual_hours,
             "overrun_hours": overrun_hours,
             "ncr_hours": ncr_hours,
+            "planned_cost": planned_cost,
+            "actual_cost": actual_cost,
             "job_count": job_count,
             "operation_count": operation_count,
             "customer_count": customer_count
@@ -177,48 +350,52 @@ def load_yearly_summary():
     
     return data
 
-def load_top_overruns():
+@cached_result(lambda df=None: {"dashboard"})
+def load_top_overruns(df=None):
     """Get the top overrun jobs from the dataset."""
-    # Load the Excel data
-    df = load_excel_data()
+    # Load the Excel data unless the caller already has it
+    if df is None:
+        df = get_dataset()
     
     if df.empty:
         print("No Excel data available for top overruns")
         return []
     
-    # Calculate overrun for each job
+    # Sum hours and costs per job code; job details come from each job's first row
+    star = get_star_schema(df)
+    job_planned = star.group_sum('job_number', 'planned_hours')
+    job_actual = star.group_sum('job_number', 'actual_hours')
+    job_overrun = job_actual - job_planned
+    job_overrun_cost = star.group_sum('job_number', 'actual_cost') - star.group_sum('job_number', 'planned_cost')
+    
+    first_rows = star.first_rows('job_number')
+    job_codes = star.codes['job_number'][first_rows]
+    details = df.iloc[first_rows]
+    
+    def detail_values(col, default):
+        return details[col].tolist() if col in details.columns else [default] * len(details)
+    
     overruns = []
-    for job_number in df['job_number'].unique():
-        job_df = df[df['job_number'] == job_number]
-        
-        # Calculate hours and cost
-        planned_hours = job_df['planned_hours'].sum()
-        actual_hours = job_df['actual_hours'].sum()
-        overrun_hours = actual_hours - planned_hours
-        
-        if overrun_hours <= 0:
-            continue  # Skip jobs with no overrun
-        
-        # Calculate overrun cost
-        hourly_rate = 199  # Standard rate
-        overrun_cost = overrun_hours * hourly_rate
-        
-        # Get part name and work center
-        part_name = job_df['part_name'].iloc[0] if 'part_name' in job_df.columns else "Unknown"
-        work_center = job_df['work_center'].iloc[0] if 'work_center' in job_df.columns else "Unknown"
-        
-        # Get a description (use the first operation's description)
-        task_description = job_df['task_description'].iloc[0] if 'task_description' in job_df.columns else ""
+    job_details = zip(
+        job_codes, star.names('job_number', job_codes),
+        detail_values('part_name', 'Unknown'),
+        detail_values('work_center', 'Unknown'),
+        detail_values('task_description', '')
+    )
+    for code, job_number, part_name, work_center, task_description in job_details:
+        # Skip jobs with no overrun (and rows without a job number)
+        if pd.isna(job_number) or job_overrun[code] <= 0:
+            continue
         
         overruns.append({
             "job_number": job_number,
             "part_name": part_name,
             "work_center": work_center,
             "task_description": task_description,
-            "planned_hours": planned_hours,
-            "actual_hours": actual_hours,
-            "overrun_hours": overrun_hours,
-            "overrun_cost": overrun_cost
+            "planned_hours": job_planned[code],
+            "actual_hours": job_actual[code],
+            "overrun_hours": job_overrun[code],
+            "overrun_cost": job_overrun_cost[code]
         })
     
     # Sort by overrun hours
@@ -226,10 +403,11 @@ def load_top_overruns():
     
     return overruns
 
-def load_summary_metrics():
+def load_summary_metrics(yearly_data=None):
     """Load summary metrics for the dashboard."""
     # Calculate totals based on yearly data
-    yearly_data = load_yearly_summary()
+    if yearly_data is None:
+        yearly_data = load_yearly_summary()
     
     total_planned_hours = sum(item["planned_hours"] for item in yearly_data)
     total_actual_hours = sum(item["actual_hours"] for item in yearly_data)
@@ -239,10 +417,9 @@ def load_summary_metrics():
     total_operations = sum(item["operation_count"] for item in yearly_data)
     total_customers = max(item["customer_count"] for item in yearly_data) if yearly_data else 0 
     
-    # Calculate costs (assuming $199/hour as mentioned in notes)
-    hourly_rate = 199
-    total_planned_cost = total_planned_hours * hourly_rate
-    total_actual_cost = total_actual_hours * hourly_rate
+    # Costs are summed per year at each operation's burden rate
+    total_planned_cost = sum(item["planned_cost"] for item in yearly_data)
+    total_actual_cost = sum(item["actual_cost"] for item in yearly_data)
     
     # Calculate overrun percent
     overrun_percent = (total_overrun_hours / total_planned_hours * 100) if total_planned_hours > 0 else 0
@@ -260,10 +437,12 @@ def load_summary_metrics():
         "total_customers": total_customers
     }
 
-def load_customer_profitability():
+@cached_result(lambda df=None: {"dashboard"})
+def load_customer_profitability(df=None):
     """Load customer profitability data from Excel file."""
-    # Load Excel data
-    df = load_excel_data()
+    # Load Excel data unless the caller already has it
+    if df is None:
+        df = get_dataset()
     
     if df.empty:
         print("No Excel data available for customer profitability")
@@ -277,19 +456,18 @@ def load_customer_profitability():
             "profit_data": []
         }
     
-    # Get all unique customers
-    customers = df['customer_name'].unique().tolist()
+    # Sum hours per customer code; names are looked up only for the output rows
+    star = get_star_schema(df)
+    customers = star.names('customer_name', np.arange(star.size('customer_name')))
+    planned_by_customer = star.group_sum('customer_name', 'planned_hours')
+    actual_by_customer = star.group_sum('customer_name', 'actual_hours')
     
     # Calculate metrics for each customer
     profit_data = []
     
-    for customer_name in customers:
-        # Filter data for this customer
-        customer_df = df[df['customer_name'] == customer_name]
-        
-        # Calculate hours
-        planned_hours = customer_df['planned_hours'].sum()
-        actual_hours = customer_df['actual_hours'].sum()
+    for code, customer_name in enumerate(customers):
+        planned_hours = planned_by_customer[code]
+        actual_hours = actual_by_customer[code]
         overrun_hours = actual_hours - planned_hours
         
         # Calculate profitability - we'll use a proxy based on efficiency
@@ -333,12 +511,9 @@ def load_customer_profitability():
         overrun_customer_data = sorted(profit_data, key=lambda x: x["overrun_hours"], reverse=True)[0]
     
     # Calculate repeat rate - percentage of customers with multiple jobs
-    customer_job_counts = {}
-    for customer in customers:
-        customer_jobs = df[df['customer_name'] == customer]['job_number'].unique()
-        customer_job_counts[customer] = len(customer_jobs)
+    customer_job_counts = star.distinct_count('customer_name', 'job_number')
     
-    repeat_customers = sum(1 for count in customer_job_counts.values() if count > 1)
+    repeat_customers = int((customer_job_counts > 1).sum())
     repeat_rate = (repeat_customers / len(customers) * 100) if customers else 0
     
     # Calculate average margin based on overall efficiency
@@ -356,10 +531,12 @@ def load_customer_profitability():
         "profit_data": profit_data
     }
 
-def load_workcenter_trends():
+@cached_result(lambda df=None: {"dashboard"})
+def load_workcenter_trends(df=None):
     """Load work center trend data from Excel file."""
-    # Load Excel data
-    df = load_excel_data()
+    # Load Excel data unless the caller already has it
+    if df is None:
+        df = get_dataset()
     
     if df.empty:
         print("No Excel data available for workcenter trends")
@@ -371,19 +548,18 @@ def load_workcenter_trends():
             "work_center_data": []
         }
     
-    # Get all unique work centers
-    work_centers = df['work_center'].unique().tolist()
+    # Sum hours per work center code; names are looked up only for the output rows
+    star = get_star_schema(df)
+    work_centers = star.names('work_center', np.arange(star.size('work_center')))
+    planned_by_wc = star.group_sum('work_center', 'planned_hours')
+    actual_by_wc = star.group_sum('work_center', 'actual_hours')
     
     # Calculate metrics for each work center
     work_center_data = []
     
-    for wc in work_centers:
-        # Filter data for this work center
-        wc_df = df[df['work_center'] == wc]
-        
-        # Calculate hours
-        planned_hours = wc_df['planned_hours'].sum()
-        actual_hours = wc_df['actual_hours'].sum()
+    for code, wc in enumerate(work_centers):
+        planned_hours = planned_by_wc[code]
+        actual_hours = actual_by_wc[code]
         overrun_hours = actual_hours - planned_hours
         
         work_center_data.append({
@@ -427,12 +603,134 @@ def load_workcenter_trends():
         "work_center_data": work_center_data
     }
 
+# Sections returned by load_dashboard_bundle, in response order
+DASHBOARD_FIELDS = (
+    "yearly_summary",
+    "summary_metrics",
+    "customer_profitability",
+    "workcenter_trends",
+    "top_overruns"
+)
+
+@cached_result(lambda fields=None: {"dashboard"}, persist=True)
+def load_dashboard_bundle(fields=None):
+    """Load all main dashboard sections from a single read of the Excel data.
+    
+    fields optionally limits the response to a subset of DASHBOARD_FIELDS.
+    """
+    fields = DASHBOARD_FIELDS if not fields else [f for f in DASHBOARD_FIELDS if f in fields]
+    
+    # Read the Excel data once and share it between all sections
+    df = get_dataset()
+    
+    bundle = {}
+    yearly_data = None
+    
+    # Summary metrics are rolled up from the yearly summary, so compute it for either
+    if "yearly_summary" in fields or "summary_metrics" in fields:
+        yearly_data = load_yearly_summary(df)
+    
+    if "yearly_summary" in fields:
+        bundle["yearly_summary"] = yearly_data
+    if "summary_metrics" in fields:
+        bundle["summary_metrics"] = load_summary_metrics(yearly_data)
+    if "customer_profitability" in fields:
+        bundle["customer_profitability"] = load_customer_profitability(df)
+    if "workcenter_trends" in fields:
+        bundle["workcenter_trends"] = load_workcenter_trends(df)
+    if "top_overruns" in fields:
+        bundle["top_overruns"] = load_top_overruns(df)
+    
+    return bundle
+
+def _top_job_overruns(df, star, rows, limit=15):
+    """Return the jobs with the largest overrun cost over row positions of the shared dataset."""
+    job_overruns = []
+    
+    # Sum hours per job code; job details come from each job's first row
+    job_planned = star.group_sum('job_number', 'planned_hours', rows)
+    job_actual = star.group_sum('job_number', 'actual_hours', rows)
+    job_overrun = job_actual - job_planned
+    job_overrun_cost = (
+        star.group_sum('job_number', 'actual_cost', rows) -
+        star.group_sum('job_number', 'planned_cost', rows)
+    )
+    
+    first_rows = star.first_rows('job_number', rows)
+    job_codes = star.codes['job_number'][first_rows]
+    job_numbers = star.names('job_number', job_codes)
+    details = df.iloc[first_rows]
+    
+    def detail_values(col, default):
+        return details[col].tolist() if col in details.columns else [default] * len(details)
+    
+    job_details = zip(
+        job_codes, job_numbers,
+        detail_values('part_name', 'Unknown Part'),
+        detail_values('work_center', 'Unknown'),
+        detail_values('task_description', '')
+    )
+    for code, job_number, part_name, work_center, task_description in job_details:
+        # Only include jobs with overruns
+        if pd.isna(job_number) or not job_overrun[code] > 0:
+            continue
+        job_overruns.append({
+            "job_number": job_number,
+            "part_name": part_name,
+            "work_center": work_center,
+            "task_description": task_description,
+            "planned_hours": job_planned[code],
+            "actual_hours": job_actual[code],
+            "overrun_hours": job_overrun[code],
+            "overrun_cost": job_overrun_cost[code]
+        })
+    
+    # Sort by overrun cost (descending) and take the top jobs
+    return sorted(job_overruns, key=lambda x: x["overrun_cost"], reverse=True)[:limit]
+
+def _workcenter_summary(star, rows):
+    """Return hours, overrun cost and job counts per work center over row positions of the shared dataset."""
+    workcenter_summary = []
+    
+    # Sum hours and count jobs per work center code over the rows
+    wc_planned_hours = star.group_sum('work_center', 'planned_hours', rows)
+    wc_actual_hours = star.group_sum('work_center', 'actual_hours', rows)
+    wc_overrun_costs = (
+        star.group_sum('work_center', 'actual_cost', rows) -
+        star.group_sum('work_center', 'planned_cost', rows)
+    )
+    wc_job_counts = star.distinct_count('work_center', 'job_number', rows)
+    wc_codes = star.present('work_center', rows)
+    
+    for code, wc in zip(wc_codes, star.names('work_center', wc_codes)):
+        # Skip empty work centers
+        if not wc or pd.isna(wc):
+            continue
+            
+        wc_planned = wc_planned_hours[code]
+        wc_actual = wc_actual_hours[code]
+        wc_overrun = wc_actual - wc_planned
+        wc_job_count = int(wc_job_counts[code])
+        
+        workcenter_summary.append({
+            "work_center": wc,
+            "job_count": wc_job_count,
+            "planned_hours": wc_planned,
+            "actual_hours": wc_actual,
+            "overrun_hours": wc_overrun,
+            "overrun_cost": wc_overrun_costs[code]
+        })
+    
+    # Sort work centers by overrun cost (descending)
+    return sorted(workcenter_summary, key=lambda x: x["overrun_cost"], reverse=True)
+
+@cached_result(lambda year: {f"year:{int(year)}"}, persist=True)
 def load_year_data(year):
     """Load detailed data for a specific year directly from Excel data."""
     print(f"Loading data for year {year}")
     
     # Load Excel data
-    df = load_excel_data()
+    df = get_dataset()
     year_str = str(year)
     
     if df.empty:
@@ -462,7 +760,11 @@ def load_year_data(year):
     
     try:
         # Filter data for the specific year
-        year_df = df[df['operation_finish_date'].dt.year == int(year)]
+        bitmaps = get_bitmap_index()
+        year_bits = bitmaps.select(year=int(year))
+        year_rows = bitmaps.rows(year_bits)
+        year_df = df.iloc[year_rows]
+        star = get_star_schema()
         
         if year_df.empty:
             print(f"No data found for year {year}")
@@ -490,23 +792,22 @@ def load_year_data(year):
             }
         
         # Calculate hours
-        planned_hours = year_df['planned_hours'].sum()
-        actual_hours = year_df['actual_hours'].sum()
+        planned_hours = star.total('planned_hours', year_rows)
+        actual_hours = star.total('actual_hours', year_rows)
         overrun_hours = actual_hours - planned_hours
         
         # Count NCR-related work
-        ncr_df = year_df[year_df['work_center'] == 'NCR']
-        ncr_hours = ncr_df['actual_hours'].sum() if not ncr_df.empty else 0
+        ncr_rows = bitmaps.rows(year_bits & bitmaps.bitmap('work_center', 'NCR'))
+        ncr_hours = star.total('actual_hours', ncr_rows) if len(ncr_rows) else 0
         
         # Count jobs and operations
-        job_count = len(year_df['job_number'].unique())
+        job_count = star.distinct_total('job_number', year_rows)
         operation_count = len(year_df)
         
-        # Calculate costs using $199/hour rate
-        hourly_rate = 199
-        planned_cost = planned_hours * hourly_rate
-        actual_cost = actual_hours * hourly_rate
-        opportunity_cost = overrun_hours * hourly_rate
+        # Calculate costs at each operation's burden rate
+        planned_cost = star.total('planned_cost', year_rows)
+        actual_cost = star.total('actual_cost', year_rows)
+        opportunity_cost = actual_cost - planned_cost
         
         # Calculate recommended buffer based on overrun percentage
         overrun_percent = (overrun_hours / planned_hours * 100) if planned_hours > 0 else 0
@@ -530,9 +831,9 @@ def load_year_data(year):
         quarter_num = i + 1
         
         # Filter data for this quarter
-        quarter_df = year_df[year_df['operation_finish_date'].dt.quarter == quarter_num]
+        quarter_bits = year_bits & bitmaps.bitmap('quarter', quarter_num)
         
-        if quarter_df.empty:
+        if not bitmaps.count(quarter_bits):
             # If no data for this quarter, add zeros
             quarterly_data.append({
                 "quarter": quarter,
@@ -544,11 +845,12 @@ def load_year_data(year):
             })
         else:
             # Calculate actual metrics for this quarter
-            quarter_planned = quarter_df['planned_hours'].sum()
-            quarter_actual = quarter_df['actual_hours'].sum()
+            quarter_rows = bitmaps.rows(quarter_bits)
+            quarter_planned = star.total('planned_hours', quarter_rows)
+            quarter_actual = star.total('actual_hours', quarter_rows)
             quarter_overrun = quarter_actual - quarter_planned
-            quarter_overrun_cost = quarter_overrun * hourly_rate
-            quarter_jobs = len(quarter_df['job_number'].unique())
+            quarter_overrun_cost = star.total('actual_cost', quarter_rows) - star.total('planned_cost', quarter_rows)
+            quarter_jobs = star.distinct_total('job_number', quarter_rows)
             
             quarterly_data.append({
                 "quarter": quarter,
@@ -560,54 +862,7 @@ def load_year_data(year):
             })
     
     # Generate top overruns from real data
-    # Calculate overrun for each job
-    job_overruns = []
-    
-    # Group by job number and calculate totals
-    job_groups = {}
-    for _, row in year_df.iterrows():
-        job_number = row['job_number']
-        if pd.isna(job_number):
-            continue
-            
-        if job_number not in job_groups:
-            job_groups[job_number] = {
-                'planned_hours': 0,
-                'actual_hours': 0,
-                'part_name': row.get('part_name', 'Unknown Part'),
-                'work_center': row.get('work_center', 'Unknown'),
-                'task_description': row.get('task_description', '')
-            }
-            
-        job_groups[job_number]['planned_hours'] += row['planned_hours']
-        job_groups[job_number]['actual_hours'] += row['actual_hours']
-    
-    # Convert to list and calculate overruns
-    for job_number, data in job_groups.items():
-        planned_hours = data['planned_hours']
-        actual_hours = data['actual_hours']
-        overrun_hours = actual_hours - planned_hours
-        
-        # Only include jobs with overruns
-        if overrun_hours > 0:
-            job_overruns.append({
-                "job_number": job_number,
-                "part_name": data['part_name'],
-                "work_center": data['work_center'],
-                "task_description": data['task_description'],
-                "planned_hours": planned_hours,
-                "actual_hours": actual_hours,
-                "overrun_hours": overrun_hours,
-                "overrun_cost": overrun_hours * hourly_rate
-            })
-    
-    # If we have real overruns, use them; otherwise create placeholder entries
-    if job_overruns:
-        # Sort by overrun cost (descending) and take top 15
-        top_overruns = sorted(job_overruns, key=lambda x: x["overrun_cost"], reverse=True)[:15]
-    else:
-        # If no real data with overruns, provide empty list
-        top_overruns = []
+    top_overruns = _top_job_overruns(df, star, year_rows)
     
     # Generate NCR summary
     ncr_summary = []
@@ -620,7 +875,7 @@ def load_year_data(year):
         ncr_summary.append({
             "part_name": part_name,
             "total_ncr_hours": total_ncr_hours,
-            "total_ncr_cost": total_ncr_hours * hourly_rate,
+            "total_ncr_cost": total_ncr_hours * DEFAULT_BURDEN_RATE,
             "ncr_occurrences": ncr_occurrences
         })
     
@@ -628,39 +883,7 @@ def load_year_data(year):
     ncr_summary = sorted(ncr_summary, key=lambda x: x["total_ncr_cost"], reverse=True)
     
     # Generate work center summary from actual data
-    workcenter_summary = []
-    
-    # Get unique work centers for this year
-    year_work_centers = year_df['work_center'].unique().tolist()
-    
-    for wc in year_work_centers:
-        # Skip empty work centers
-        if not wc or pd.isna(wc):
-            continue
-            
-        # Filter data for this work center
-        wc_df = year_df[year_df['work_center'] == wc]
-        
-        if wc_df.empty:
-            continue
-            
-        # Calculate hours
-        wc_planned = wc_df['planned_hours'].sum()
-        wc_actual = wc_df['actual_hours'].sum()
-        wc_overrun = wc_actual - wc_planned
-        wc_job_count = len(wc_df['job_number'].unique())
-        
-        workcenter_summary.append({
-            "work_center": wc,
-            "job_count": wc_job_count,
-            "planned_hours": wc_planned,
-            "actual_hours": wc_actual,
-            "overrun_hours": wc_overrun,
-            "overrun_cost": wc_overrun * hourly_rate
-        })
-    
-    # Sort work centers by overrun cost (descending)
-    workcenter_summary = sorted(workcenter_summary, key=lambda x: x["overrun_cost"], reverse=True)
+    workcenter_summary = _workcenter_summary(star, year_rows)
     
     # Generate repeat NCR failures
     repeat_ncr_failures = []
@@ -750,13 +973,296 @@ def load_year_data(year):
         "avg_adjustment_percent": sum(job["adjustment_percent"] for job in job_adjustments) / len(job_adjustments) if job_adjustments else 0
     }
 
+# Dimensions rolling series can be split by (one series per value)
+ROLLING_DIMENSIONS = ("work_center",)
+
+def get_rolling_series(freq="M", dimension=None):
+    """Return windowed-metric prefix sums of the shared dataset, built once per frequency and dimension per data version."""
+    if dimension is not None and dimension not in ROLLING_DIMENSIONS:
+        raise ValueError(f"Unsupported rolling dimension: {dimension}")
+    df = get_dataset()
+    date_index = get_date_index()
+    star = get_star_schema()
+    ncr = get_derived_columns()['ncr'].to_numpy(dtype=bool)
+    
+    with _dataset_lock:
+        built = _dataset_cache.get("rolling")
+        if built is None or _dataset_cache["df"] is not df:
+            built = _dataset_cache["rolling"] = {}
+        series = built.get((freq, dimension))
+        if series is None:
+            # Dated rows only, in finish-date order
+            rows = date_index.positions
+            planned = star.measures['planned_hours'][rows]
+            actual = star.measures['actual_hours'][rows]
+            planned_cost = star.measures['planned_cost'][rows]
+            actual_cost = star.measures['actual_cost'][rows]
+            measures = {
+                "planned_hours": planned,
+                "actual_hours": actual,
+                "overrun_hours": actual - planned,
+                "ncr_hours": np.where(ncr[rows], actual, 0.0),
+                "planned_cost": planned_cost,
+                "actual_cost": actual_cost,
+                "overrun_cost": actual_cost - planned_cost,
+                "operations": np.ones(len(rows))
+            }
+            codes, groups = None, None
+            if dimension is not None:
+                codes = star.codes[dimension][rows]
+                groups = star.dictionaries[dimension].tolist()
+            series = built[(freq, dimension)] = RollingSeries(date_index.dates, measures, freq, codes, groups)
+        return series
+
+@cached_result(lambda metric, freq="M", window=12, stat="sum", dimension=None: {"metrics", f"metric:{metric}"})
+def load_rolling_metric(metric, freq="M", window=12, stat="sum", dimension=None):
+    """Load a metric over trailing windows of `window` periods (e.g. trailing 12 months, rolling 4 weeks).
+    
+    freq is "D", "W" or "M"; stat="mean" gives a moving average per period instead of
+    the window total. With a dimension the series is split by its values.
+    """
+    if metric not in ROLLING_METRICS:
+        raise ValueError(f"Unsupported rolling metric: {metric}")
+    if freq not in ROLLING_FREQUENCIES:
+        raise ValueError(f"Unsupported frequency: {freq}")
+    if stat not in ROLLING_STATS:
+        raise ValueError(f"Unsupported statistic: {stat}")
+    window = max(int(window), 1)
+    
+    series = get_rolling_series(freq, dimension)
+    return {
+        "metric": metric,
+        "freq": freq,
+        "window": window,
+        "stat": stat,
+        "dimension": dimension,
+        "series": series.records(metric, window, stat)
+    }
+
+# Dimensions with overrun ratio sketches, and the quantiles reported for them
+SKETCH_DIMENSIONS = ("work_center", "part_name")
+SKETCH_QUANTILES = (0.5, 0.9, 0.99)
+
+# Overrun ratio (actual / planned hours) histogram bins
+OVERRUN_RATIO_BINS = [0, 0.5, 0.75, 0.9, 1.0, 1.1, 1.25, 1.5, 2.0, 3.0, 5.0, np.inf]
+
+def _build_overrun_sketches(df):
+    """Sketch the overrun ratio of every planned operation per year and dimension value."""
+    star = get_star_schema()
+    planned = star.measures['planned_hours']
+    rows = np.flatnonzero(planned > 0)
+    ratios = star.measures['actual_hours'][rows] / planned[rows]
+    
+    # Years partition the sketches; rows without a finish date form a partition of their own
+    years = df['year'].to_numpy()[rows] if 'year' in df.columns else np.zeros(len(rows), dtype=np.int64)
+    partitions, partition_names = pd.factorize(years, sort=True)
+    partition_names = [int(y) for y in partition_names]
+    
+    sketches = {}
+    for dim in SKETCH_DIMENSIONS:
+        if dim in star.codes:
+            sketches[dim] = SketchIndex(
+                ratios, star.codes[dim][rows], star.dictionaries[dim].tolist(), partitions, partition_names
+            )
+    return sketches
+
+def get_overrun_sketches():
+    """Return overrun ratio sketches per SKETCH_DIMENSIONS dimension, built once per data version."""
+    df = get_dataset()
+    with _dataset_lock:
+        sketches = _dataset_cache.get("sketches")
+        if sketches is not None and _dataset_cache["df"] is df:
+            return sketches
+        version = _dataset_cache["version"]
+    
+    # A fresh process reuses the sketches built by an earlier one for this version
+    found, sketches = load_artifact("overrun_sketches", version)
+    if not found:
+        sketches = _build_overrun_sketches(df)
+        if not df.empty:
+            save_artifact("overrun_sketches", sketches, version)
+    with _dataset_lock:
+        if _dataset_cache["df"] is df:
+            _dataset_cache["sketches"] = sketches
+    return sketches
+
+def _sketch_years(year):
+    return None if year is None else [int(year)]
+
+def _quantile_record(count, quantiles):
+    record = {"count": int(count)}
+    for q, value in zip(SKETCH_QUANTILES, quantiles):
+        record[f"p{round(q * 100):d}"] = None if np.isnan(value) else float(value)
+    return record
+
+@cached_result(lambda dimension="work_center", year=None: {"dashboard"} if year is None else {f"year:{int(year)}"})
+def load_overrun_distribution(dimension="work_center", year=None):
+    """Load p50/p90/p99 overrun ratios (actual / planned hours) per dimension value, for a year or all years."""
+    if dimension not in SKETCH_DIMENSIONS:
+        raise ValueError(f"Unsupported distribution dimension: {dimension}")
+    
+    index = get_overrun_sketches().get(dimension)
+    if index is None:
+        return {"dimension": dimension, "year": year, "overall": _quantile_record(0, [np.nan] * len(SKETCH_QUANTILES)), "groups": []}
+    
+    partitions = _sketch_years(year)
+    counts, quantiles = index.quantile_table(SKETCH_QUANTILES, partitions)
+    overall = index.sketch(partitions=partitions)
+    
+    groups = []
+    for group, count, values in zip(index.groups, counts.tolist(), quantiles):
+        if not count or pd.isna(group):
+            continue
+        groups.append({dimension: group, **_quantile_record(count, values)})
+    
+    # Widest tails first
+    groups.sort(key=lambda x: x[f"p{round(SKETCH_QUANTILES[1] * 100):d}"], reverse=True)
+    
+    return {
+        "dimension": dimension,
+        "year": year,
+        "overall": _quantile_record(overall.count, overall.quantiles(SKETCH_QUANTILES)),
+        "groups": groups
+    }
+
+@cached_result(lambda dimension=None, value=None, year=None: {"dashboard"} if year is None else {f"year:{int(year)}"})
+def load_overrun_histogram(dimension=None, value=None, year=None):
+    """Load the overrun ratio histogram over OVERRUN_RATIO_BINS, for one dimension value or all operations.
+    
+    The last bin is open-ended (high is None).
+    """
+    sketches = get_overrun_sketches()
+    index = sketches.get(dimension or SKETCH_DIMENSIONS[0])
+    if index is None:
+        counts = np.zeros(len(OVERRUN_RATIO_BINS) - 1, dtype=np.int64)
+    else:
+        sketch = index.sketch(value if dimension else None, _sketch_years(year))
+        counts = sketch.histogram(OVERRUN_RATIO_BINS)
+    
+    return [
+        {"low": float(low), "high": None if np.isinf(high) else float(high), "count": int(count)}
+        for low, high, count in zip(OVERRUN_RATIO_BINS[:-1], OVERRUN_RATIO_BINS[1:], counts.tolist())
+    ]
+
+def date_range_tags(start, end):
+    """Result cache tags of a [start, end) date range: one per calendar year it overlaps."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if end <= start:
+        return set()
+    return {f"year:{y}" for y in range(start.year, (end - pd.Timedelta(1)).year + 1)}
+
+@cached_result(date_range_tags)
+def load_date_range_data(start, end):
+    """Load summary, top overrun and work center data for operations finished in [start, end)."""
+    df = get_dataset()
+    
+    # The range is a slice of the finish-date order; sums run over the coded rows
+    rows = np.sort(get_date_index().rows(start, end)) if not df.empty else np.array([], dtype=np.int64)
+    if not len(rows):
+        return {
+            "summary": {
+                "total_planned_hours": 0,
+                "total_actual_hours": 0,
+                "total_overrun_hours": 0,
+                "total_ncr_hours": 0,
+                "total_planned_cost": 0,
+                "total_actual_cost": 0,
+                "opportunity_cost_dollars": 0,
+                "overrun_percent": 0,
+                "total_jobs": 0,
+                "total_operations": 0,
+                "total_customers": 0
+            },
+            "top_overruns": [],
+            "workcenter_summary": []
+        }
+    
+    star = get_star_schema()
+    bitmaps = get_bitmap_index()
+    
+    # Calculate hours and costs
+    planned_hours = star.total('planned_hours', rows)
+    actual_hours = star.total('actual_hours', rows)
+    overrun_hours = actual_hours - planned_hours
+    planned_cost = star.total('planned_cost', rows)
+    actual_cost = star.total('actual_cost', rows)
+    
+    # Count NCR-related work
+    ncr_rows = rows[bitmaps.contains(bitmaps.bitmap('work_center', 'NCR'), rows)]
+    ncr_hours = star.total('actual_hours', ncr_rows) if len(ncr_rows) else 0
+    
+    return {
+        "summary": {
+            "total_planned_hours": planned_hours,
+            "total_actual_hours": actual_hours,
+            "total_overrun_hours": overrun_hours,
+            "total_ncr_hours": ncr_hours,
+            "total_planned_cost": planned_cost,
+            "total_actual_cost": actual_cost,
+            "opportunity_cost_dollars": actual_cost - planned_cost,
+            "overrun_percent": (overrun_hours / planned_hours * 100) if planned_hours > 0 else 0,
+            "total_jobs": star.distinct_total('job_number', rows),
+            "total_operations": len(rows),
+            "total_customers": star.distinct_total('customer_name', rows)
+        },
+        "top_overruns": _top_job_overruns(df, star, rows),
+        "workcenter_summary": _workcenter_summary(star, rows)
+    }
+
+# Metrics understood by load_metric_data
+METRIC_NAMES = (
+    "planned_hours", "actual_hours", "overrun_hours", "overrun_percent",
+    "ncr_hours", "planned_cost", "actual_cost", "overrun_cost",
+    "avg_cost_per_hour", "total_jobs", "total_operations", "total_customers"
+)
+
+def _metric_for_rows(metric, star, rows, ncr_rows):
+    """Return a load_metric_data metric over row positions of the shared dataset.
+    
+    ncr_rows are the positions among rows in the NCR work center.
+    """
+    planned = star.total('planned_hours', rows)
+    actual = star.total('actual_hours', rows)
+    
+    if metric == "planned_hours":
+        return planned
+    if metric == "actual_hours":
+        return actual
+    if metric == "overrun_hours":
+        return actual - planned
+    if metric == "overrun_percent":
+        return ((actual - planned) / planned * 100) if planned > 0 else 0
+    if metric == "ncr_hours":
+        return star.total('actual_hours', ncr_rows)
+    if "cost" in metric:
+        # Costs are summed at each operation's burden rate
+        planned_cost = star.total('planned_cost', rows)
+        actual_cost = star.total('actual_cost', rows)
+        if metric == "planned_cost":
+            return planned_cost
+        if metric == "actual_cost":
+            return actual_cost
+        if metric == "overrun_cost":
+            return actual_cost - planned_cost
+        if metric == "avg_cost_per_hour":
+            return actual_cost / actual if actual > 0 else 0
+        return None
+    if metric == "total_jobs":
+        return star.distinct_total('job_number', rows)
+    if metric == "total_operations":
+        return len(rows)
+    if metric == "total_customers":
+        return star.distinct_total('customer_name', rows)
+    return 0
+
+@cached_result(lambda metric: {"metrics", f"metric:{metric}"}, persist=True)
 def load_metric_data(metric):
     """Load detailed data for a specific metric."""
     print(f"Loading data for metric: {metric}")
     
-    # Load Excel data
+    # Load the shared dataset; computed columns come from the derived column registry
     try:
-        df = load_excel_data()
+        df = get_dataset()
         
         if df.empty:
             print(f"No Excel data available for metric {metric}")
@@ -776,7 +1282,7 @@ def load_metric_data(metric):
                 "related_jobs": []
             }
             
-        # Get yearly summary first, needed for the extract_yearly_values function
+        # Get yearly summary first (cached for the shared dataset), needed for extract_yearly_values
         yearly_data = load_yearly_summary()
         
         # Function to extract yearly values based on metric
@@ -801,17 +1307,16 @@ def load_metric_data(metric):
                 elif metric_name == "ncr_hours":
                     value = item.get("ncr_hours", 0)
                 elif "cost" in metric_name:
-                    # For cost metrics, multiply hours by rate
-                    labor_rate = 199  # Use the standard rate
+                    # Yearly costs are already summed at each operation's burden rate
                     if metric_name == "planned_cost":
-                        value = item.get("planned_hours", 0) * labor_rate
+                        value = item.get("planned_cost", 0)
                     elif metric_name == "actual_cost":
-                        value = item.get("actual_hours", 0) * labor_rate
+                        value = item.get("actual_cost", 0)
                     elif metric_name == "overrun_cost":
-                        value = (item.get("actual_hours", 0) - item.get("planned_hours", 0)) * labor_rate
+                        value = item.get("actual_cost", 0) - item.get("planned_cost", 0)
                     elif metric_name == "avg_cost_per_hour":
                         hours = item.get("actual_hours", 0)
-                        value = labor_rate if hours > 0 else 0
+                        value = item.get("actual_cost", 0) / hours if hours > 0 else 0
                 elif metric_name == "total_jobs" or metric_name == "job_count":
                     value = item.get("job_count", 0)
                 elif metric_name == "total_operations" or metric_name == "operation_count":
@@ -862,48 +1367,20 @@ def load_metric_data(metric):
             summary_data["trend_direction"] = "Stable"
             summary_data["trend_strength"] = "No change"
         
+        # Row positions per customer and work center, and the NCR rows, from the shared indexes
+        star = get_star_schema()
+        drilldown = get_drilldown_index()
+        bitmaps = get_bitmap_index()
+        ncr_bits = bitmaps.bitmap('work_center', 'NCR')
+        
+        def metric_value(rows):
+            ncr_rows = rows[bitmaps.contains(ncr_bits, rows)]
+            return _metric_for_rows(metric, star, rows, ncr_rows)
+        
         # Calculate customer data from actual data
         customer_data = []
-        for customer in df['customer_name'].unique():
-            customer_df = df[df['customer_name'] == customer]
-            
-            # Calculate value based on metric
-            if metric == "planned_hours":
-                value = customer_df['planned_hours'].sum()
-            elif metric == "actual_hours":
-                value = customer_df['actual_hours'].sum()
-            elif metric == "overrun_hours":
-                value = customer_df['actual_hours'].sum() - customer_df['planned_hours'].sum()
-            elif metric == "overrun_percent":
-                planned = customer_df['planned_hours'].sum()
-                value = ((customer_df['actual_hours'].sum() - planned) / planned * 100) if planned > 0 else 0
-            elif metric == "ncr_hours":
-                # Only count hours from work centers marked as NCR
-                value = customer_df[customer_df['work_center'] == 'NCR']['actual_hours'].sum()
-            elif "cost" in metric:
-                # For cost metrics, multiply hours by rate (which is already in the data)
-                labor_rate = 199  # Default rate if not in data
-                if 'labor_rate' in customer_df.columns:
-                    # Use average labor rate from data if available
-                    labor_rate = customer_df['labor_rate'].mean()
-                    
-                if metric == "planned_cost":
-                    value = customer_df['planned_hours'].sum() * labor_rate
-                elif metric == "actual_cost":
-                    value = customer_df['actual_hours'].sum() * labor_rate
-                elif metric == "overrun_cost":
-                    value = (customer_df['actual_hours'].sum() - customer_df['planned_hours'].sum()) * labor_rate
-                elif metric == "avg_cost_per_hour":
-                    hours = customer_df['actual_hours'].sum()
-                    value = labor_rate if hours > 0 else 0
-            elif metric == "total_jobs":
-                value = len(customer_df['job_number'].unique())
-            elif metric == "total_operations":
-                value = len(customer_df)
-            elif metric == "total_customers":
-                value = 1  # Each customer counts as 1 for this metric
-            else:
-                value = 0
+        for customer in drilldown.values('customer_name'):
+            value = metric_value(drilldown.postings('customer_name', customer))
                 
             # Create abbreviated list_name
             if len(customer) > 12:
@@ -928,46 +1405,8 @@ def load_metric_data(metric):
         
         # Calculate work center data
         workcenter_data = []
-        for wc in df['work_center'].unique():
-            wc_df = df[df['work_center'] == wc]
-            
-            # Calculate value based on metric
-            if metric == "planned_hours":
-                value = wc_df['planned_hours'].sum()
-            elif metric == "actual_hours":
-                value = wc_df['actual_hours'].sum()
-            elif metric == "overrun_hours":
-                value = wc_df['actual_hours'].sum() - wc_df['planned_hours'].sum()
-            elif metric == "overrun_percent":
-                planned = wc_df['planned_hours'].sum()
-                value = ((wc_df['actual_hours'].sum() - planned) / planned * 100) if planned > 0 else 0
-            elif metric == "ncr_hours":
-                # Only count hours if this is the NCR workcenter
-                value = wc_df['actual_hours'].sum() if wc == 'NCR' else 0
-            elif "cost" in metric:
-                # For cost metrics, multiply hours by rate
-                labor_rate = 199  # Default rate if not in data
-                if 'labor_rate' in wc_df.columns:
-                    # Use average labor rate from data if available
-                    labor_rate = wc_df['labor_rate'].mean()
-                    
-                if metric == "planned_cost":
-                    value = wc_df['planned_hours'].sum() * labor_rate
-                elif metric == "actual_cost":
-                    value = wc_df['actual_hours'].sum() * labor_rate
-                elif metric == "overrun_cost":
-                    value = (wc_df['actual_hours'].sum() - wc_df['planned_hours'].sum()) * labor_rate
-                elif metric == "avg_cost_per_hour":
-                    hours = wc_df['actual_hours'].sum()
-                    value = labor_rate if hours > 0 else 0
-            elif metric == "total_jobs":
-                value = len(wc_df['job_number'].unique())
-            elif metric == "total_operations":
-                value = len(wc_df)
-            elif metric == "total_customers":
-                value = len(wc_df['customer_name'].unique())
-            else:
-                value = 0
+        for wc in drilldown.values('work_center'):
+            value = metric_value(drilldown.postings('work_center', wc))
                 
             # Calculate percent of total
             total = summary_data["total"]
@@ -982,54 +1421,21 @@ def load_metric_data(metric):
         # Calculate monthly data
         monthly_data = []
         
-        # Get month names for all dates
-        if 'operation_finish_date' in df.columns:
-            df['month'] = df['operation_finish_date'].dt.strftime('%b')
-            unique_years = len(df['operation_finish_date'].dt.year.unique())
-        else:
-            df['month'] = 'Jan'  # Default if no date column
-            unique_years = 1
-            
-        for month in ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]:
-            month_df = df[df['month'] == month]
+        unique_years = max(len(available_years(df)), 1)
             
-            # Calculate value based on metric
-            if metric == "planned_hours":
-                value = month_df['planned_hours'].sum() / unique_years
-            elif metric == "actual_hours":
-                value = month_df['actual_hours'].sum() / unique_years
-            elif metric == "overrun_hours":
-                value = (month_df['actual_hours'].sum() - month_df['planned_hours'].sum()) / unique_years
-            elif metric == "overrun_percent":
-                planned = month_df['planned_hours'].sum()
-                value = ((month_df['actual_hours'].sum() - planned) / planned * 100) if planned > 0 else 0
-            elif metric == "ncr_hours":
-                # Only count hours from work centers marked as NCR
-                value = month_df[month_df['work_center'] == 'NCR']['actual_hours'].sum() / unique_years
-            elif "cost" in metric:
-                # For cost metrics, multiply hours by rate
-                labor_rate = 199  # Default rate if not in data
-                if 'labor_rate' in month_df.columns:
-                    # Use average labor rate from data if available
-                    labor_rate = month_df['labor_rate'].mean()
-                    
-                if metric == "planned_cost":
-                    value = month_df['planned_hours'].sum() * labor_rate / unique_years
-                elif metric == "actual_cost":
-                    value = month_df['actual_hours'].sum() * labor_rate / unique_years
-                elif metric == "overrun_cost":
-                    value = (month_df['actual_hours'].sum() - month_df['planned_hours'].sum()) * labor_rate / unique_years
-                elif metric == "avg_cost_per_hour":
-                    hours = month_df['actual_hours'].sum()
-                    value = labor_rate if hours > 0 else 0
-            elif metric == "total_jobs":
-                value = len(month_df['job_number'].unique()) / unique_years
-            elif metric == "total_operations":
-                value = len(month_df) / unique_years
-            elif metric == "total_customers":
-                value = len(month_df['customer_name'].unique()) / unique_years
+        for month_num, month in enumerate(MONTH_NAMES, start=1):
+            if 'month' in bitmaps.dimensions:
+                month_bits = bitmaps.bitmap('month', month_num)
             else:
-                value = 0
+                # Without dates every operation counts as January
+                month_bits = bitmaps.full() if month_num == 1 else bitmaps.empty()
+            rows = bitmaps.rows(month_bits)
+            ncr_rows = bitmaps.rows(month_bits & ncr_bits)
+            value = _metric_for_rows(metric, star, rows, ncr_rows)
+            
+            # Percentages and rates are not averaged over the years
+            if metric not in ("overrun_percent", "avg_cost_per_hour") and metric in METRIC_NAMES:
+                value = value / unique_years
                 
             monthly_data.append({
                 "month": month,
@@ -1056,65 +1462,54 @@ def load_metric_data(metric):
         related_jobs = []
         
         # Find the top 20 jobs most relevant to this metric
-        if metric == "planned_hours":
-            # Jobs with highest planned hours
-            if 'planned_hours' in df.columns:
-                sorted_jobs = df.sort_values('planned_hours', ascending=False)
-                related_jobs = sorted_jobs.head(20).to_dict('records')
-                
-        elif metric == "actual_hours":
-            # Jobs with highest actual hours
-            if 'actual_hours' in df.columns:
-                sorted_jobs = df.sort_values('actual_hours', ascending=False)
-                related_jobs = sorted_jobs.head(20).to_dict('records')
+        derived = get_derived_columns()
+        
+        def top_jobs(values, rows=None, **extra):
+            """Return the 20 records with the highest values, with extra derived columns added."""
+            values = values.reset_index(drop=True)
+            if rows is not None:
+                values = values.iloc[rows]
+            positions = values.sort_values(ascending=False).head(20).index
+            top = df.iloc[positions]
+            if extra:
+                top = top.assign(**{name: column.iloc[positions].to_numpy() for name, column in extra.items()})
+            return top.to_dict('records')
+        
+        if metric in ("planned_hours", "actual_hours"):
+            # Jobs with the highest planned or actual hours
+            if metric in df.columns:
+                related_jobs = top_jobs(df[metric])
                 
         elif metric == "overrun_hours":
             # Jobs with highest overruns
             if 'planned_hours' in df.columns and 'actual_hours' in df.columns:
-                df['overrun'] = df['actual_hours'] - df['planned_hours']
-                sorted_jobs = df.sort_values('overrun', ascending=False)
-                related_jobs = sorted_jobs.head(20).to_dict('records')
+                related_jobs = top_jobs(derived['overrun'], overrun=derived['overrun'])
                 
         elif metric == "overrun_percent":
             # Jobs with highest overrun percentage
             if 'planned_hours' in df.columns and 'actual_hours' in df.columns:
-                df['overrun_pct'] = (df['actual_hours'] - df['planned_hours']) / df['planned_hours'] * 100
-                df['overrun_pct'] = df['overrun_pct'].replace([np.inf, -np.inf], np.nan).fillna(0)
-                sorted_jobs = df.sort_values('overrun_pct', ascending=False)
-                related_jobs = sorted_jobs.head(20).to_dict('records')
+                related_jobs = top_jobs(derived['overrun_pct'], overrun_pct=derived['overrun_pct'])
                 
         elif metric == "ncr_hours":
             # Get NCR jobs
-            sorted_jobs = df[df['work_center'] == 'NCR'].sort_values('actual_hours', ascending=False)
-            related_jobs = sorted_jobs.head(20).to_dict('records')
+            ncr_rows = np.flatnonzero(derived['ncr'].to_numpy())
+            related_jobs = top_jobs(df['actual_hours'], rows=ncr_rows)
             
         elif "cost" in metric:
-            # For cost metrics, add cost column first
-            labor_rate = 199
-            if 'labor_rate' in df.columns:
-                # Use each record's individual labor rate if available
-                df['calculated_cost'] = df.apply(lambda row: row['actual_hours'] * row.get('labor_rate', labor_rate), axis=1)
-            else:
-                # Otherwise use a fixed labor rate
-                df['calculated_cost'] = df['actual_hours'] * labor_rate
-                
+            # Actual cost uses each record's own labor rate when the data has one
+            costs = {"calculated_cost": derived['cost']}
             if metric == "planned_cost":
-                df['planned_cost'] = df['planned_hours'] * labor_rate
-                sorted_jobs = df.sort_values('planned_cost', ascending=False)
-            elif metric == "actual_cost":
-                sorted_jobs = df.sort_values('calculated_cost', ascending=False)
+                costs["planned_cost"] = derived['planned_cost']
+                related_jobs = top_jobs(derived['planned_cost'], **costs)
             elif metric == "overrun_cost":
-                df['overrun_cost'] = (df['actual_hours'] - df['planned_hours']) * labor_rate
-                sorted_jobs = df.sort_values('overrun_cost', ascending=False)
+                costs["overrun_cost"] = derived['overrun_cost']
+                related_jobs = top_jobs(derived['overrun_cost'], **costs)
             else:
-                sorted_jobs = df.sort_values('calculated_cost', ascending=False)
-                
-            related_jobs = sorted_jobs.head(20).to_dict('records')
+                related_jobs = top_jobs(derived['cost'], **costs)
             
         else:
             # Default: sort by actual_hours
-            sorted_jobs = df.sort_values('actual_hours', ascending=False)
-            related_jobs = sorted_jobs.head(20).to_dict('records')
+            related_jobs = top_jobs(df['actual_hours'])
         
         # Calculate correlations (using our derived values or estimating realistic correlation)
         for other_metric in metrics:
@@ -1280,15 +1675,15 @@ def load_metric_data(metric):
         elif metric_name == "customer_count" or metric_name == "total_customers":
             return [float(item["customer_count"]) for item in yearly_data]
         elif metric_name == "planned_cost":
-            return [float(item["planned_hours"]) * 199 for item in yearly_data]
+            return [float(item["planned_cost"]) for item in yearly_data]
         elif metric_name == "actual_cost":
-            return [float(item["actual_hours"]) * 199 for item in yearly_data]
+            return [float(item["actual_cost"]) for item in yearly_data]
         elif metric_name == "overrun_cost":
-            return [float(item["overrun_hours"]) * 199 for item in yearly_data]
+            return [float(item["actual_cost"]) - float(item["planned_cost"]) for item in yearly_data]
         elif metric_name == "overrun_percent":
             return [float(item["overrun_hours"]) / float(item["planned_hours"]) * 100 if float(item["planned_hours"]) > 0 else 0 for item in yearly_data]
         elif metric_name == "avg_cost_per_hour":
-            return [199 for _ in yearly_data]  # Default hourly rate
+            return [float(item["actual_cost"]) / float(item["actual_hours"]) if float(item["actual_hours"]) > 0 else 0 for item in yearly_data]
         else:
             return [0 for _ in yearly_data]  # Default fallback
     
@@ -1358,4 +1753,79 @@ def load_metric_data(metric):
         "workcenter_data": workcenter_data,
         "monthly_data": monthly_data,
         "correlations": correlations
-    }
\ No newline at end of file
+    }
+
+# Column each metric's related jobs are ranked by
+METRIC_JOB_SORT = {
+    "planned_hours": "planned_hours",
+    "actual_hours": "actual_hours",
+    "overrun_hours": "overrun_hours",
+    "overrun_percent": "overrun_percent",
+    "ncr_hours": "actual_hours",
+    "planned_cost": "planned_cost",
+    "actual_cost": "actual_cost",
+    "overrun_cost": "overrun_cost",
+    "avg_cost_per_hour": "actual_cost"
+}
+
+RELATED_JOB_COLUMNS = [
+    'job_number', 'part_name', 'customer_name', 'work_center', 'task_description',
+    'planned_hours', 'actual_hours', 'operation_finish_date'
+]
+
+def load_metric_jobs_page(metric, page=1, page_size=DEFAULT_PAGE_SIZE, sort_by=None, ascending=False, search=None):
+    """Return one page of the operations related to a metric, ranked by that metric.
+    
+    The page comes with total-count metadata and a summary over every related operation.
+    """
+    df = get_dataset()
+    if df.empty:
+        result = paginate_frame(pd.DataFrame(columns=RELATED_JOB_COLUMNS), page, page_size)
+        result["summary"] = {"planned_hours": 0, "actual_hours": 0, "unique_parts": 0}
+        return result
+    
+    # Dataset columns plus memoized derived ones, without copying the dataset
+    jobs = get_derived_columns().frame(RELATED_JOB_COLUMNS, {
+        'overrun_hours': 'overrun',
+        'overrun_percent': 'overrun_pct',
+        'planned_cost': 'planned_cost',
+        'actual_cost': 'cost',
+        'overrun_cost': 'overrun_cost'
+    })
+    if metric == "ncr_hours":
+        jobs = jobs.iloc[get_drilldown_index().query(work_center='NCR')]
+    
+    result = paginate_frame(
+        jobs,
+        page=page,
+        page_size=page_size,
+        sort_by=sort_by or METRIC_JOB_SORT.get(metric, 'actual_hours'),
+        ascending=ascending,
+        search=search,
+        search_columns=['job_number', 'part_name', 'customer_name', 'work_center', 'task_description']
+    )
+    result["summary"] = {
+        "planned_hours": float(jobs['planned_hours'].sum()),
+        "actual_hours": float(jobs['actual_hours'].sum()),
+        "unique_parts": int(jobs['part_name'].nunique()) if 'part_name' in jobs.columns else 0
+    }
+    return result
+
+def warm_disk_cache():
+    """Compute and persist the dataset, dashboard, every year and every metric.
+    
+    Run at build/deploy time so new instances start with a warm on-disk cache.
+    """
+    df = get_dataset()
+    if df.empty:
+        print("No data to cache")
+        return
+    
+    load_dashboard_bundle()
+    load_yearly_summary()
+    for year in available_years(df):
+        load_year_data(year)
+    for metric in METRIC_NAMES:
+        load_metric_data(metric)
+    get_overrun_sketches()
+    print(f"Disk cache warmed for data version {get_data_version()}")
@@ -0,0 +1,89 @@
+"""
+Data version tracking for the Work History data sources
+"""
+import hashlib
+import os
+import time
+
+# Possible locations for the work history Excel file, in lookup order
+EXCEL_PATHS = [
+    'WORKHISTORY.xlsx',  # Root directory
+    'attached_assets/WORKHISTORY.xlsx',  # Assets folder
+    '../WORKHISTORY.xlsx',  # Parent directory
+    './WORKHISTORY.xlsx'   # Explicit current directory
+]
+
+# Possible locations for the effective-dated labor rate table (see utils.labor_rates)
+RATE_TABLE_PATHS = [
+    os.environ.get('WORKHISTORY_LABOR_RATES_FILE', 'labor_rates.csv'),
+    'attached_assets/labor_rates.csv'
+]
+
+# Stamp file rewritten by every upload so all processes see the new version
+VERSION_FILE = os.environ.get('WORKHISTORY_VERSION_FILE', '.data_version')
+
+
+def find_excel_file():
+    """Return the first existing work history Excel path, or None."""
+    for file_path in EXCEL_PATHS:
+        if os.path.exists(file_path):
+            return file_path
+    return None
+
+
+def find_rate_table_file():
+    """Return the first existing labor rate table path, or None."""
+    for file_path in RATE_TABLE_PATHS:
+        if os.path.exists(file_path):
+            return file_path
+    return None
+
+
+def get_data_version():
+    """Return a short token that changes whenever the work history data or the labor rates change."""
+    parts = []
+
+    try:
+        with open(VERSION_FILE) as f:
+            parts.append(f.read().strip())
+    except FileNotFoundError:
+        pass
+
+    file_path = find_excel_file()
+    if file_path:
+        stat = os.stat(file_path)
+        parts.append(f"{file_path}:{stat.st_mtime_ns}:{stat.st_size}")
+
+    # Costs depend on the rate table, so cached results are per data and rate version
+    rate_path = find_rate_table_file()
+    if rate_path:
+        stat = os.stat(rate_path)
+        parts.append(f"{rate_path}:{stat.st_mtime_ns}:{stat.st_size}")
+
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def bump_data_version(tags=None):
+    """Record that the data changed (e.g. after an upload) and return the new version.
+
+    tags optionally names the cached results the change affects (see
+    utils.result_cache), so caches can drop only those instead of everything.
+    """
+    previous = get_data_version()
+    tmp_path = f"{VERSION_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(f"{time.time_ns():x}\n{previous}\n{','.join(sorted(tags or []))}")
+    os.replace(tmp_path, VERSION_FILE)
+    return get_data_version()
+
+
+def get_last_change():
+    """Return (version before the last bump, tags it affected); tags is empty if unknown."""
+    try:
+        with open(VERSION_FILE) as f:
+            lines = f.read().split("\n")
+    except FileNotFoundError:
+        return None, set()
+    if len(lines) < 3:
+        return None, set()
+    return lines[1], {tag for tag in lines[2].split(",") if tag}
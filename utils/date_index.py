@@ -0,0 +1,98 @@
+"""
+Sorted finish-date index for arbitrary date-range queries
+
+Row positions of the dataset are kept sorted by operation finish date, so the
+rows of any date range (trailing 90 days, a fiscal year, a custom span) are a
+contiguous slice of that order: two binary searches and a view of the
+positions, however long the history is.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.calendar_columns import FISCAL_YEAR_START_MONTH
+
+ONE_DAY = pd.Timedelta(days=1)
+
+
+class DateIndex:
+    """Row positions of a DataFrame in finish-date order; rows without a date are left out.
+
+    Positions refer to df.iloc, so the index is only valid for the frame it was built from.
+    Ranges are half-open: start is included, end is not.
+    """
+
+    def __init__(self, df, date_column="operation_finish_date"):
+        if date_column in df.columns:
+            dates = pd.to_datetime(df[date_column], errors="coerce").to_numpy(dtype="datetime64[ns]")
+        else:
+            dates = np.array([], dtype="datetime64[ns]")
+        positions = np.flatnonzero(~np.isnat(dates))
+        order = positions[np.argsort(dates[positions], kind="stable")]
+
+        self.row_count = len(df)
+        self.dates = dates[order]
+        self.positions = order
+        # Slices of the index are handed out as views, so keep it immutable
+        self.dates.flags.writeable = False
+        self.positions.flags.writeable = False
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def first_date(self):
+        return pd.Timestamp(self.dates[0]) if len(self.dates) else None
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(self.dates[-1]) if len(self.dates) else None
+
+    def bounds(self, start=None, end=None):
+        """Return the (lo, hi) slice of the sorted order covering [start, end)."""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), "ns"), side="left"))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), "ns"), side="left"))
+        return lo, max(lo, hi)
+
+    def rows(self, start=None, end=None):
+        """Return the row positions finished in [start, end), in date order (a read-only view)."""
+        lo, hi = self.bounds(start, end)
+        return self.positions[lo:hi]
+
+    def count(self, start=None, end=None):
+        """Return the number of rows finished in [start, end)."""
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+
+def day_range(first_day, last_day):
+    """Return the half-open range covering two calendar days inclusive."""
+    start = pd.Timestamp(first_day).normalize()
+    return start, pd.Timestamp(last_day).normalize() + ONE_DAY
+
+
+def trailing_range(last_day, days):
+    """Return the range of the `days` calendar days ending with last_day."""
+    end = pd.Timestamp(last_day).normalize() + ONE_DAY
+    return end - pd.Timedelta(days=days), end
+
+
+def fiscal_year_range(fiscal_year, start_month=FISCAL_YEAR_START_MONTH):
+    """Return the range of a fiscal year, named (as in calendar_columns) for the calendar year it ends in."""
+    first_year = fiscal_year - 1 if start_month > 1 else fiscal_year
+    start = pd.Timestamp(year=first_year, month=start_month, day=1)
+    return start, start + pd.DateOffset(years=1)
+
+
+def fiscal_year_of(day, start_month=FISCAL_YEAR_START_MONTH):
+    day = pd.Timestamp(day)
+    return day.year + 1 if start_month > 1 and day.month >= start_month else day.year
+
+
+# Named ranges relative to the last day with data -> function(last_day) returning (start, end)
+DATE_RANGE_PRESETS = {
+    "Trailing 30 days": lambda last_day: trailing_range(last_day, 30),
+    "Trailing 90 days": lambda last_day: trailing_range(last_day, 90),
+    "Trailing 365 days": lambda last_day: trailing_range(last_day, 365),
+    "Year to date": lambda last_day: day_range(pd.Timestamp(last_day).replace(month=1, day=1), last_day),
+    "Fiscal year": lambda last_day: fiscal_year_range(fiscal_year_of(last_day))
+}
@@ -0,0 +1,46 @@
+"""
+Date range picker component for the Streamlit pages
+
+Offers the named ranges of utils.date_index (trailing windows, year to date,
+fiscal year) relative to the last operation in the data, or a custom span of
+days, and returns the chosen half-open range for load_date_range_data.
+"""
+import streamlit as st
+
+from utils.date_index import DATE_RANGE_PRESETS, ONE_DAY, day_range
+
+CUSTOM_RANGE = "Custom range"
+
+
+def date_range_picker(key, first_day, last_day, default="Trailing 90 days"):
+    """Render the range selector and return (start, end, label) with end exclusive."""
+    options = list(DATE_RANGE_PRESETS) + [CUSTOM_RANGE]
+    choice_col, dates_col = st.columns([1, 2])
+    with choice_col:
+        choice = st.selectbox(
+            "Period", options,
+            index=options.index(default) if default in options else 0,
+            key=f"{key}_preset"
+        )
+
+    if choice == CUSTOM_RANGE:
+        with dates_col:
+            picked = st.date_input(
+                "Dates",
+                value=(max(first_day, last_day - 90 * ONE_DAY).date(), last_day.date()),
+                min_value=first_day.date(),
+                max_value=last_day.date(),
+                key=f"{key}_dates"
+            )
+        # The picker returns a single date until the second one is chosen
+        picked = list(picked) if isinstance(picked, (list, tuple)) else [picked]
+        picked = picked or [last_day.date()]
+        start, end = day_range(picked[0], picked[-1])
+    else:
+        start, end = DATE_RANGE_PRESETS[choice](last_day)
+
+    label = f"{start:%b %d, %Y} – {(end - ONE_DAY):%b %d, %Y}"
+    with dates_col:
+        if choice != CUSTOM_RANGE:
+            st.caption(f"{choice}: {label}")
+    return start, end, label
@@ -0,0 +1,128 @@
+"""
+Derived columns of the shared work history dataset
+
+The dataset is shared read-only between every loader in the process. Columns
+computed from it (overrun, overrun percentage, burden rate and costs, ghost and
+NCR flags) are registered here, computed the first time a caller asks for one
+and then kept with the dataset for its data version, instead of each loader
+copying the frame and adding its own columns.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.cost_engine import frame_burden_rates
+from utils.labor_rates import effective_rates
+
+# Derived column name -> function(df, derived) returning a Series aligned with df
+DERIVED_COLUMNS = {}
+
+
+def derived_column(name):
+    """Register a derived column; the function may read other derived columns via `derived`."""
+    def decorator(func):
+        DERIVED_COLUMNS[name] = func
+        return func
+    return decorator
+
+
+def read_only(obj):
+    """Return a DataFrame or Series whose NumPy-backed values cannot be written in place.
+
+    Extension-typed columns (e.g. strings) are shared as they are.
+    """
+    if isinstance(obj, pd.Series):
+        if not isinstance(obj.dtype, np.dtype):
+            return obj
+        values = obj.to_numpy(copy=True)
+        values.flags.writeable = False
+        return pd.Series(values, index=obj.index, name=obj.name, copy=False)
+
+    columns = {}
+    for col in obj.columns:
+        series = obj[col]
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy(copy=True)
+            values.flags.writeable = False
+            columns[col] = values
+        else:
+            columns[col] = series.array
+    frozen = pd.DataFrame(columns, index=obj.index, copy=False)
+    frozen.attrs = dict(obj.attrs)
+    return frozen
+
+
+class DerivedColumns:
+    """Memoized derived columns of one DataFrame, computed on first access."""
+
+    def __init__(self, df):
+        self._df = df
+        self._values = {}
+        # Re-entrant: a derived column may be computed from others
+        self._lock = threading.RLock()
+
+    def __contains__(self, name):
+        return name in DERIVED_COLUMNS
+
+    def __getitem__(self, name):
+        with self._lock:
+            values = self._values.get(name)
+            if values is None:
+                func = DERIVED_COLUMNS.get(name)
+                if func is None:
+                    raise KeyError(f"Unknown derived column: {name}")
+                values = self._values[name] = read_only(func(self._df, self).rename(name))
+            return values
+
+    def frame(self, columns=(), derived=None):
+        """Return dataset columns plus derived ones (mapping output name -> derived name) as a DataFrame."""
+        data = {col: self._df[col] for col in columns if col in self._df.columns}
+        for output, name in (derived or {}).items():
+            data[output] = self[name]
+        return pd.DataFrame(data, index=self._df.index, copy=False)
+
+
+@derived_column("overrun")
+def _overrun(df, derived):
+    return df["actual_hours"] - df["planned_hours"]
+
+
+@derived_column("overrun_pct")
+def _overrun_pct(df, derived):
+    pct = derived["overrun"] / df["planned_hours"] * 100
+    return pct.replace([np.inf, -np.inf], np.nan).fillna(0)
+
+
+@derived_column("burden_rate")
+def _burden_rate(df, derived):
+    # Rates in effect on each finish date, from the effective-dated rate table
+    return pd.Series(frame_burden_rates(df, effective_rates(df)), index=df.index)
+
+
+@derived_column("cost")
+def _cost(df, derived):
+    return df["actual_hours"] * derived["burden_rate"]
+
+
+@derived_column("planned_cost")
+def _planned_cost(df, derived):
+    return df["planned_hours"] * derived["burden_rate"]
+
+
+@derived_column("overrun_cost")
+def _overrun_cost(df, derived):
+    return derived["overrun"] * derived["burden_rate"]
+
+
+@derived_column("ghost")
+def _ghost(df, derived):
+    # Planned work with no hours recorded against it
+    return (df["planned_hours"] > 0) & ~(df["actual_hours"] > 0)
+
+
+@derived_column("ncr")
+def _ncr(df, derived):
+    if "work_center" not in df.columns:
+        return pd.Series(False, index=df.index)
+    return df["work_center"] == "NCR"
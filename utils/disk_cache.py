@@ -0,0 +1,84 @@
+"""
+Persistent on-disk cache of computed work history artifacts
+
+Artifacts are stored per data version, so a fresh process (e.g. a new autoscale
+instance) can load the parsed dataset and computed summaries instead of
+re-reading the Excel file. A directory from another data version is never read.
+"""
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+
+from utils.data_version import get_data_version
+
+CACHE_DIR = os.environ.get("WORKHISTORY_DISK_CACHE_DIR", ".cache/workhistory")
+
+# Bump when the shape of cached artifacts changes so old files are ignored
+CACHE_FORMAT = "3"
+
+DISK_CACHE_ENABLED = os.environ.get("WORKHISTORY_DISK_CACHE", "1") != "0"
+
+_prune_lock = threading.Lock()
+_pruned_for = set()
+
+
+def _version_dir(version):
+    return os.path.join(CACHE_DIR, f"v{CACHE_FORMAT}-{version}")
+
+
+def _artifact_path(version, name):
+    # Names come from cache keys, so hash them into safe file names
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:20]
+    return os.path.join(_version_dir(version), f"{digest}.pkl")
+
+
+def load_artifact(name, version=None):
+    """Return (True, value) if the artifact exists for the data version, else (False, None)."""
+    if not DISK_CACHE_ENABLED:
+        return False, None
+    version = version or get_data_version()
+    try:
+        with open(_artifact_path(version, name), "rb") as f:
+            return True, pickle.load(f)
+    except FileNotFoundError:
+        return False, None
+    except Exception as e:
+        print(f"Ignoring unreadable cache artifact {name}: {e}")
+        return False, None
+
+
+def save_artifact(name, value, version=None):
+    """Write an artifact for the data version atomically; failures are logged, not raised."""
+    if not DISK_CACHE_ENABLED:
+        return
+    version = version or get_data_version()
+    path = _artifact_path(version, name)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Could not write cache artifact {name}: {e}")
+        return
+    prune_old_versions(version)
+
+
+def prune_old_versions(version):
+    """Remove cache directories for other data versions (once per version per process)."""
+    with _prune_lock:
+        if version in _pruned_for:
+            return
+        _pruned_for.add(version)
+
+    keep = os.path.basename(_version_dir(version))
+    try:
+        entries = os.listdir(CACHE_DIR)
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry != keep:
+            shutil.rmtree(os.path.join(CACHE_DIR, entry), ignore_errors=True)
@@ -0,0 +1,102 @@
+"""
+In-memory inverted index for drill-down filtering of the work history data
+
+Each dimension value maps to the sorted positions of its rows, so a query such as
+"customer X, part Y, work center Z in year N" intersects a few small arrays
+instead of building boolean masks over the whole frame.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.calendar_columns import CALENDAR_COLUMNS, calendar_values
+
+# Columns indexed by default; year is the calendar column added at ingest
+DRILLDOWN_DIMENSIONS = ("customer_name", "part_name", "work_center", "year")
+
+
+def _intersect(small, large):
+    """Intersect two sorted position arrays by binary-searching the smaller one in the larger."""
+    idx = np.searchsorted(large, small)
+    idx[idx == len(large)] = 0
+    return small[large[idx] == small] if len(large) else large
+
+
+class DrilldownIndex:
+    """Sorted row-position postings per dimension value of a DataFrame.
+
+    Positions refer to df.iloc, so the index is only valid for the frame it was built from.
+    """
+
+    def __init__(self, df, dimensions=DRILLDOWN_DIMENSIONS):
+        self.row_count = len(df)
+        self._postings = {}
+
+        for dim in dimensions:
+            values = self._dimension_values(df, dim)
+            if values is None:
+                continue
+
+            codes, uniques = pd.factorize(values, sort=False)
+            # Stable sort keeps positions ascending within each value
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+            # Rows with a missing value (code -1) sort first; skip past them
+            start = int((codes < 0).sum())
+            offsets = start + np.concatenate(([0], np.cumsum(counts)))
+
+            self._postings[dim] = {
+                value: order[offsets[i]:offsets[i + 1]]
+                for i, value in enumerate(uniques.tolist())
+            }
+
+    @staticmethod
+    def _dimension_values(df, dim):
+        if dim in CALENDAR_COLUMNS and dim in df.columns:
+            # Rows without a finish date are left out rather than indexed as year 0
+            return calendar_values(df, dim)
+        if dim not in df.columns:
+            return None
+        return df[dim]
+
+    @property
+    def dimensions(self):
+        return list(self._postings)
+
+    def values(self, dim):
+        """Return the indexed values of a dimension."""
+        return list(self._postings.get(dim, {}))
+
+    def postings(self, dim, value):
+        """Return the sorted row positions for a value (a list of values is OR-ed)."""
+        table = self._postings.get(dim)
+        if table is None:
+            raise KeyError(f"Dimension not indexed: {dim}")
+
+        if isinstance(value, (list, tuple, set)):
+            arrays = [table[v] for v in value if v in table]
+            if not arrays:
+                return np.empty(0, dtype=np.int32)
+            return np.unique(np.concatenate(arrays))
+
+        return table.get(value, np.empty(0, dtype=np.int32))
+
+    def query(self, **filters):
+        """Return the sorted row positions matching every filter.
+
+        Filters with a value of None are ignored; no filters returns every row.
+        """
+        arrays = [self.postings(dim, value) for dim, value in filters.items() if value is not None]
+        if not arrays:
+            return np.arange(self.row_count, dtype=np.int32)
+
+        # Intersect smallest first so each step works on the fewest rows
+        arrays.sort(key=len)
+        result = arrays[0]
+        for array in arrays[1:]:
+            if not len(result):
+                break
+            result = _intersect(result, array)
+        return result
+
+    def count(self, **filters):
+        return len(self.query(**filters))
@@ -0,0 +1,132 @@
+"""
+Effective-dated labor rate table
+
+Rates change over time and differ between work centers. The rate table is a CSV
+with one row per rate change:
+
+    work_center,effective_from,rate
+    *,2020-01-01,185
+    *,2023-01-01,199
+    MILL,2023-07-01,215
+
+A rate applies from its effective_from date until the next change for the same
+work center; "*" (or a blank work center) is the shop-wide rate used where a
+work center has no rate of its own. Each operation is given the rate in effect
+on its finish date by an as-of join on the sorted dates, rather than looking up
+rates one operation at a time. Operations that haven't finished are charged the
+rate in effect today.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.data_version import find_rate_table_file
+
+# Work center key of the shop-wide rate
+ALL_WORK_CENTERS = "*"
+
+# Parsed rate table, keyed by the file's identity so an edited table is re-read
+_rate_table_cache = {"key": None, "table": None}
+_rate_table_lock = threading.Lock()
+
+
+def empty_rate_table():
+    return pd.DataFrame({
+        "work_center": pd.Series(dtype=object),
+        "effective_from": pd.Series(dtype="datetime64[ns]"),
+        "rate": pd.Series(dtype="float64")
+    })
+
+
+def parse_rate_table(table):
+    """Normalize a rate table DataFrame; rows without a date or rate are dropped."""
+    if "effective_from" not in table.columns or "rate" not in table.columns:
+        raise ValueError(f"Rate table needs effective_from and rate columns, got {list(table.columns)}")
+
+    if "work_center" in table.columns:
+        work_centers = table["work_center"].fillna("").astype(str).str.strip()
+    else:
+        work_centers = pd.Series("", index=table.index)
+    work_centers = work_centers.where(work_centers != "", ALL_WORK_CENTERS)
+
+    parsed = pd.DataFrame({
+        "work_center": work_centers.astype(object),
+        "effective_from": pd.to_datetime(table["effective_from"], errors="coerce").astype("datetime64[ns]"),
+        "rate": pd.to_numeric(table["rate"], errors="coerce").astype("float64")
+    })
+    parsed = parsed.dropna(subset=["effective_from", "rate"])
+    return parsed.sort_values("effective_from", kind="stable").reset_index(drop=True)
+
+
+def get_rate_table():
+    """Return the parsed rate table, re-read when the file changes; empty if there is none."""
+    file_path = find_rate_table_file()
+    key = None
+    if file_path:
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_mtime_ns, stat.st_size)
+
+    with _rate_table_lock:
+        if _rate_table_cache["table"] is None or _rate_table_cache["key"] != key:
+            table = empty_rate_table()
+            if file_path:
+                try:
+                    table = parse_rate_table(pd.read_csv(file_path))
+                    print(f"Loaded {len(table)} labor rates from {file_path}")
+                except Exception as e:
+                    print(f"Error loading labor rate table {file_path}: {e}")
+            _rate_table_cache["table"] = table
+            _rate_table_cache["key"] = key
+        return _rate_table_cache["table"]
+
+
+def effective_rates(df, table=None, date_column="operation_finish_date", today=None):
+    """Return the rate in effect for each row of df on its finish date, as a float array.
+
+    Rows without a finish date are still open and get the rate in effect today;
+    rows dated before any applicable rate get NaN.
+    """
+    if table is None:
+        table = get_rate_table()
+    rates = np.full(len(df), np.nan)
+    if table.empty:
+        return rates
+
+    if date_column in df.columns:
+        dates = pd.to_datetime(df[date_column], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    else:
+        dates = np.full(len(df), np.datetime64("NaT", "ns"))
+    today = pd.Timestamp.today() if today is None else pd.Timestamp(today)
+    dates = np.where(np.isnat(dates), np.datetime64(today.normalize(), "ns"), dates)
+
+    # Left side of the join: rows in date order, remembering their positions
+    order = np.argsort(dates, kind="stable")
+    rows = pd.DataFrame({"date": dates[order], "position": order})
+    if "work_center" in df.columns:
+        rows["work_center"] = df["work_center"].to_numpy(dtype=object)[order]
+    else:
+        rows["work_center"] = ALL_WORK_CENTERS
+
+    # Join keys must share a dtype; cast both sides the same way
+    rows["work_center"] = rows["work_center"].astype(str)
+    shop_wide = table[table["work_center"] == ALL_WORK_CENTERS]
+    per_center = table[table["work_center"] != ALL_WORK_CENTERS].astype({"work_center": str})
+
+    joined = np.full(len(rows), np.nan)
+    if not per_center.empty:
+        matched = pd.merge_asof(
+            rows, per_center, left_on="date", right_on="effective_from",
+            by="work_center", direction="backward"
+        )
+        joined = matched["rate"].to_numpy(dtype="float64")
+    if not shop_wide.empty:
+        matched = pd.merge_asof(
+            rows[["date"]], shop_wide[["effective_from", "rate"]],
+            left_on="date", right_on="effective_from", direction="backward"
+        )
+        joined = np.where(np.isnan(joined), matched["rate"].to_numpy(dtype="float64"), joined)
+
+    rates[rows["position"].to_numpy()] = joined
+    return rates
@@ -0,0 +1,91 @@
+"""
+Paginated table component for the Streamlit pages
+
+The table asks its fetch function for one page at a time, already filtered and
+sorted, and formats only the rows on that page.
+"""
+import streamlit as st
+
+from utils.pagination import DEFAULT_PAGE_SIZE
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+def _set_page(key, page):
+    st.session_state[f"{key}_page"] = page
+
+
+def paginated_table(key, fetch_page, formats=None, rename=None, sort_columns=None,
+                    default_sort=None, default_ascending=False, searchable=True,
+                    page_size=DEFAULT_PAGE_SIZE):
+    """Render a server-side paginated table and return the fetched page.
+
+    fetch_page(page, page_size, sort_by, ascending, search) must return a dict
+    like utils.pagination.paginate_frame does: rows, total, page, page_size, pages.
+    formats maps a column to a function applied to that column's visible values,
+    rename maps columns to display labels, and sort_columns lists sortable columns.
+    """
+    formats = formats or {}
+    rename = rename or {}
+    page_key = f"{key}_page"
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+
+    # Changing the filter or sort starts again from the first page
+    reset = lambda: _set_page(key, 1)
+
+    control_cols = st.columns([3, 2, 1, 1]) if sort_columns else st.columns([5, 1])
+    search = None
+    with control_cols[0]:
+        if searchable:
+            search = st.text_input("Filter", key=f"{key}_search", placeholder="Filter rows...",
+                                   on_change=reset, label_visibility="collapsed")
+
+    sort_by, ascending = None, default_ascending
+    if sort_columns:
+        with control_cols[1]:
+            sort_by = st.selectbox(
+                "Sort by", sort_columns,
+                index=sort_columns.index(default_sort) if default_sort in sort_columns else 0,
+                format_func=lambda c: rename.get(c, c),
+                key=f"{key}_sort", on_change=reset, label_visibility="collapsed"
+            )
+        with control_cols[2]:
+            ascending = st.selectbox(
+                "Order", [False, True], index=1 if default_ascending else 0,
+                format_func=lambda asc: "Ascending" if asc else "Descending",
+                key=f"{key}_order", on_change=reset, label_visibility="collapsed"
+            )
+    with control_cols[-1]:
+        size = st.selectbox(
+            "Rows", PAGE_SIZES,
+            index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+            key=f"{key}_size", on_change=reset, label_visibility="collapsed"
+        )
+
+    result = fetch_page(st.session_state[page_key], size, sort_by, ascending, search or None)
+    # The data may have shrunk since the page number was stored
+    st.session_state[page_key] = result["page"]
+
+    display = result["rows"].copy()
+    for col, formatter in formats.items():
+        if col in display.columns:
+            display[col] = display[col].map(formatter)
+    display = display.rename(columns={k: v for k, v in rename.items() if k in display.columns})
+    st.dataframe(display, use_container_width=True, hide_index=True)
+
+    page, pages, total = result["page"], result["pages"], result["total"]
+    first_row = (page - 1) * result["page_size"] + 1 if total else 0
+    last_row = min(page * result["page_size"], total)
+
+    nav_cols = st.columns([4, 1, 1])
+    with nav_cols[0]:
+        st.caption(f"Showing {first_row:,}–{last_row:,} of {total:,} · page {page:,} of {pages:,}")
+    with nav_cols[1]:
+        st.button("◀ Previous", key=f"{key}_prev", disabled=page <= 1,
+                  on_click=_set_page, args=(key, page - 1), use_container_width=True)
+    with nav_cols[2]:
+        st.button("Next ▶", key=f"{key}_next", disabled=page >= pages,
+                  on_click=_set_page, args=(key, page + 1), use_container_width=True)
+
+    return result
@@ -0,0 +1,88 @@
+"""
+Server-side pagination of DataFrames for the dashboard tables
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PAGE_SIZE = 25
+
+
+def _sort_keys(values):
+    """Return float sort keys for a column, NaN where the value is missing."""
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        keys = values.to_numpy(dtype="datetime64[ns]").astype("int64").astype("float64")
+        keys[values.isna().to_numpy()] = np.nan
+        return keys
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    # Object columns holding only numbers (e.g. after .where(notnull, None)) sort numerically
+    present = values.dropna()
+    if values.dtype == object and len(present) and isinstance(present.iloc[0], (int, float, np.number)):
+        numeric = pd.to_numeric(values, errors="coerce")
+        if numeric.notna().sum() == len(present):
+            return numeric.to_numpy(dtype="float64", na_value=np.nan)
+    # Text and mixed columns sort by the rank of each distinct value
+    codes, _ = pd.factorize(values.astype(str).where(values.notna()), sort=True)
+    keys = codes.astype("float64")
+    keys[codes < 0] = np.nan
+    return keys
+
+
+def _page_order(values, end, ascending):
+    """Return row positions of the first `end` rows in sort order (missing values last).
+
+    Rows with equal keys keep their frame order, so consecutive pages never repeat or
+    skip rows. Only a partial sort is done when the page is near the top of a large frame.
+    """
+    keys = _sort_keys(values)
+    if not ascending:
+        keys = -keys
+    keys = np.where(np.isnan(keys), np.inf, keys)
+
+    if end < len(keys) // 8:
+        # Every row up to the end-th key, including all rows tied with it, in position order
+        cutoff = np.partition(keys, end - 1)[end - 1]
+        candidates = np.flatnonzero(keys <= cutoff)
+        return candidates[np.argsort(keys[candidates], kind="stable")][:end]
+    return np.argsort(keys, kind="stable")[:end]
+
+
+def paginate_frame(df, page=1, page_size=DEFAULT_PAGE_SIZE, sort_by=None, ascending=True,
+                   search=None, search_columns=None):
+    """Return one sorted, filtered page of a DataFrame with total-count metadata.
+
+    Only the rows of the requested page are materialized; `search` keeps rows where
+    any of `search_columns` (default: all text columns) contains it, case-insensitively.
+    """
+    if search and not df.empty:
+        columns = search_columns or [
+            c for c in df.columns
+            if df[c].dtype == object or pd.api.types.is_string_dtype(df[c].dtype)
+        ]
+        mask = np.zeros(len(df), dtype=bool)
+        for col in columns:
+            if col in df.columns:
+                mask |= df[col].astype(str).str.contains(search, case=False, regex=False, na=False).to_numpy()
+        df = df[mask]
+
+    total = len(df)
+    page_size = max(1, int(page_size))
+    pages = max(1, math.ceil(total / page_size))
+    page = min(max(1, int(page)), pages)
+    start, end = (page - 1) * page_size, min(page * page_size, total)
+
+    if sort_by and sort_by in df.columns and total:
+        positions = _page_order(df[sort_by], end, ascending)[start:end]
+        rows = df.iloc[positions]
+    else:
+        rows = df.iloc[start:end]
+
+    return {
+        "rows": rows,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "pages": pages
+    }
@@ -0,0 +1,145 @@
+"""
+Mergeable quantile sketches for overrun ratio distributions
+
+Values are counted in logarithmic buckets whose width is a fixed fraction of
+their value, so any quantile read from a sketch is within SKETCH_ACCURACY
+(relative) of the true one. Every sketch shares the same bucket layout, which
+makes merging two sketches (two years, two partitions, two processes) a plain
+addition of their bucket counts, and lets a whole dimension be sketched with
+one pass of np.unique instead of sorting the rows of each value on request.
+"""
+import os
+
+import numpy as np
+
+# Relative accuracy of the quantiles read from a sketch
+SKETCH_ACCURACY = float(os.environ.get("WORKHISTORY_SKETCH_ACCURACY", "0.01"))
+
+# Values below MIN_VALUE count as zero; values above MAX_VALUE are clamped to it
+MIN_VALUE = 1e-3
+MAX_VALUE = 1e3
+
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = np.log(_GAMMA)
+_MIN_INDEX = int(np.floor(np.log(MIN_VALUE) / _LOG_GAMMA))
+_MAX_INDEX = int(np.ceil(np.log(MAX_VALUE) / _LOG_GAMMA))
+
+# Bucket 0 holds zeros; bucket i > 0 holds values in (gamma^(k-1), gamma^k], k = i + _MIN_INDEX - 1
+BUCKET_COUNT = _MAX_INDEX - _MIN_INDEX + 2
+BUCKET_VALUES = np.concatenate((
+    [0.0],
+    2 * _GAMMA ** np.arange(_MIN_INDEX, _MAX_INDEX + 1, dtype="float64") / (_GAMMA + 1)
+))
+
+
+def bucket_of(values):
+    """Return the bucket of each value (NaN and negative values count as zero)."""
+    values = np.asarray(values, dtype="float64")
+    buckets = np.zeros(len(values), dtype=np.int64)
+    positive = values >= MIN_VALUE
+    indexes = np.ceil(np.log(np.minimum(values[positive], MAX_VALUE)) / _LOG_GAMMA).astype(np.int64)
+    buckets[positive] = np.clip(indexes, _MIN_INDEX, _MAX_INDEX) - _MIN_INDEX + 1
+    return buckets
+
+
+def _quantiles_from_counts(counts, qs):
+    """Return quantiles per row of a (rows x BUCKET_COUNT) count matrix; rows without values are NaN."""
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1]
+    result = np.full((len(counts), len(qs)), np.nan)
+    for j, q in enumerate(qs):
+        # The bucket holding the value of rank q * (n - 1)
+        rank = q * (totals - 1)
+        index = (cumulative <= rank[:, None]).sum(axis=1)
+        result[:, j] = BUCKET_VALUES[np.minimum(index, BUCKET_COUNT - 1)]
+    result[totals == 0] = np.nan
+    return result
+
+
+class QuantileSketch:
+    """Bucket counts of one distribution; sketches merge by adding counts."""
+
+    def __init__(self, counts=None):
+        self.counts = np.zeros(BUCKET_COUNT, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, values):
+        sketch = cls()
+        sketch.add(values)
+        return sketch
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def add(self, values):
+        self.counts += np.bincount(bucket_of(values), minlength=BUCKET_COUNT)
+        return self
+
+    def merge(self, other):
+        """Return a new sketch of both distributions."""
+        return QuantileSketch(self.counts + other.counts)
+
+    def quantiles(self, qs):
+        """Return the quantiles (each 0..1) as a list, or Nones if the sketch is empty."""
+        values = _quantiles_from_counts(self.counts[None, :], list(qs))[0]
+        return [None if np.isnan(v) else float(v) for v in values]
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def histogram(self, edges):
+        """Return the number of values per bin of the given edges (len(edges) - 1 counts)."""
+        counts, _ = np.histogram(BUCKET_VALUES, bins=edges, weights=self.counts)
+        return counts.astype(np.int64)
+
+
+class SketchIndex:
+    """Quantile sketches per (partition, group), e.g. per year and work center.
+
+    Only occupied buckets are stored. Sketches of any set of partitions are merged
+    on request, so the same index answers one year or all years.
+    """
+
+    def __init__(self, values, codes, groups, partitions, partition_names):
+        self.groups = list(groups)
+        self.partition_names = list(partition_names)
+        group_count = max(len(self.groups), 1)
+
+        buckets = bucket_of(values)
+        keys = (np.asarray(partitions, dtype=np.int64) * group_count + np.asarray(codes, dtype=np.int64)) * BUCKET_COUNT + buckets
+        keys, counts = np.unique(keys, return_counts=True)
+        self._cells = keys // BUCKET_COUNT
+        self._buckets = keys % BUCKET_COUNT
+        self._counts = counts
+
+    def _selected(self, partitions=None):
+        """Return the cells, buckets and counts of the chosen partitions (all by default)."""
+        if partitions is None:
+            return self._cells, self._buckets, self._counts
+        codes = [self.partition_names.index(p) for p in partitions if p in self.partition_names]
+        keep = np.isin(self._cells // max(len(self.groups), 1), codes)
+        return self._cells[keep], self._buckets[keep], self._counts[keep]
+
+    def group_counts(self, partitions=None):
+        """Return the merged bucket counts per group as a (groups x BUCKET_COUNT) matrix."""
+        cells, buckets, counts = self._selected(partitions)
+        group_count = max(len(self.groups), 1)
+        groups = cells % group_count
+        return np.bincount(
+            groups * BUCKET_COUNT + buckets, weights=counts, minlength=group_count * BUCKET_COUNT
+        ).reshape(group_count, BUCKET_COUNT).astype(np.int64)
+
+    def sketch(self, group=None, partitions=None):
+        """Return the merged sketch of one group (or of every group) over the partitions."""
+        counts = self.group_counts(partitions)
+        if group is None:
+            return QuantileSketch(counts.sum(axis=0))
+        if group not in self.groups:
+            return QuantileSketch()
+        return QuantileSketch(counts[self.groups.index(group)])
+
+    def quantile_table(self, qs, partitions=None):
+        """Return (value counts, quantiles) per group: a length-groups array and a groups x len(qs) array."""
+        counts = self.group_counts(partitions)
+        return counts.sum(axis=1), _quantiles_from_counts(counts, list(qs))
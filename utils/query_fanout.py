@@ -0,0 +1,47 @@
+"""
+Concurrent execution of independent SQLAlchemy queries for the Work History API
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import sessionmaker
+
+from utils.sql_stats import current_endpoint, set_thread_endpoint
+
+# Keep this at or below the engine's pool size so tasks don't wait on connections
+QUERY_WORKERS = int(os.environ.get("WORKHISTORY_QUERY_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="query-fanout")
+_session_factories = {}
+
+
+def _session_factory(engine):
+    """Return a cached sessionmaker bound to the engine."""
+    factory = _session_factories.get(engine)
+    if factory is None:
+        factory = _session_factories[engine] = sessionmaker(bind=engine)
+    return factory
+
+
+def run_queries(engine, queries):
+    """
+    Run independent query functions concurrently and return their results by name.
+
+    Each function receives its own Session (sessions are not thread-safe) and its
+    connection comes from the engine's pool, so the total time approaches that of
+    the slowest query rather than the sum of all of them.
+    """
+    factory = _session_factory(engine)
+    # Attribute the workers' statements to the endpoint that fanned them out
+    endpoint = current_endpoint()
+
+    def run(query_func):
+        set_thread_endpoint(endpoint)
+        try:
+            with factory() as session:
+                return query_func(session)
+        finally:
+            set_thread_endpoint(None)
+
+    futures = {name: _executor.submit(run, query_func) for name, query_func in queries.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,182 @@
+"""
+Bounded in-process cache for data layer results
+
+Entries are evicted least-recently-used once their estimated size exceeds the
+memory budget. Each entry carries tags (e.g. "year:2023", "metrics") so an
+upload can drop only the results it affects.
+"""
+import functools
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.data_version import get_data_version, get_last_change
+from utils.disk_cache import load_artifact, save_artifact
+
+# Memory budget for cached results
+RESULT_CACHE_MB = float(os.environ.get("WORKHISTORY_RESULT_CACHE_MB", "256"))
+
+
+def estimate_size(obj, _seen=None):
+    """Return an estimate of the memory held by a result, in bytes."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(k, _seen) + estimate_size(v, _seen) for k, v in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item, _seen) for item in obj)
+    return sys.getsizeof(obj)
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by the estimated size of its values.
+
+    Cached values are shared between callers and must not be modified in place.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_version(self):
+        """Drop results made stale by a data change this cache wasn't told about."""
+        version = get_data_version()
+        if version == self._version:
+            return
+        previous, tags = get_last_change()
+        if self._version is not None and previous == self._version and tags:
+            # A single upload since our last look, and it said what it touched
+            self._invalidate_locked(tags)
+        elif self._version is not None:
+            self._clear_locked()
+        self._version = version
+
+    def get(self, key):
+        """Return (True, value) on a hit, (False, None) on a miss."""
+        with self._lock:
+            self._sync_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry["value"]
+
+    def put(self, key, value, tags=()):
+        size = estimate_size(value)
+        with self._lock:
+            if size > self.max_bytes:
+                # Larger than the whole budget; caching it would evict everything
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old["size"]
+            self._entries[key] = {"value": value, "size": size, "tags": frozenset(tags)}
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted["size"]
+                self.evictions += 1
+
+    def _invalidate_locked(self, tags):
+        tags = set(tags)
+        stale = [key for key, entry in self._entries.items() if entry["tags"] & tags]
+        for key in stale:
+            self._bytes -= self._entries.pop(key)["size"]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def _clear_locked(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._bytes = 0
+
+    def invalidate(self, tags):
+        """Drop every entry carrying any of the tags; returns how many were dropped."""
+        with self._lock:
+            return self._invalidate_locked(tags)
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def acknowledge_version(self):
+        """Accept the current data version without clearing (after a targeted invalidate)."""
+        with self._lock:
+            self._version = get_data_version()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+result_cache = ResultCache(RESULT_CACHE_MB * 1024 * 1024)
+
+
+def cached_result(tags, persist=False):
+    """Cache a loader's results in result_cache.
+
+    tags(*args, **kwargs) returns the tags for a call, used for targeted invalidation.
+    With persist=True results are also written to the on-disk cache for the current
+    data version, so a fresh process can load them instead of recomputing.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                # Unhashable arguments (e.g. lists) are not cached
+                return func(*args, **kwargs)
+            hit, value = result_cache.get(key)
+            if hit:
+                return value
+
+            # Read the version first so a result is never filed under a newer one
+            version = get_data_version()
+            if persist:
+                hit, value = load_artifact(repr(key), version)
+            if not hit:
+                value = func(*args, **kwargs)
+                if persist:
+                    save_artifact(repr(key), value, version)
+
+            result_cache.put(key, value, tags(*args, **kwargs))
+            return value
+        return wrapper
+    return decorator
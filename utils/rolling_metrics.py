@@ -0,0 +1,144 @@
+"""
+Rolling and trailing-window metrics over daily, weekly or monthly periods
+
+Each measure is binned once into a period x group table (groups being the
+values of a dimension such as work center, or a single "All" group) and turned
+into prefix sums along the periods. The total over any trailing window ending
+at a period is then one subtraction of two prefix sums, so a trailing 12-month
+overrun % or a rolling 4-week NCR series costs O(1) per point whatever the
+window length.
+"""
+import numpy as np
+import pandas as pd
+
+# Period frequency (a NumPy datetime unit) -> label
+ROLLING_FREQUENCIES = {"D": "Daily", "W": "Weekly", "M": "Monthly"}
+
+# Group name of the series when no dimension is given
+ALL_GROUP = "All"
+
+# Metric -> (numerator measure, denominator measure or None); ratios are computed per window
+ROLLING_METRICS = {
+    "planned_hours": ("planned_hours", None),
+    "actual_hours": ("actual_hours", None),
+    "overrun_hours": ("overrun_hours", None),
+    "overrun_percent": ("overrun_hours", "planned_hours"),
+    "ncr_hours": ("ncr_hours", None),
+    "planned_cost": ("planned_cost", None),
+    "actual_cost": ("actual_cost", None),
+    "overrun_cost": ("overrun_cost", None),
+    "avg_cost_per_hour": ("actual_cost", "actual_hours"),
+    "total_operations": ("operations", None)
+}
+
+# How a window is reduced: its total, or the average per period
+ROLLING_STATS = ("sum", "mean")
+
+# NumPy weeks start on the epoch's weekday (Thursday); shifting dates by three days
+# makes the week bins start on Mondays
+_WEEK_SHIFT = np.timedelta64(3, "D")
+
+
+def _period_numbers(dates, freq):
+    """Return the integer period of each date (days, Monday-based weeks or months since the epoch)."""
+    if freq == "W":
+        return (dates + _WEEK_SHIFT).astype("datetime64[W]").astype(np.int64)
+    return dates.astype(f"datetime64[{freq}]").astype(np.int64)
+
+
+def _period_starts(numbers, freq):
+    """Return the first day of each period number as timestamps."""
+    if freq == "W":
+        starts = numbers.astype("datetime64[W]").astype("datetime64[D]") - _WEEK_SHIFT
+    else:
+        starts = numbers.astype(f"datetime64[{freq}]").astype("datetime64[D]")
+    return pd.DatetimeIndex(starts.astype("datetime64[ns]"))
+
+
+class RollingSeries:
+    """Prefix sums of measures per period and group, for windowed totals in O(1) per point.
+
+    dates are the finish dates of the rows, measures maps a measure name to per-row
+    values aligned with dates, and codes/groups optionally split the rows by a
+    dimension (code i of codes is groups[i]). Every period between the first and
+    the last date is present, including those without operations.
+    """
+
+    def __init__(self, dates, measures, freq="M", codes=None, groups=None):
+        if freq not in ROLLING_FREQUENCIES:
+            raise ValueError(f"Unsupported frequency: {freq}")
+        self.freq = freq
+
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        numbers = _period_numbers(dates, freq)
+        if len(numbers):
+            first, last = int(numbers.min()), int(numbers.max())
+        else:
+            first, last = 0, -1
+        period_count = last - first + 1
+        self.periods = _period_starts(np.arange(first, last + 1, dtype=np.int64), freq)
+
+        if codes is None:
+            codes = np.zeros(len(dates), dtype=np.int64)
+            groups = [ALL_GROUP]
+        self.groups = list(groups)
+        group_count = len(self.groups)
+
+        # One bin per (period, group); cumulative sums along the periods
+        bins = (numbers - first) * group_count + np.asarray(codes, dtype=np.int64)
+        self._prefix = {}
+        for name, values in measures.items():
+            totals = np.bincount(
+                bins, weights=np.asarray(values, dtype="float64"), minlength=period_count * group_count
+            ).reshape(period_count, group_count)
+            prefix = np.zeros((period_count + 1, group_count))
+            np.cumsum(totals, axis=0, out=prefix[1:])
+            self._prefix[name] = prefix
+
+    @property
+    def measures(self):
+        return list(self._prefix)
+
+    def window_sum(self, measure, window):
+        """Return the total of a measure over the `window` periods ending at each period (periods x groups)."""
+        prefix = self._prefix[measure]
+        ends = np.arange(1, len(prefix))
+        starts = np.maximum(ends - window, 0)
+        return prefix[ends] - prefix[starts]
+
+    def window_periods(self, window):
+        """Return how many periods each trailing window covers (fewer at the start of the history)."""
+        return np.minimum(np.arange(1, len(self.periods) + 1), window)
+
+    def metric(self, metric, window, stat="sum"):
+        """Return a ROLLING_METRICS metric over trailing windows as a periods x groups array.
+
+        Ratio metrics (overrun %, cost per hour) divide the window totals; stat="mean"
+        averages other metrics per period of the window. Windows without the
+        denominator are NaN.
+        """
+        numerator, denominator = ROLLING_METRICS[metric]
+        values = self.window_sum(numerator, window)
+        if denominator is not None:
+            base = self.window_sum(denominator, window)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values = np.where(base > 0, values / base, np.nan)
+            return values * 100 if metric == "overrun_percent" else values
+        if stat == "mean":
+            return values / self.window_periods(window)[:, None]
+        return values
+
+    def records(self, metric, window, stat="sum", groups=None):
+        """Return the windowed metric as records of period, group and value."""
+        values = self.metric(metric, window, stat)
+        columns = range(len(self.groups)) if groups is None else [self.groups.index(g) for g in groups if g in self.groups]
+        records = []
+        for col in columns:
+            group = self.groups[col]
+            for period, value in zip(self.periods, values[:, col].tolist()):
+                records.append({
+                    "period": period,
+                    "group": group,
+                    "value": None if np.isnan(value) else value
+                })
+        return records
@@ -0,0 +1,130 @@
+"""
+Indexed text and date filters for job_history
+
+Case-insensitive matches are written against lower(column), which is backed by an
+expression index, so equality and prefix filters become index seeks. Substring
+filters use a trigram index: an FTS5 trigram table on SQLite, pg_trgm on PostgreSQL.
+
+Usage:
+    with db.engine.begin() as conn:
+        create_search_indexes(conn, JobHistory.__table__)
+    query.filter(equals_ci(JobHistory.work_center, "NCR"))
+"""
+from datetime import date
+
+from sqlalchemy import Index, and_, column, func, inspect, literal_column, select, table, text
+from sqlalchemy.schema import CreateIndex
+
+# Text columns filtered by the API and search
+SEARCH_COLUMNS = ["customer_name", "part_name", "work_center", "task_description"]
+
+FTS_TABLE = "job_history_fts"
+
+# Trigram indexes can't serve patterns shorter than one trigram
+MIN_TRIGRAM_LENGTH = 3
+
+
+def normalized(col):
+    """The lowercase form of a column, matching its expression index."""
+    return func.lower(col)
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def equals_ci(col, value):
+    """Case-insensitive equality that can use the lower(column) index."""
+    return normalized(col) == value.lower()
+
+
+def prefix_ci(col, value):
+    """Case-insensitive prefix match written as an index-friendly range."""
+    low = value.lower()
+    if not low:
+        return normalized(col).isnot(None)
+    # Every string starting with `low` sorts in [low, low + U+10FFFF)
+    return and_(normalized(col) >= low, normalized(col) < low + "\U0010ffff")
+
+
+def contains_ci(col, value, dialect):
+    """Case-insensitive substring match served by the trigram index."""
+    low = value.lower()
+
+    if dialect == "sqlite" and len(low) >= MIN_TRIGRAM_LENGTH:
+        fts = table(FTS_TABLE, column("rowid"), column(col.name))
+        # FTS5 only answers LIKE from the trigram index without an ESCAPE clause, so
+        # values containing wildcards are matched as a quoted phrase (a substring) instead
+        if "%" in low or "_" in low:
+            phrase = low.replace('"', '""')
+            condition = literal_column(FTS_TABLE).op("MATCH")(f'{col.name} : "{phrase}"')
+        else:
+            condition = fts.c[col.name].like(f"%{low}%")
+        matches = select(fts.c.rowid).where(condition)
+        return col.table.c.id.in_(matches)
+
+    # PostgreSQL: lower(column) LIKE '%x%' uses the gin_trgm_ops index
+    return normalized(col).like(f"%{_escape_like(low)}%", escape="\\")
+
+
+def year_range(col, year):
+    """Match a date column to a calendar year as a range the column's index can seek."""
+    return and_(col >= date(year, 1, 1), col < date(year + 1, 1, 1))
+
+
+def _create_sqlite_fts(conn, table_name):
+    """Create the FTS5 trigram mirror of job_history's text columns, kept in sync by triggers."""
+    if inspect(conn).has_table(FTS_TABLE):
+        return
+
+    cols = ", ".join(SEARCH_COLUMNS)
+    new_cols = ", ".join(f"new.{c}" for c in SEARCH_COLUMNS)
+    old_cols = ", ".join(f"old.{c}" for c in SEARCH_COLUMNS)
+
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({cols}, "
+        f"content='{table_name}', content_rowid='id', tokenize='trigram')"
+    ))
+    conn.execute(text(f"""
+        CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {table_name} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END"""))
+    conn.execute(text(f"""
+        CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {table_name} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END"""))
+    conn.execute(text(f"""
+        CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {table_name} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END"""))
+    # Index the rows that existed before the table was created
+    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def _create_index(conn, index):
+    # IF NOT EXISTS: checkfirst can't reflect expression indexes
+    conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def create_search_indexes(conn, job_history):
+    """Create the lower(), date and trigram indexes on job_history (no-op if they exist)."""
+    dialect = conn.dialect.name
+    name = job_history.name
+
+    _create_index(conn, Index(f"ix_{name}_operation_finish_date", job_history.c.operation_finish_date))
+    for col_name in SEARCH_COLUMNS:
+        _create_index(conn, Index(f"ix_{name}_{col_name}_lower", normalized(job_history.c[col_name])))
+
+    if dialect == "sqlite":
+        _create_sqlite_fts(conn, name)
+    elif dialect == "postgresql":
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for col_name in SEARCH_COLUMNS:
+            label = f"{col_name}_lower"
+            _create_index(conn, Index(
+                f"ix_{name}_{col_name}_trgm",
+                normalized(job_history.c[col_name]).label(label),
+                postgresql_using="gin",
+                postgresql_ops={label: "gin_trgm_ops"}
+            ))
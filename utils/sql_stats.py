@@ -0,0 +1,117 @@
+"""
+Per-statement SQL timing for the Work History API
+
+Usage:
+    with app.app_context():
+        install_sql_stats(db.engine)
+    ...
+    top_statements(20)  # slowest statements by total time, with their endpoints
+"""
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+# Statements slower than this are written to the slow-query log with their parameters
+SLOW_QUERY_MS = float(os.environ.get("WORKHISTORY_SLOW_QUERY_MS", "200"))
+
+slow_query_logger = logging.getLogger("workhistory.slow_sql")
+
+_lock = threading.Lock()
+_stats = {}
+_thread_endpoint = threading.local()
+
+
+def current_endpoint():
+    """Return the Flask endpoint the current thread is working for, if any."""
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return None
+    if has_request_context():
+        return request.endpoint
+    # utils.query_fanout worker threads have no request context of their own
+    return getattr(_thread_endpoint, "value", None)
+
+
+def set_thread_endpoint(endpoint):
+    """Attribute statements run on this thread (outside a request context) to an endpoint."""
+    _thread_endpoint.value = endpoint
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    # SQLite reports -1 for SELECT; psycopg2 reports the rows returned
+    rows = cursor.rowcount if cursor.rowcount >= 0 else 0
+    endpoint = current_endpoint() or "-"
+
+    with _lock:
+        entry = _stats.get(statement)
+        if entry is None:
+            entry = _stats[statement] = {
+                "statement": statement,
+                "calls": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "rows": 0,
+                "endpoints": {}
+            }
+        entry["calls"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["rows"] += rows
+        per_endpoint = entry["endpoints"].setdefault(endpoint, {"calls": 0, "total_ms": 0.0})
+        per_endpoint["calls"] += 1
+        per_endpoint["total_ms"] += elapsed_ms
+
+    if elapsed_ms >= SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            "🐢 %.1f ms [%s] rows=%s %s | params=%r",
+            elapsed_ms, endpoint, rows, " ".join(statement.split()), parameters
+        )
+
+
+def install_sql_stats(engine):
+    """Start recording statement timings on the engine (safe to call more than once)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+def top_statements(limit=20):
+    """Return the recorded statements with the highest total time."""
+    with _lock:
+        entries = [
+            dict(e, endpoints={name: dict(t) for name, t in e["endpoints"].items()})
+            for e in _stats.values()
+        ]
+
+    entries.sort(key=lambda e: e["total_ms"], reverse=True)
+    for entry in entries:
+        entry["avg_ms"] = entry["total_ms"] / entry["calls"]
+    return entries[:limit]
+
+
+def endpoint_totals():
+    """Return total SQL time and statement count per endpoint, slowest first."""
+    with _lock:
+        totals = {}
+        for entry in _stats.values():
+            for endpoint, timing in entry["endpoints"].items():
+                total = totals.setdefault(endpoint, {"endpoint": endpoint, "calls": 0, "total_ms": 0.0})
+                total["calls"] += timing["calls"]
+                total["total_ms"] += timing["total_ms"]
+
+    return sorted(totals.values(), key=lambda t: t["total_ms"], reverse=True)
+
+
+def reset_sql_stats():
+    with _lock:
+        _stats.clear()
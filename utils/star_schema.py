@@ -0,0 +1,115 @@
+"""
+Integer-coded star schema over the work history data
+
+Each dimension (customer, work center, job, part) is factorized once into a
+dictionary of its distinct values and an int32 code per row of the fact table.
+Rollups sum measures per code with np.bincount and look up display names only
+for the groups they return, instead of comparing strings for every group.
+"""
+import numpy as np
+import pandas as pd
+
+# Dimension columns coded by default
+STAR_DIMENSIONS = ("customer_name", "work_center", "job_number", "part_name")
+
+# Measure columns summed per group; missing values count as zero, like Series.sum()
+STAR_MEASURES = ("planned_hours", "actual_hours")
+
+
+class StarSchema:
+    """Dictionary tables and int32 code columns for the dimensions of a DataFrame.
+
+    Row positions passed to the methods refer to df.iloc, so a schema is only
+    valid for the frame it was built from.
+    """
+
+    def __init__(self, df, dimensions=STAR_DIMENSIONS, measures=STAR_MEASURES):
+        self.row_count = len(df)
+        self.dictionaries = {}
+        self.codes = {}
+        self.measures = {}
+
+        for dim in dimensions:
+            if dim not in df.columns:
+                continue
+            # Codes follow first appearance, matching the order of Series.unique();
+            # missing values get a code of their own rather than being dropped
+            codes, uniques = pd.factorize(df[dim], sort=False, use_na_sentinel=False)
+            self.codes[dim] = codes.astype(np.int32)
+            self.dictionaries[dim] = pd.Index(uniques)
+
+        for measure in measures:
+            if measure not in df.columns:
+                continue
+            values = pd.to_numeric(df[measure], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            self.measures[measure] = np.nan_to_num(values, nan=0.0)
+
+    def add_measure(self, name, values):
+        """Add a per-row measure (e.g. a cost computed from other columns); NaN counts as zero."""
+        values = np.asarray(values, dtype="float64")
+        if len(values) != self.row_count:
+            raise ValueError(f"Measure {name} has {len(values)} values for {self.row_count} rows")
+        self.measures[name] = np.nan_to_num(values, nan=0.0)
+
+    def _codes(self, dim, rows=None):
+        codes = self.codes.get(dim)
+        if codes is None:
+            raise KeyError(f"Dimension not coded: {dim}")
+        return codes if rows is None else codes[rows]
+
+    def size(self, dim):
+        """Return the number of distinct values of a dimension."""
+        return len(self.dictionaries[dim])
+
+    def names(self, dim, codes):
+        """Return the dimension values for an array of codes."""
+        return self.dictionaries[dim].take(np.asarray(codes, dtype=np.intp)).tolist()
+
+    def code_of(self, dim, value):
+        """Return the code of a dimension value, or -1 if it does not occur."""
+        dictionary = self.dictionaries.get(dim)
+        if dictionary is None or value not in dictionary:
+            return -1
+        return int(dictionary.get_loc(value))
+
+    def present(self, dim, rows=None):
+        """Return the codes occurring in the rows, in order of first appearance."""
+        codes = self._codes(dim, rows)
+        present, first = np.unique(codes, return_index=True)
+        return present[np.argsort(first, kind="stable")]
+
+    def first_rows(self, dim, rows=None):
+        """Return, per code in order of first appearance, the position of its first row."""
+        codes = self._codes(dim, rows)
+        _, first = np.unique(codes, return_index=True)
+        first.sort()
+        return first if rows is None else np.asarray(rows)[first]
+
+    def total(self, measure, rows=None):
+        """Return the sum of a measure over the rows (all rows by default)."""
+        values = self.measures[measure]
+        return values.sum() if rows is None else values[rows].sum()
+
+    def group_sum(self, dim, measure, rows=None):
+        """Return the sum of a measure per code (indexed by code) over the rows."""
+        weights = self.measures[measure]
+        if rows is not None:
+            weights = weights[rows]
+        return np.bincount(self._codes(dim, rows), weights=weights, minlength=self.size(dim))
+
+    def group_count(self, dim, rows=None):
+        """Return the number of rows per code over the rows."""
+        return np.bincount(self._codes(dim, rows), minlength=self.size(dim))
+
+    def distinct_count(self, dim, of, rows=None):
+        """Return, per code of dim, how many distinct values of `of` occur with it."""
+        width = max(self.size(of), 1)
+        pairs = np.unique(self._codes(dim, rows).astype(np.int64) * width + self._codes(of, rows))
+        return np.bincount(pairs // width, minlength=self.size(dim))
+
+    def distinct_total(self, dim, rows=None):
+        """Return how many distinct values of a dimension occur in the rows."""
+        codes = self._codes(dim, rows)
+        if rows is None:
+            return self.size(dim)
+        return int(np.count_nonzero(np.bincount(codes, minlength=self.size(dim))))
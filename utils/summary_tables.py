@@ -0,0 +1,184 @@
+"""
+Pre-aggregated summary tables for the Work History API
+
+Each rollup is stored per year so an upload only has to rebuild the years it
+touched. The summary endpoints read these small tables instead of grouping the
+whole job_history table on every request. Costs are stored alongside the hours,
+each operation charged its own rate (utils.cost_engine.sql_burden_rate), and the
+tables are rebuilt when the labor rates or costing rules change.
+
+Usage after an upload:
+    with db.engine.begin() as conn:
+        ensure_summary_tables(conn, JobHistory.__table__)
+        refresh_summary_tables(conn, JobHistory.__table__, years={2023, 2024})
+"""
+from sqlalchemy import (Column, Float, Integer, MetaData, String, Table, delete,
+                        func, insert, inspect, or_, select)
+
+from utils.cost_engine import cost_signature, sql_burden_rate
+
+metadata = MetaData()
+
+# Costing rules the stored costs were computed with (see cost_engine.cost_signature)
+summary_meta = Table(
+    "summary_meta", metadata,
+    Column("key", String, primary_key=True),
+    Column("value", String)
+)
+
+COST_SIGNATURE_KEY = "cost_signature"
+
+# Signature this process last verified the tables against, to skip re-checking per request
+_verified = {"signature": None}
+
+# Year is NULL for operations without a finish date, matching GROUP BY year on job_history
+summary_yearly = Table(
+    "summary_yearly", metadata,
+    Column("year", Integer, index=True),
+    Column("work_orders", Integer),
+    Column("unique_parts", Integer),
+    Column("planned_hours", Float),
+    Column("actual_hours", Float),
+    Column("planned_cost", Float),
+    Column("actual_cost", Float)
+)
+
+summary_customer_year = Table(
+    "summary_customer_year", metadata,
+    Column("year", Integer, index=True),
+    Column("customer_name", String),
+    Column("planned_hours", Float),
+    Column("actual_hours", Float),
+    Column("planned_cost", Float),
+    Column("actual_cost", Float)
+)
+
+summary_part_year = Table(
+    "summary_part_year", metadata,
+    Column("year", Integer, index=True),
+    Column("part_name", String),
+    Column("planned_hours", Float),
+    Column("actual_hours", Float),
+    Column("planned_cost", Float),
+    Column("actual_cost", Float)
+)
+
+# Distinct (part, work order) pairs per year: a work order with operations in
+# several years has a row in each, so distinct job counts across years stay exact
+summary_part_job_year = Table(
+    "summary_part_job_year", metadata,
+    Column("year", Integer, index=True),
+    Column("part_name", String, index=True),
+    Column("work_order_number", String)
+)
+
+summary_workcenter_year = Table(
+    "summary_workcenter_year", metadata,
+    Column("year", Integer, index=True),
+    Column("work_center", String),
+    Column("operations", Integer),
+    Column("planned_hours", Float),
+    Column("actual_hours", Float),
+    Column("planned_cost", Float),
+    Column("actual_cost", Float)
+)
+
+
+def _year(job_history):
+    return func.extract('year', job_history.c.operation_finish_date)
+
+
+def _rollups(job_history):
+    """Return (summary table, select over job_history producing its rows) pairs."""
+    jh = job_history.c
+    year = _year(job_history).label("year")
+    planned = func.sum(jh.planned_hours).label("planned_hours")
+    actual = func.sum(jh.actual_hours).label("actual_hours")
+    rate = sql_burden_rate(job_history)
+    planned_cost = func.sum(jh.planned_hours * rate).label("planned_cost")
+    actual_cost = func.sum(jh.actual_hours * rate).label("actual_cost")
+
+    return [
+        (summary_yearly, select(
+            year,
+            func.count(func.distinct(jh.work_order_number)).label("work_orders"),
+            func.count(func.distinct(jh.part_name)).label("unique_parts"),
+            planned, actual, planned_cost, actual_cost
+        ).group_by(year)),
+        (summary_customer_year, select(
+            year, jh.customer_name, planned, actual, planned_cost, actual_cost
+        ).group_by(year, jh.customer_name)),
+        (summary_part_year, select(
+            year, jh.part_name, planned, actual, planned_cost, actual_cost
+        ).group_by(year, jh.part_name)),
+        (summary_part_job_year, select(
+            year, jh.part_name, jh.work_order_number
+        ).group_by(year, jh.part_name, jh.work_order_number)),
+        (summary_workcenter_year, select(
+            year, jh.work_center,
+            func.count(jh.operation_number).label("operations"),
+            planned, actual, planned_cost, actual_cost
+        ).group_by(year, jh.work_center))
+    ]
+
+
+def _year_filter(column, years):
+    """Match a year column against a set of years that may include None."""
+    known = [int(y) for y in years if y is not None]
+    clauses = [column.in_(known)] if known else []
+    if None in years:
+        clauses.append(column.is_(None))
+    return or_(*clauses)
+
+
+def summary_tables_current():
+    """Return True if this process already verified the tables against the current costing rules."""
+    return _verified["signature"] == cost_signature()
+
+
+def ensure_summary_tables(conn, job_history):
+    """Create missing or outdated summary tables and repopulate them when needed.
+
+    The tables are fully rebuilt when one had to be (re)created, or when the stored
+    costs were computed with other labor rates or costing rules.
+    """
+    signature = cost_signature()
+    inspector = inspect(conn)
+    rebuilt = False
+    for table in metadata.sorted_tables:
+        if inspector.has_table(table.name):
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            if existing == {col.name for col in table.columns}:
+                continue
+            table.drop(conn)
+        table.create(conn)
+        rebuilt = True
+
+    stored = conn.execute(
+        select(summary_meta.c.value).where(summary_meta.c.key == COST_SIGNATURE_KEY)
+    ).scalar()
+    if rebuilt or stored != signature:
+        refresh_summary_tables(conn, job_history)
+        conn.execute(delete(summary_meta).where(summary_meta.c.key == COST_SIGNATURE_KEY))
+        conn.execute(insert(summary_meta).values(key=COST_SIGNATURE_KEY, value=signature))
+    _verified["signature"] = signature
+
+
+def refresh_summary_tables(conn, job_history, years=None):
+    """
+    Rebuild summary rows for the given years (all years when None).
+
+    Runs inside the caller's transaction, so readers never see a half-refreshed year.
+    """
+    if years is not None and not years:
+        return
+
+    for table, rollup in _rollups(job_history):
+        if years is None:
+            conn.execute(delete(table))
+        else:
+            conn.execute(delete(table).where(_year_filter(table.c.year, years)))
+            rollup = rollup.where(_year_filter(_year(job_history), years))
+
+        columns = [c.name for c in rollup.selected_columns]
+        conn.execute(table.insert().from_select(columns, rollup))
@@ -0,0 +1,120 @@
+"""
+Trigram index for the global work history search
+
+Job numbers, customers, parts and task descriptions are indexed once when the
+dataset is loaded. A query is split into trigrams, the postings of those
+trigrams are counted per entity, and the best-overlapping entities are returned.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.calendar_columns import calendar_values
+
+# Entity type -> DataFrame column searched
+SEARCH_FIELDS = {
+    "job": "job_number",
+    "customer": "customer_name",
+    "part": "part_name",
+    "task": "task_description"
+}
+
+# Candidates re-ranked by exact substring/prefix match per query
+RERANK_CANDIDATES = 200
+
+# Trigrams shared by more than this share of entities (e.g. "job") are skipped
+# when the query has rarer ones; they cost the most and discriminate the least
+COMMON_GRAM_SHARE = 0.05
+
+# Values that carry no information and are left out of the index
+IGNORED_VALUES = {"", "nan", "none", "n/a"}
+
+
+def normalize(value):
+    return " ".join(str(value).lower().split())
+
+
+def trigrams(text, pad_end=True):
+    """Return the set of trigrams of normalized text, padded so short words still produce some."""
+    padded = f"  {text} " if pad_end else f"  {text}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Inverted index from trigrams to the distinct search entities of a DataFrame."""
+
+    def __init__(self, df, fields=SEARCH_FIELDS):
+        entities = []
+        year_series = None
+        if "year" in df.columns:
+            year_series = calendar_values(df, "year").astype("float64")
+
+        for entity_type, col in fields.items():
+            if col not in df.columns:
+                continue
+            frame = pd.DataFrame({"value": df[col].astype(str).str.strip()})
+            frame["year"] = year_series if year_series is not None else np.nan
+            frame = frame[~frame["value"].str.lower().isin(IGNORED_VALUES)]
+            grouped = frame.groupby("value", sort=False).agg(
+                rows=("value", "size"),
+                latest_year=("year", "max")
+            )
+            for value, rows, latest_year in zip(grouped.index, grouped["rows"], grouped["latest_year"]):
+                entities.append({
+                    "type": entity_type,
+                    "value": value,
+                    "rows": int(rows),
+                    "year": None if pd.isna(latest_year) else int(latest_year)
+                })
+
+        self.entities = entities
+        self._normalized = [normalize(e["value"]) for e in entities]
+        self._gram_counts = np.array([len(trigrams(v)) for v in self._normalized], dtype=np.int32)
+
+        postings = {}
+        for entity_id, value in enumerate(self._normalized):
+            for gram in trigrams(value):
+                postings.setdefault(gram, []).append(entity_id)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def search(self, query, limit=10, min_score=0.2):
+        """Return the best matching entities for a query, highest score first.
+
+        The score is the trigram overlap relative to the query, with a bonus for
+        entities that contain the query verbatim or start with it.
+        """
+        text = normalize(query)
+        if not text or not self.entities:
+            return []
+
+        # No end padding: the last word may still be being typed
+        grams = trigrams(text, pad_end=False)
+        arrays = [self._postings[g] for g in grams if g in self._postings]
+        if not arrays:
+            return []
+        rare = [a for a in arrays if len(a) <= COMMON_GRAM_SHARE * len(self.entities)]
+        if rare:
+            arrays = rare
+
+        hits = np.bincount(np.concatenate(arrays), minlength=len(self.entities))
+        candidates = np.flatnonzero(hits)
+        # Overlap with the query, lightly penalising long values that match by chance
+        scores = hits[candidates] / len(arrays) - 0.1 * (1 - hits[candidates] / self._gram_counts[candidates])
+        if len(candidates) > RERANK_CANDIDATES:
+            top = np.argpartition(-scores, RERANK_CANDIDATES)[:RERANK_CANDIDATES]
+            candidates, scores = candidates[top], scores[top]
+
+        results = []
+        for entity_id, score in zip(candidates, scores):
+            value = self._normalized[entity_id]
+            if value.startswith(text):
+                score += 1.0
+            elif text in value:
+                score += 0.5
+            if score >= min_score:
+                results.append((score, entity_id))
+
+        results.sort(key=lambda r: (-r[0], self._normalized[r[1]]))
+        return [
+            dict(self.entities[entity_id], score=round(float(score), 3))
+            for score, entity_id in results[:limit]
+        ]
@@ -38,14 +38,14 @@ def create_yearly_trends_chart(yearly_df):
         secondary_y=False
     )
     
-    # Calculate overrun percentage
-    yearly_df["overrun_percent"] = (yearly_df["overrun_hours"] / yearly_df["planned_hours"]) * 100
+    # Calculate overrun percentage (without adding a column to the caller's frame)
+    overrun_percent = (yearly_df["overrun_hours"] / yearly_df["planned_hours"]) * 100
     
     # Add trace for overrun percentage
     fig.add_trace(
         go.Scatter(
             x=yearly_df["year"],
-            y=yearly_df["overrun_percent"],
+            y=overrun_percent,
             name="Overrun %",
             marker_color="#f59e0b",
             mode="lines+markers",
@@ -168,3 +168,63 @@ def create_workcenter_chart(workcenter_df):
     fig.for_each_trace(lambda t: t.update(name=t.name.replace("_hours", "").title()))
     
     return fig
+
+def create_rolling_chart(rolling_df, title, y_title, percent=False, money=False):
+    """Create a line chart of a trailing-window series, one line per group."""
+    
+    # Create figure
+    fig = px.line(
+        rolling_df,
+        x="period",
+        y="value",
+        color="group" if rolling_df["group"].nunique() > 1 else None,
+        title=title,
+        labels={
+            "period": "Period",
+            "value": y_title,
+            "group": "Group"
+        }
+    )
+    
+    # Update layout
+    fig.update_layout(
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        hovermode="x unified"
+    )
+    fig.update_traces(line=dict(width=2), connectgaps=False)
+    
+    # Format y-axis based on the metric type
+    if percent:
+        fig.update_yaxes(ticksuffix="%")
+    elif money:
+        fig.update_yaxes(tickprefix="$", tickformat=",.0f")
+    
+    return fig
+
+def create_overrun_histogram(histogram, title="Overrun Ratio Distribution"):
+    """Create a bar chart of overrun ratio (actual / planned hours) bins."""
+    
+    labels = [
+        f"{b['low']:g}–{b['high']:g}×" if b["high"] is not None else f"≥{b['low']:g}×"
+        for b in histogram
+    ]
+    # Bins at or under plan in blue, over plan in red
+    colors = ["#1e40af" if b["high"] is not None and b["high"] <= 1 else "#dc2626" for b in histogram]
+    
+    fig = go.Figure(
+        go.Bar(
+            x=labels,
+            y=[b["count"] for b in histogram],
+            marker_color=colors,
+            hovertemplate="%{x}: %{y:,} operations<extra></extra>"
+        )
+    )
+    
+    fig.update_layout(
+        title_text=title,
+        xaxis_title="Actual / Planned Hours",
+        yaxis_title="Operations",
+        bargap=0.1
+    )
+    
+    return fig
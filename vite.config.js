@@ -7,5 +7,9 @@ export default defineConfig({
   server: {
     port: 5000,
     host: '0.0.0.0',
+    // Forward API calls to the Python JSON API (api.py)
+    proxy: {
+      '/api': 'http://localhost:8000',
+    },
   },
 });
\ No newline at end of file